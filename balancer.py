@@ -0,0 +1,627 @@
+import threading
+import time
+from fractions import Fraction
+from itertools import chain, combinations
+from math import gcd
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from species import Species
+
+# Spesies bantu untuk larutan asam, dicoba sesuai urutan ini
+AQUEOUS_AUXILIARIES = ('H2O', 'H^+')
+
+class BalanceError(ValueError):
+    # Reaksi tidak memiliki solusi koefisien bulat positif yang tunggal
+    pass
+
+def _content(row: Sequence[int]) -> int:
+    # FPB seluruh entri baris
+    g = 0
+    for value in row:
+        g = gcd(g, value)
+        if g == 1:
+            break
+    return g
+
+def _primitive(row: List[int]) -> List[int]:
+    g = _content(row)
+    if g > 1:
+        return [value // g for value in row]
+    return row
+
+def row_reduce(matrix: Sequence[Sequence[int]], ncols: int) -> Tuple[List[List[int]], List[int]]:
+    # Eliminasi Gauss-Jordan bebas pecahan: semua operasi tetap di bilangan bulat
+    # dan setiap baris dibagi FPB-nya agar angka tidak membengkak.
+    rows = [_primitive(list(row)) for row in matrix if any(row)]
+    pivots: List[int] = []
+    rank = 0
+    for col in range(ncols):
+        if rank == len(rows):
+            break
+        pivot_row = None
+        for i in range(rank, len(rows)):
+            if rows[i][col] != 0 and (pivot_row is None or abs(rows[i][col]) < abs(rows[pivot_row][col])):
+                pivot_row = i
+        if pivot_row is None:
+            continue
+        rows[rank], rows[pivot_row] = rows[pivot_row], rows[rank]
+        pivot = rows[rank]
+        p = pivot[col]
+        for i in range(len(rows)):
+            if i == rank or rows[i][col] == 0:
+                continue
+            factor = rows[i][col]
+            g = gcd(p, factor)
+            a, b = p // g, factor // g
+            rows[i] = _primitive([a * x - b * y for x, y in zip(rows[i], pivot)])
+        pivots.append(col)
+        rank += 1
+    return rows[:rank], pivots
+
+def integer_nullspace(matrix: Sequence[Sequence[int]], ncols: int) -> List[List[int]]:
+    # Basis bulat primitif untuk ruang nol matriks
+    rows, pivots = row_reduce(matrix, ncols)
+    pivot_set = set(pivots)
+    basis = []
+    for free in range(ncols):
+        if free in pivot_set:
+            continue
+        # Skala bersama agar semua komponen pivot tetap bulat
+        scale = 1
+        for row, col in zip(rows, pivots):
+            if row[free]:
+                p = abs(row[col])
+                scale = scale * p // gcd(scale, p)
+        vector = [0] * ncols
+        vector[free] = scale
+        for row, col in zip(rows, pivots):
+            vector[col] = -row[free] * scale // row[col]
+        basis.append(_primitive(vector))
+    return basis
+
+def composition_matrix(species: Sequence[Species]) -> List[List[int]]:
+    # Baris: setiap unsur ditambah baris muatan; kolom: spesies
+    elements: List[str] = []
+    seen = set()
+    for sp in species:
+        for element in sp.composition:
+            if element not in seen:
+                seen.add(element)
+                elements.append(element)
+    matrix = [[sp.composition.get(element, 0) for sp in species] for element in elements]
+    matrix.append([sp.charge for sp in species])
+    return matrix
+
+def solve_coefficients(basis: Sequence[List[int]], positive: int) -> Optional[List[int]]:
+    # Koefisien bulat terkecil jika ruang nol berdimensi satu dan
+    # `positive` kolom pertama semuanya positif
+    if len(basis) != 1:
+        return None
+    vector = basis[0]
+    if vector[0] < 0:
+        vector = [-value for value in vector]
+    if all(value > 0 for value in vector[:positive]):
+        return vector
+    return None
+
+def auxiliary_candidates(present: Sequence[str]) -> List[Tuple[str, ...]]:
+    # Kombinasi spesies bantu yang dicoba berurutan
+    missing = [aux for aux in AQUEOUS_AUXILIARIES if aux not in present]
+    candidates: List[Tuple[str, ...]] = [()]
+    candidates += [(aux,) for aux in missing]
+    if len(missing) > 1:
+        candidates.append(tuple(missing))
+    return candidates
+
+def candidate_matrix(formulas: Sequence[str], n_reactants: int) -> List[List[int]]:
+    # Matriks komposisi bertanda: kolom reaktan positif, kolom produk negatif
+    species = [Species.get(f) for f in formulas]
+    signs = [1] * n_reactants + [-1] * (len(formulas) - n_reactants)
+    return [[value * sign for value, sign in zip(row, signs)] for row in composition_matrix(species)]
+
+def solve_candidate(matrix: List[List[int]], formulas: Sequence[str], n_user: int,
+                    electron_row: Optional[Dict[str, int]] = None) -> Optional[List[int]]:
+    # Jalur eksak untuk satu kandidat; baris elektron ditambahkan hanya jika
+    # ruang nol berdimensi lebih dari satu
+    ncols = len(formulas)
+    basis = integer_nullspace(matrix, ncols)
+    if len(basis) > 1 and electron_row:
+        basis = integer_nullspace(matrix + [[electron_row.get(f, 0) for f in formulas]], ncols)
+    return solve_coefficients(basis, n_user)
+
+def assemble(reactants: List[str], products: List[str], auxiliaries: Sequence[str],
+             coefficients: Sequence[int]) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]]]:
+    # Susun suku tiap sisi; tanda koefisien spesies bantu menentukan sisinya
+    n_reactants = len(reactants)
+    n_user = n_reactants + len(products)
+    left = [(f, c) for f, c in zip(reactants, coefficients)]
+    right = [(f, c) for f, c in zip(products, coefficients[n_reactants:n_user])]
+    for f, c in zip(auxiliaries, coefficients[n_user:]):
+        if c > 0:
+            right.append((f, c))
+        elif c < 0:
+            left.append((f, -c))
+    return left, right
+
+def balance_equation(reactants: List[str], products: List[str],
+                     electron_row: Optional[Dict[str, int]] = None
+                     ) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]]]:
+    # Setarakan reaksi dengan matriks komposisi (unsur + muatan).
+    # H2O dan H^+ ditambahkan bila perlu; tanda koefisiennya menentukan sisinya.
+    # `electron_row` (spesies -> elektron per satuan) dipakai untuk memilih
+    # solusi ketika ruang nol berdimensi lebih dari satu.
+    user_species = reactants + products
+    for auxiliaries in auxiliary_candidates(user_species):
+        formulas = user_species + list(auxiliaries)
+        matrix = candidate_matrix(formulas, len(reactants))
+        coefficients = solve_candidate(matrix, formulas, len(user_species), electron_row)
+        if coefficients is not None:
+            return assemble(reactants, products, auxiliaries, coefficients)
+    raise BalanceError('Tidak ada koefisien bulat positif yang tunggal untuk reaksi ini')
+
+# Label baris non-unsur di faktorisasi inkremental
+CHARGE_ROW = '(muatan)'
+ELECTRON_ROW = '(elektron)'
+
+# Kunci kolom: (rumus, tanda); reaktan bertanda 1, produk dan spesies bantu -1
+Column = Tuple[str, int]
+
+class Factorization:
+    # Bentuk tereduksi Gauss-Jordan bebas pecahan dari matriks komposisi
+    # bertanda yang bisa diperbarui per kolom: R = T * A, dengan T transformasi
+    # baris kumulatif. Invarian: setiap kolom pivot hanya bukan nol di baris
+    # pivotnya, dan baris tanpa pivot seluruhnya nol di R. Menambah kolom
+    # cukup menghitung T * kolom lalu paling banyak satu langkah pivot;
+    # menghapus kolom paling banyak memilih pivot baru untuk satu baris.
+    def __init__(self):
+        self.columns: List[Column] = []
+        self.labels: Dict[str, int] = {}          # label baris asal -> indeks di T
+        self.rows: List[List[int]] = []           # R, satu baris per baris asal
+        self.transforms: List[List[int]] = []     # T
+        self.pivots: List[Optional[Column]] = []  # kolom pivot tiap baris
+
+    def copy(self) -> 'Factorization':
+        other = Factorization()
+        other.columns = list(self.columns)
+        other.labels = dict(self.labels)
+        other.rows = [list(row) for row in self.rows]
+        other.transforms = [list(row) for row in self.transforms]
+        other.pivots = list(self.pivots)
+        return other
+
+    def _new_row(self, label: str) -> int:
+        # Baris asal baru (unsur baru, muatan atau elektron); T diperluas identitas
+        index = len(self.rows)
+        self.labels[label] = index
+        for transform in self.transforms:
+            transform.append(0)
+        self.rows.append([0] * len(self.columns))
+        self.transforms.append([0] * index + [1])
+        self.pivots.append(None)
+        return index
+
+    def _normalize(self, i: int) -> None:
+        g = gcd(_content(self.rows[i]), _content(self.transforms[i]))
+        if g > 1:
+            self.rows[i] = [value // g for value in self.rows[i]]
+            self.transforms[i] = [value // g for value in self.transforms[i]]
+
+    def _eliminate(self, i: int, p: int, col: int) -> None:
+        # Nolkan kolom `col` di baris i memakai baris pivot p
+        a, b = self.rows[p][col], self.rows[i][col]
+        g = gcd(a, b)
+        a, b = a // g, b // g
+        self.rows[i] = [a * x - b * y for x, y in zip(self.rows[i], self.rows[p])]
+        self.transforms[i] = [a * x - b * y for x, y in zip(self.transforms[i], self.transforms[p])]
+        self._normalize(i)
+
+    def _pivot(self, candidates: Sequence[int], col: int) -> None:
+        # Jadikan `col` kolom pivot jika salah satu baris tanpa pivot bukan nol di sana
+        best = None
+        for i in candidates:
+            if self.rows[i][col] and (best is None or abs(self.rows[i][col]) < abs(self.rows[best][col])):
+                best = i
+        if best is None:
+            return
+        self.pivots[best] = self.columns[col]
+        for i in range(len(self.rows)):
+            if i != best and self.rows[i][col]:
+                self._eliminate(i, best, col)
+
+    def add_column(self, column: Column, entries: Dict[str, int]) -> None:
+        for label in entries:
+            if label not in self.labels:
+                self._new_row(label)
+        vector = [0] * len(self.labels)
+        for label, value in entries.items():
+            vector[self.labels[label]] = value
+        for row, transform in zip(self.rows, self.transforms):
+            row.append(sum(t * v for t, v in zip(transform, vector) if v))
+        self.columns.append(column)
+        self._pivot([i for i, pivot in enumerate(self.pivots) if pivot is None], len(self.columns) - 1)
+
+    def remove_column(self, column: Column) -> None:
+        col = self.columns.index(column)
+        for row in self.rows:
+            del row[col]
+        del self.columns[col]
+        if column not in self.pivots:
+            return
+        # Baris pivotnya kehilangan pivot: pilih kolom bebas lain bila ada
+        i = self.pivots.index(column)
+        self.pivots[i] = None
+        self._normalize(i)
+        for col, value in enumerate(self.rows[i]):
+            if value:
+                self._pivot([i], col)
+                break
+
+    def add_row(self, label: str, entries: Dict[Column, int]) -> None:
+        # Kendala tambahan atas kolom yang sudah ada (mis. baris elektron)
+        i = self._new_row(label)
+        self.rows[i] = [entries.get(column, 0) for column in self.columns]
+        for p, pivot in enumerate(self.pivots):
+            if pivot is not None:
+                col = self.columns.index(pivot)
+                if self.rows[i][col]:
+                    self._eliminate(i, p, col)
+        for col, value in enumerate(self.rows[i]):
+            if value:
+                self._pivot([i], col)
+                break
+
+    def nullspace(self) -> List[Dict[Column, int]]:
+        # Basis bulat primitif, sama seperti integer_nullspace
+        pivot_rows = [(row, self.columns.index(pivot)) for row, pivot in zip(self.rows, self.pivots)
+                      if pivot is not None]
+        pivot_cols = {col for _, col in pivot_rows}
+        basis = []
+        for free in range(len(self.columns)):
+            if free in pivot_cols:
+                continue
+            scale = 1
+            for row, col in pivot_rows:
+                if row[free]:
+                    p = abs(row[col])
+                    scale = scale * p // gcd(scale, p)
+            vector = [0] * len(self.columns)
+            vector[free] = scale
+            for row, col in pivot_rows:
+                vector[col] = -row[free] * scale // row[col]
+            basis.append(dict(zip(self.columns, _primitive(vector))))
+        return basis
+
+def column_entries(formula: str, sign: int) -> Dict[str, int]:
+    sp = Species.get(formula)
+    entries = {element: count * sign for element, count in sp.composition.items()}
+    if sp.charge:
+        entries[CHARGE_ROW] = sp.charge * sign
+    return entries
+
+class IncrementalBalancer:
+    # Penyetara yang menyimpan faktorisasi reaksi terakhir. Reaksi berikutnya
+    # hanya menambah atau menghapus kolom yang berbeda, lalu kandidat spesies
+    # bantu dan baris elektron diterapkan pada salinan faktorisasi itu.
+    # Hasilnya identik dengan balance_equation.
+    def __init__(self):
+        self.factorization = Factorization()
+        self._lock = threading.Lock()
+
+    def _sync(self, columns: List[Column]) -> None:
+        wanted = set(columns)
+        kept = sum(1 for column in self.factorization.columns if column in wanted)
+        # Mulai dari nol jika reaksi baru sebagian besar berbeda, atau baris
+        # unsur yang sudah tidak dipakai menumpuk dari reaksi-reaksi sebelumnya
+        if kept * 2 < len(columns) or len(self.factorization.rows) > 2 * len(columns) + 4:
+            self.factorization = Factorization()
+        for column in [c for c in self.factorization.columns if c not in wanted]:
+            self.factorization.remove_column(column)
+        present = set(self.factorization.columns)
+        for column in columns:
+            if column not in present:
+                self.factorization.add_column(column, column_entries(*column))
+
+    def balance_equation(self, reactants: List[str], products: List[str],
+                         electron_row: Optional[Dict[str, int]] = None
+                         ) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]]]:
+        user = [(f, 1) for f in reactants] + [(f, -1) for f in products]
+        if len(set(user)) != len(user):
+            # Spesies ganda dalam satu sisi tidak bisa jadi kunci kolom
+            return balance_equation(reactants, products, electron_row)
+        with self._lock:
+            self._sync(user)
+            for auxiliaries in auxiliary_candidates(reactants + products):
+                factorization = self.factorization
+                if auxiliaries:
+                    factorization = factorization.copy()
+                    for aux in auxiliaries:
+                        factorization.add_column((aux, -1), column_entries(aux, -1))
+                basis = factorization.nullspace()
+                if len(basis) > 1 and electron_row:
+                    if factorization is self.factorization:
+                        factorization = factorization.copy()
+                    factorization.add_row(ELECTRON_ROW, {c: electron_row.get(c[0], 0) for c in factorization.columns})
+                    basis = factorization.nullspace()
+                order = user + [(aux, -1) for aux in auxiliaries]
+                coefficients = solve_coefficients([[vector[c] for c in order] for vector in basis], len(user))
+                if coefficients is not None:
+                    return assemble(reactants, products, auxiliaries, coefficients)
+        raise BalanceError('Tidak ada koefisien bulat positif yang tunggal untuk reaksi ini')
+
+# Batas pencarian solusi minimal untuk ruang nol berdimensi lebih dari satu
+ENUMERATION_BUDGET = 0.25      # detik, total untuk semua kandidat spesies bantu
+MAX_SOLUTIONS = 5              # jumlah solusi yang dikembalikan
+MAX_CANDIDATES = 64            # solusi elementer yang dikumpulkan sebelum digabung
+MAX_COMBINATION_NORM = 3       # batas jumlah |koefisien kombinasi| basis
+MAX_LATTICE_DIMENSION = 8      # di atas ini hanya pencarian sirkuit yang dipakai
+
+def integer_kernel(matrix: Sequence[Sequence[int]], ncols: int) -> List[List[int]]:
+    # Basis kisi bulat penuh ruang nol: semua x bulat dengan A x = 0 adalah
+    # kombinasi bulat basis ini (berbeda dari integer_nullspace yang hanya
+    # merentang ruang rasionalnya). Operasi kolom unimoduler pada [A; I]
+    # ala algoritma Euclid; kolom yang bagian A-nya habis menjadi nol membawa
+    # vektor basisnya di bagian I.
+    m = len(matrix)
+    columns = [[row[j] for row in matrix] + [int(i == j) for i in range(ncols)] for j in range(ncols)]
+    rank = 0
+    for r in range(m):
+        while True:
+            nonzero = [j for j in range(rank, ncols) if columns[j][r]]
+            if not nonzero:
+                break
+            pivot = min(nonzero, key=lambda j: abs(columns[j][r]))
+            if len(nonzero) == 1:
+                columns[rank], columns[pivot] = columns[pivot], columns[rank]
+                rank += 1
+                break
+            for j in nonzero:
+                if j != pivot:
+                    q = columns[j][r] // columns[pivot][r]
+                    columns[j] = [a - q * b for a, b in zip(columns[j], columns[pivot])]
+    return [column[m:] for column in columns[rank:]]
+
+def _dot(u: Sequence, v: Sequence):
+    return sum(x * y for x, y in zip(u, v))
+
+def _gram_schmidt(basis: List[List[int]]) -> Tuple[List[List[Fraction]], List[List[Fraction]]]:
+    orthogonal: List[List[Fraction]] = []
+    mu = [[Fraction(0)] * len(basis) for _ in basis]
+    for i, vector in enumerate(basis):
+        current = [Fraction(x) for x in vector]
+        for j, other in enumerate(orthogonal):
+            mu[i][j] = _dot(vector, other) / _dot(other, other)
+            current = [x - mu[i][j] * y for x, y in zip(current, other)]
+        orthogonal.append(current)
+    return orthogonal, mu
+
+def lll_reduce(basis: Sequence[Sequence[int]], deadline: Optional[float] = None,
+               delta: Fraction = Fraction(3, 4)) -> List[List[int]]:
+    # Reduksi kisi LLL eksak (pecahan): basis yang sama tetapi vektornya
+    # pendek dan hampir ortogonal, sehingga solusi kecil muncul sebagai
+    # kombinasi berkoefisien kecil. Berhenti lebih awal jika tenggat lewat;
+    # basis tetap sah, hanya kurang tereduksi.
+    b = [list(v) for v in basis]
+    if len(b) < 2:
+        return b
+    orthogonal, mu = _gram_schmidt(b)
+    i = 1
+    while i < len(b):
+        if deadline is not None and time.monotonic() > deadline:
+            break
+        for j in range(i - 1, -1, -1):
+            q = round(mu[i][j])
+            if q:
+                b[i] = [x - q * y for x, y in zip(b[i], b[j])]
+                for k in range(j):
+                    mu[i][k] -= q * mu[j][k]
+                mu[i][j] -= q
+        if _dot(orthogonal[i], orthogonal[i]) >= (delta - mu[i][i - 1] ** 2) * _dot(orthogonal[i - 1], orthogonal[i - 1]):
+            i += 1
+        else:
+            b[i], b[i - 1] = b[i - 1], b[i]
+            orthogonal, mu = _gram_schmidt(b)
+            i = max(i - 1, 1)
+    return b
+
+def _combinations(size: int, norm: int) -> Iterator[List[int]]:
+    # Semua vektor bulat berdimensi `size` dengan jumlah |c_i| tepat `norm`
+    if size == 1:
+        yield [norm]
+        if norm:
+            yield [-norm]
+        return
+    for first in range(norm, -1, -1):
+        for rest in _combinations(size - 1, norm - first):
+            yield [first] + rest
+            if first:
+                yield [-first] + rest
+
+def _dominates(u: Sequence[int], v: Sequence[int], positive: int) -> bool:
+    # u memakai tiap spesies pengguna tidak lebih banyak dari v (dan u != v)
+    return u != v and all(a <= b for a, b in zip(u[:positive], v[:positive]))
+
+def _lattice_pieces(basis: Sequence[Sequence[int]], positive: int, deadline: float
+                    ) -> Iterator[Tuple[int, ...]]:
+    # Solusi elementer dari kombinasi kecil basis tereduksi LLL
+    if len(basis) > MAX_LATTICE_DIMENSION:
+        return
+    reduced = lll_reduce(basis, deadline)
+    ncols = len(reduced[0])
+    for norm in range(1, MAX_COMBINATION_NORM + 1):
+        for count, combination in enumerate(_combinations(len(reduced), norm)):
+            if count % 256 == 0 and time.monotonic() > deadline:
+                return
+            vector = [0] * ncols
+            for c, row in zip(combination, reduced):
+                if c:
+                    vector = [v + c * x for v, x in zip(vector, row)]
+            head = vector[:positive]
+            if min(head) >= 0 and max(head) > 0:
+                yield tuple(_primitive(vector))
+
+def _circuit_pieces(matrix: Sequence[Sequence[int]], positive: int, deadline: float
+                    ) -> Iterator[Tuple[int, ...]]:
+    # Solusi elementer berpendukung minimal ("sirkuit"): untuk tiap spesies
+    # pengguna yang belum tercakup, coba himpunan spesies pengguna berukuran
+    # naik yang memuatnya (ditambah semua spesies bantu). Dengan koefisien
+    # positif, setiap baris yang disentuh himpunan harus punya entri positif
+    # dan negatif (spesies bantu boleh bertanda apa saja); himpunan yang tidak
+    # memenuhinya dilewati tanpa menghitung ruang nolnya.
+    ncols = len(matrix[0])
+    positive_rows = [frozenset(r for r, row in enumerate(matrix) if row[j] > 0) for j in range(ncols)]
+    negative_rows = [frozenset(r for r, row in enumerate(matrix) if row[j] < 0) for j in range(ncols)]
+    auxiliaries = list(range(positive, ncols))
+    free = frozenset().union(*(positive_rows[a] | negative_rows[a] for a in auxiliaries))
+    covered = set()
+    for target in range(positive):
+        if target in covered:
+            continue
+        # Spesies yang sudah muncul di sirkuit lain, lalu yang bisa
+        # mengimbangi unsur target dari sisi seberang, dicoba lebih dulu
+        others = sorted((j for j in range(positive) if j != target),
+                        key=lambda j: (j not in covered,
+                                       not (positive_rows[target] & negative_rows[j]
+                                            or negative_rows[target] & positive_rows[j]), j))
+        supports = (extra for size in range(len(others) + 1) for extra in combinations(others, size))
+        for extra in supports:
+            if time.monotonic() > deadline:
+                return
+            support = (target,) + extra
+            plus = frozenset().union(*(positive_rows[j] for j in support))
+            minus = frozenset().union(*(negative_rows[j] for j in support))
+            if (plus | minus) - ((plus & minus) | free):
+                continue
+            columns = list(support) + auxiliaries
+            kernel = integer_nullspace([[row[j] for j in columns] for row in matrix], len(columns))
+            if len(kernel) != 1:
+                continue
+            vector = kernel[0]
+            if vector[0] < 0:
+                vector = [-v for v in vector]
+            if any(v <= 0 for v in vector[:len(support)]):
+                continue
+            full = [0] * ncols
+            for j, v in zip(columns, vector):
+                full[j] = v
+            covered.update(support)
+            yield tuple(full)
+            break
+
+def minimal_solutions(matrix: Sequence[Sequence[int]], basis: Sequence[Sequence[int]], positive: int,
+                      deadline: float, limit: int = MAX_SOLUTIONS) -> List[List[int]]:
+    # Solusi bulat primitif dengan `positive` komponen pertama positif.
+    # Solusi "elementer" (spesies pengguna >= 0) dikumpulkan dari dua sumber
+    # terbatas: kombinasi kecil basis kisi tereduksi LLL, lalu sirkuit
+    # berpendukung minimal. Solusi yang sudah positif dipakai langsung;
+    # selain itu solusi elementer digabung secara serakah sampai semua spesies
+    # pengguna tercakup. Solusi yang mendominasi solusi lain dibuang karena
+    # merupakan gabungan reaksi yang lebih kecil; sisanya diurutkan menurut
+    # kesederhanaan: jumlah koefisien, lalu koefisien terbesar.
+    elementary: Dict[Tuple[int, ...], None] = {}
+    for piece in chain(_lattice_pieces(basis, positive, deadline), _circuit_pieces(matrix, positive, deadline)):
+        elementary.setdefault(piece, None)
+        if len(elementary) >= MAX_CANDIDATES:
+            break
+
+    simplicity = lambda v: (sum(abs(x) for x in v), max(abs(x) for x in v), v)
+    pieces = sorted(elementary, key=simplicity)
+    solutions = {v: None for v in pieces if min(v[:positive]) > 0}
+    # Gabungan serakah: mulai dari tiap solusi elementer, tambahkan solusi
+    # paling sederhana yang mencakup spesies yang belum positif
+    for start in pieces:
+        total = list(start)
+        for piece in pieces:
+            if min(total[:positive]) > 0:
+                break
+            if any(p > 0 and t == 0 for p, t in zip(piece[:positive], total[:positive])):
+                total = [t + p for t, p in zip(total, piece)]
+        if min(total[:positive]) > 0:
+            solutions.setdefault(tuple(_primitive(total)), None)
+
+    candidates = list(solutions)
+    minimal = [v for v in candidates if not any(_dominates(u, v, positive) for u in candidates)]
+    minimal.sort(key=simplicity)
+    return [list(v) for v in minimal[:limit]]
+
+def enumerate_balances(reactants: List[str], products: List[str],
+                       budget: float = ENUMERATION_BUDGET, limit: int = MAX_SOLUTIONS
+                       ) -> List[Tuple[List[Tuple[str, int]], List[Tuple[str, int]]]]:
+    # Untuk reaksi yang ruang nolnya berdimensi lebih dari satu (gabungan
+    # beberapa reaksi bebas): beberapa persamaan setara minimal, yang paling
+    # sederhana lebih dulu. Hanya kekekalan unsur dan muatan yang dipakai;
+    # baris elektron tidak, karena pada reaksi seperti ini ia bisa menolak
+    # semua solusi. Kandidat spesies bantu dicoba berurutan seperti
+    # balance_equation; kandidat pertama yang memberi solusi dipakai.
+    deadline = time.monotonic() + budget
+    user_species = reactants + products
+    for auxiliaries in auxiliary_candidates(user_species):
+        formulas = user_species + list(auxiliaries)
+        matrix = candidate_matrix(formulas, len(reactants))
+        basis = integer_kernel(matrix, len(formulas))
+        if len(basis) < 2:
+            continue
+        solutions = minimal_solutions(matrix, basis, len(user_species), deadline, limit)
+        if solutions:
+            return [assemble(reactants, products, auxiliaries, vector) for vector in solutions]
+        if time.monotonic() > deadline:
+            break
+    return []
+
+def imbalance(left: Sequence[Tuple[str, int]], right: Sequence[Tuple[str, int]]) -> Dict[str, int]:
+    # Selisih (kiri - kanan) tiap unsur dan muatan dengan aritmetika bulat
+    # atas komposisi hasil parse; kosong jika persamaan setara
+    totals: Dict[str, int] = {}
+    for terms, sign in ((left, 1), (right, -1)):
+        for formula, count in terms:
+            sp = Species.get(formula)
+            for element, n in sp.composition.items():
+                totals[element] = totals.get(element, 0) + sign * count * n
+            if sp.charge:
+                totals[CHARGE_ROW] = totals.get(CHARGE_ROW, 0) + sign * count * sp.charge
+    return {label: value for label, value in totals.items() if value}
+
+def is_balanced(left: Sequence[Tuple[str, int]], right: Sequence[Tuple[str, int]]) -> bool:
+    # Koefisien harus bulat positif dan semua unsur serta muatan kekal
+    for terms in (left, right):
+        for _, count in terms:
+            if not isinstance(count, int) or count <= 0:
+                return False
+    return bool(left) and bool(right) and not imbalance(left, right)
+
+def to_basic(left: Sequence[Tuple[str, int]], right: Sequence[Tuple[str, int]]
+             ) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]]]:
+    # Ubah persamaan larutan asam ke larutan basa tanpa menyelesaikan ulang:
+    # setiap H^+ dinetralkan dengan OH^- yang ditambahkan di kedua sisi
+    # (H^+ + OH^- -> H2O), lalu H2O dan OH^- yang muncul di kedua sisi dicoret
+    sides = [dict(left), dict(right)]
+    for side, other in ((0, 1), (1, 0)):
+        h = sides[side].pop('H^+', 0)
+        if h:
+            sides[side]['H2O'] = sides[side].get('H2O', 0) + h
+            sides[other]['OH^-'] = sides[other].get('OH^-', 0) + h
+    for formula in ('H2O', 'OH^-'):
+        common = min(sides[0].get(formula, 0), sides[1].get(formula, 0))
+        if common:
+            sides[0][formula] -= common
+            sides[1][formula] -= common
+    return ([(f, c) for f, c in sides[0].items() if c], [(f, c) for f, c in sides[1].items() if c])
+
+def parse_terms(side: str) -> Tuple[Tuple[str, int], ...]:
+    # Kebalikan format_side: "5H2O2 + 2MnO4^-" -> (("H2O2", 5), ("MnO4^-", 2))
+    terms = []
+    for term in side.split(' + '):
+        term = term.strip()
+        digits = len(term) - len(term.lstrip('0123456789'))
+        terms.append((term[digits:], int(term[:digits]) if digits else 1))
+    return tuple(terms)
+
+def format_side(terms: Sequence[Tuple[str, int]]) -> str:
+    return ' + '.join(f if c == 1 else f"{c}{f}" for f, c in terms)
+
+def format_equation(left: Sequence[Tuple[str, int]], right: Sequence[Tuple[str, int]]) -> str:
+    return f"{format_side(left)} -> {format_side(right)}"
+
+def sympy_nullspace(matrix: Sequence[Sequence[int]]):
+    # Hanya untuk diagnosis: bandingkan dengan ruang nol simbolik sympy
+    from sympy import Matrix
+    return Matrix(matrix).nullspace()
@@ -0,0 +1,140 @@
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, IO, Iterable, Iterator, List, Optional, Set, Tuple
+
+from core import MEDIA, MEDIUM_ACIDIC, balance_reaction
+
+# Satu tugas: (nomor baris, reaksi, id opsional dari input JSONL, pesan galat baca)
+Task = Tuple[int, str, Any, Optional[str]]
+
+def read_tasks(stream: IO[str], fmt: str = 'auto') -> Iterator[Task]:
+    # Baca reaksi satu per baris secara streaming; format JSONL memakai kunci
+    # "reaction" dan meneruskan "id" bila ada
+    for index, line in enumerate(stream):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if fmt == 'jsonl' or (fmt == 'auto' and line.startswith('{')):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield index, line, None, f"JSON tidak valid: {e}"
+                continue
+            yield index, str(record.get('reaction', '')), record.get('id'), None
+        else:
+            yield index, line, None, None
+
+def balance_one(index: int, reaction: str, ident: Any = None, error: Optional[str] = None,
+                medium: str = MEDIUM_ACIDIC) -> Dict[str, Any]:
+    record: Dict[str, Any] = {'index': index, 'reaction': reaction}
+    if ident is not None:
+        record['id'] = ident
+    if error:
+        record['error'] = error
+        return record
+    try:
+        result = balance_reaction(reaction, medium=medium)
+        record['solver'] = result.solver
+        if result.ok:
+            record['equation'] = result.equation
+            record['coefficients'] = result.coefficients()
+        record['result'] = result.format()
+    except ValueError as e:
+        record['error'] = str(e)
+    except Exception as e:
+        record['error'] = f"Terjadi kesalahan: {e}"
+    return record
+
+def balance_to_dict(reaction: str) -> Dict[str, Any]:
+    # Hasil suasana asam dalam bentuk JSON; dipakai pekerja proses layanan dan lembar kerja
+    return balance_reaction(reaction).to_dict()
+
+def balance_chunk(chunk: List[Task], medium: str = MEDIUM_ACIDIC) -> List[Dict[str, Any]]:
+    # Dijalankan di proses pekerja
+    return [balance_one(*task, medium=medium) for task in chunk]
+
+def _chunks(tasks: Iterable[Task], size: int) -> Iterator[List[Task]]:
+    iterator = iter(tasks)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def run_batch(tasks: Iterable[Task], workers: int = 1, chunksize: int = 64,
+              ordered: bool = False,
+              worker: Callable[[List[Task]], List[Any]] = balance_chunk) -> Iterator[Any]:
+    # Hasil dialirkan begitu selesai. Jumlah potongan yang sedang diproses
+    # dibatasi (2 per pekerja) sehingga memori tetap konstan berapa pun
+    # ukuran input. `worker` harus fungsi tingkat modul agar bisa dipickle.
+    chunks = _chunks(tasks, chunksize)
+    if workers <= 1:
+        for chunk in chunks:
+            yield from worker(chunk)
+        return
+
+    max_pending = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if ordered:
+            queue: Deque[Future] = deque()
+            for chunk in chunks:
+                queue.append(pool.submit(worker, chunk))
+                if len(queue) >= max_pending:
+                    yield from queue.popleft().result()
+            while queue:
+                yield from queue.popleft().result()
+        else:
+            pending: Set[Future] = set()
+            for chunk in chunks:
+                pending.add(pool.submit(worker, chunk))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Setarakan banyak reaksi tanpa Streamlit; hasil ditulis sebagai JSONL.")
+    parser.add_argument('input', nargs='?', default='-',
+                        help="berkas reaksi (satu per baris atau JSONL); '-' untuk stdin")
+    parser.add_argument('-o', '--output', default='-', help="berkas keluaran JSONL; '-' untuk stdout")
+    parser.add_argument('-f', '--format', choices=('auto', 'lines', 'jsonl'), default='auto',
+                        help="format input (default: deteksi per baris)")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="jumlah proses pekerja (default: jumlah core)")
+    parser.add_argument('--chunksize', type=int, default=64, help="jumlah reaksi per tugas pekerja")
+    parser.add_argument('--ordered', action='store_true', help="pertahankan urutan input pada keluaran")
+    parser.add_argument('--medium', choices=MEDIA, default=MEDIUM_ACIDIC, help="suasana larutan (default: acidic)")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        tasks = read_tasks(source, args.format)
+        chunksize = max(1, args.chunksize)
+        worker = partial(balance_chunk, medium=args.medium)
+        for count, record in enumerate(run_batch(tasks, args.workers, chunksize, args.ordered, worker), 1):
+            sink.write(json.dumps(record, ensure_ascii=False) + '\n')
+            if count % chunksize == 0:
+                sink.flush()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,377 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import core
+import oxidation
+import species
+from balancer import BalanceError, balance_equation
+from rules import shortcut_rules
+
+# Harness benchmark offline: latensi p50/p99 dan memori puncak per tahap dan
+# per jalur solver, dibandingkan dengan baseline tersimpan.
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench')
+CORPUS_DIR = os.path.join(BENCH_DIR, 'corpus')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Contoh reaksi dari README
+README_REACTIONS = [
+    "H2O2 + MnO4^- -> Mn^2+ + O2",
+    "Cr2O7^2- + I^- -> Cr^3+ + I2",
+    "H2O2 + I^- -> I2 + H2O",
+    "MnO4^- + C2O4^2- -> Mn^2+ + CO2",
+]
+
+# Pasangan redoks (bentuk teroksidasi, bentuk tereduksi, E° dalam volt)
+COUPLES = [
+    ("H2O2", "H2O", 1.78), ("Ce^4+", "Ce^3+", 1.61), ("MnO4^-", "Mn^2+", 1.51),
+    ("ClO^-", "Cl^-", 1.49), ("PbO2", "Pb^2+", 1.46), ("ClO3^-", "Cl^-", 1.45),
+    ("BrO3^-", "Br^-", 1.42), ("Cl2", "Cl^-", 1.36), ("Cr2O7^2-", "Cr^3+", 1.33),
+    ("MnO2", "Mn^2+", 1.23), ("O2", "H2O", 1.23), ("IO3^-", "I2", 1.20),
+    ("Br2", "Br^-", 1.07), ("NO3^-", "NO", 0.96), ("NO3^-", "NO2^-", 0.94),
+    ("Hg^2+", "Hg", 0.85), ("NO3^-", "NO2", 0.80), ("Ag^+", "Ag", 0.80),
+    ("Fe^3+", "Fe^2+", 0.77), ("O2", "H2O2", 0.70), ("I2", "I^-", 0.54),
+    ("Cu^2+", "Cu", 0.34), ("SO4^2-", "SO2", 0.17), ("SO4^2-", "SO3^2-", 0.17),
+    ("Sn^4+", "Sn^2+", 0.15), ("S", "H2S", 0.14), ("S4O6^2-", "S2O3^2-", 0.08),
+    ("H^+", "H2", 0.0), ("Pb^2+", "Pb", -0.13), ("Sn^2+", "Sn", -0.14),
+    ("Ni^2+", "Ni", -0.25), ("Fe^2+", "Fe", -0.44), ("CO2", "C2O4^2-", -0.49),
+    ("Zn^2+", "Zn", -0.76), ("Al^3+", "Al", -1.66), ("Mg^2+", "Mg", -2.37),
+]
+
+MOLECULAR_REACTIONS = [
+    "Fe + O2 -> Fe2O3", "Al + O2 -> Al2O3", "Na + Cl2 -> NaCl", "H2 + Cl2 -> HCl",
+    "N2 + H2 -> NH3", "NH3 + O2 -> NO + H2O", "NH3 + O2 -> N2 + H2O", "H2S + O2 -> SO2 + H2O",
+    "SO2 + O2 -> SO3", "KMnO4 + HCl -> KCl + MnCl2 + Cl2 + H2O", "Cu + HNO3 -> CuN2O6 + NO + H2O",
+    "Zn + HCl -> ZnCl2 + H2", "KClO3 -> KCl + O2", "Fe2O3 + CO -> Fe + CO2", "C + O2 -> CO",
+    "MnO2 + HCl -> MnCl2 + Cl2 + H2O", "Cl2 + NaOH -> NaCl + NaClO + H2O", "P4 + O2 -> P4O10",
+    "As2S3 + NO3^- -> H3AsO4 + SO4^2- + NO", "H2O2 -> H2O + O2", "S2O3^2- -> S + SO4^2-",
+]
+
+# Deret reaksi sintetis yang diserahkan ke chempy: campuran sulfida
+# Fe1S2..FenS(n+1) yang dipanggang. Mesin bilangan bulat hanya menyerahkan
+# reaksi ke chempy jika enumerasi solusinya melewati batas waktu, dan ambang
+# itu bergantung pada kecepatan mesin, jadi n dicari, bukan ditetapkan.
+FALLBACK_SERIES = [
+    ('Fe{0}S{1}', 'O2', ['Fe2O3', 'SO2']),
+    ('Cu{0}S{1}', 'O2', ['CuO', 'SO2']),
+]
+FALLBACK_SIZES = range(40, 65, 4)
+
+def textbook_reactions() -> List[str]:
+    # Kandidat reaksi redoks buku teks: setiap oksidator dengan reduktor yang
+    # potensialnya cukup lebih rendah, ditambah pembakaran hidrokarbon dan
+    # reaksi molekuler. Tidak semua pasangan bisa disetarakan (mis. tanpa
+    # unsur yang cocok); write_corpus() menyaringnya.
+    reactions = []
+    for ox, ox_product, e_ox in COUPLES:
+        for red_product, red, e_red in COUPLES:
+            if e_ox - e_red < 0.1 or ox == red:
+                continue
+            reactants = [ox] if ox == red else [ox, red]
+            products = list(dict.fromkeys([ox_product, red_product]))
+            if set(reactants) & set(products):
+                continue
+            reactions.append(f"{' + '.join(reactants)} -> {' + '.join(products)}")
+    for n in range(1, 21):
+        reactions.append(f"C{n}H{2 * n + 2} + O2 -> CO2 + H2O")
+    for n in range(2, 21):
+        reactions.append(f"C{n}H{2 * n} + O2 -> CO2 + H2O")
+    for n in range(2, 16):
+        reactions.append(f"C{n}H{2 * n - 2} + O2 -> CO2 + H2O")
+    reactions += MOLECULAR_REACTIONS
+    return reactions
+
+def synthetic_reactions(seed: int = 7) -> List[str]:
+    # Reaksi sintetis 10-200 spesies dengan ruang nol berdimensi satu:
+    # k unsur bebas bergabung menjadi satu senyawa besar
+    rng = random.Random(seed)
+    symbols = [u + l for u in "JQXDEGLMRT" for l in "abcdefghijklmnopqrstuvwxyz"
+               if u + l not in oxidation.ELEMENT_TABLE]
+    reactions = []
+    for size in (10, 20, 50, 100, 200):
+        for _ in range(4):
+            chosen = rng.sample(symbols, size - 1)
+            reactants = []
+            product = []
+            for symbol in chosen:
+                atoms = rng.randint(1, 4)
+                reactants.append(f"{symbol}{atoms}" if atoms > 1 else symbol)
+                count = rng.randint(1, 4)
+                product.append(f"{symbol}{count}" if count > 1 else symbol)
+            reactions.append(f"{' + '.join(reactants)} -> {''.join(product)}")
+    return reactions
+
+def fallback_reactions() -> List[str]:
+    # Anggota terkecil tiap deret FALLBACK_SERIES yang diteruskan ke jalur
+    # cadangan dan diselesaikan chempy dalam batas waktunya
+    found = []
+    for pattern, oxidant, products in FALLBACK_SERIES:
+        for size in FALLBACK_SIZES:
+            reactants = [pattern.format(i, i + 1) for i in range(1, size + 1)] + [oxidant]
+            if not core.reaches_fallback(reactants, products):
+                continue
+            result = core.balance_fallback(reactants, products)
+            if result.ok and core.verified(result):
+                found.append(f"{' + '.join(reactants)} -> {' + '.join(products)}")
+            break
+    return found
+
+def split_balanced(reactions: Iterable[str]) -> Tuple[List[str], List[str]]:
+    # (disetarakan mesin bilangan bulat dan lolos verifikasi, sisanya)
+    balanced, rejected = [], []
+    for reaction in reactions:
+        reactants, products = core.parse_reaction(reaction)
+        result = core.balance(reactants, products)
+        engine = result.ok and result.solver not in (core.SOLVER_CHEMPY, core.SOLVER_TOO_COMPLEX)
+        (balanced if engine and core.verified(result) else rejected).append(reaction)
+    return balanced, rejected
+
+def write_corpus() -> None:
+    # Korpus default hanya berisi reaksi yang disetarakan mesin bilangan bulat;
+    # kasus jalur cadangan dan reaksi mustahil ada di korpus `fallback` terpisah
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    textbook, rejected = split_balanced(textbook_reactions())
+    fallback = [
+        "# Reaksi yang sengaja keluar dari mesin bilangan bulat; tidak termasuk",
+        "# korpus default. Ukur dengan: python benchmark.py --corpus fallback",
+        "# Diserahkan ke chempy (enumerasi melewati batas waktu; ambangnya",
+        "# bergantung pada kecepatan mesin, buat ulang dengan --write-corpus):",
+        *fallback_reactions(),
+        "# Tidak bisa disetarakan (kandidat buku teks yang ditolak), jalur galat:",
+        *rejected,
+    ]
+    for name, reactions in (('readme', README_REACTIONS), ('textbook', textbook),
+                            ('synthetic', synthetic_reactions()), ('fallback', fallback)):
+        with open(os.path.join(CORPUS_DIR, f"{name}.txt"), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(reactions) + '\n')
+        print(f"{name}: {sum(1 for r in reactions if not r.startswith('#'))} reaksi")
+
+def load_corpus(names: Iterable[str]) -> List[Tuple[str, str]]:
+    corpus = []
+    for name in names:
+        with open(os.path.join(CORPUS_DIR, f"{name}.txt"), encoding='utf-8') as f:
+            corpus += [(name, line.strip()) for line in f if line.strip() and not line.startswith('#')]
+    return corpus
+
+def clear_caches() -> None:
+    # Ukur kondisi dingin: semua cache parsing dan hasil dikosongkan
+    species._intern.cache_clear()
+    species._parse.cache_clear()
+    oxidation._assign.cache_clear()
+    oxidation._assign_fragments.cache_clear()
+    core.result_cache.clear()
+
+def _stages(reaction: str) -> List[Tuple[str, Callable[[], bool]]]:
+    # Tahap pipeline yang diukur terpisah, berurutan seperti core.balance;
+    # tahap yang mengembalikan True mengakhiri pipeline (jalan pintas cocok)
+    state: Dict[str, object] = {}
+
+    def parse():
+        state['reactants'], state['products'] = core.parse_reaction(reaction)
+
+    def shortcut():
+        return bool(shortcut_rules.lookup(state['reactants'], state['products']))
+
+    def oxidation_states():
+        state['r_sites'] = [core.get_oxidation_sites(r) for r in state['reactants']]
+        state['p_sites'] = [core.get_oxidation_sites(p) for p in state['products']]
+
+    def half_reaction():
+        oxidations, reductions = core.find_couples(state['reactants'], state['products'],
+                                                   state['r_sites'], state['p_sites'])
+        state['plan'] = core.plan_from_couples(state['reactants'], state['products'], oxidations, reductions)
+
+    def solve():
+        # Mesin bilangan bulat atas rencana yang sudah ada, tanpa jalur cadangan
+        plan = state['plan']
+        try:
+            left, right = balance_equation(plan.reactants, plan.products, plan.electron_row)
+            core.finish_balance(plan, left, right)
+        except BalanceError:
+            core.balance_underdetermined(plan)
+
+    return [('parse', parse), ('shortcut', shortcut), ('oxidation', oxidation_states),
+            ('half-reaction', half_reaction), ('solve', solve)]
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+def run(corpus: List[Tuple[str, str]], repeat: int, warm: bool, memory: bool) -> Dict[str, Dict[str, float]]:
+    timings: Dict[str, List[float]] = defaultdict(list)
+    peaks: Dict[str, float] = defaultdict(float)
+    for _ in range(repeat):
+        for _, reaction in corpus:
+            if not warm:
+                clear_caches()
+            try:
+                for stage, fn in _stages(reaction):
+                    start = time.perf_counter()
+                    done = fn()
+                    timings[f"stage.{stage}"].append(time.perf_counter() - start)
+                    if done:
+                        break
+            except ValueError:
+                continue
+            # Latensi ujung-ke-ujung per jalur solver (termasuk cadangan chempy)
+            if not warm:
+                clear_caches()
+            reactants, products = core.parse_reaction(reaction)
+            start = time.perf_counter()
+            result = core.balance(reactants, products)
+            timings[f"path.{result.solver}"].append(time.perf_counter() - start)
+
+    if memory:
+        # Putaran terpisah dengan tracemalloc agar tidak mengganggu waktu
+        tracemalloc.start()
+        for _, reaction in corpus:
+            clear_caches()
+            try:
+                for stage, fn in _stages(reaction):
+                    tracemalloc.reset_peak()
+                    base = tracemalloc.get_traced_memory()[0]
+                    done = fn()
+                    peaks[f"stage.{stage}"] = max(peaks[f"stage.{stage}"],
+                                                  tracemalloc.get_traced_memory()[1] - base)
+                    if done:
+                        break
+            except ValueError:
+                continue
+            # Puncak per jalur solver; memori subprocess chempy tidak terlacak
+            clear_caches()
+            reactants, products = core.parse_reaction(reaction)
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            result = core.balance(reactants, products)
+            peaks[f"path.{result.solver}"] = max(peaks[f"path.{result.solver}"],
+                                                 tracemalloc.get_traced_memory()[1] - base)
+        tracemalloc.stop()
+
+    report = {}
+    for name, values in sorted(timings.items()):
+        report[name] = {
+            'count': len(values),
+            'p50_us': percentile(values, 0.50) * 1e6,
+            'p99_us': percentile(values, 0.99) * 1e6,
+        }
+        if name in peaks:
+            report[name]['peak_kib'] = peaks[name] / 1024
+    return report
+
+def batch_comparison(corpus: List[Tuple[str, str]], repeat: int) -> Dict[str, float]:
+    # Waktu total core.balance satu per satu vs vectorized.balance_many untuk
+    # reaksi unik korpus. Cache parsing dikosongkan sebelum setiap putaran,
+    # dan dari setiap jalur diambil putaran tercepat.
+    from vectorized import balance_many
+    reactions = []
+    for _, reaction in corpus:
+        try:
+            reactions.append(core.parse_reaction(reaction))
+        except ValueError:
+            continue
+    reactions = list({(tuple(r), tuple(p)): (r, p) for r, p in reactions}.values())
+    times: Dict[str, List[float]] = defaultdict(list)
+    for _ in range(repeat):
+        for name, fn in (('loop', lambda: [core.balance(r, p) for r, p in reactions]),
+                         ('batch', lambda: balance_many(reactions))):
+            clear_caches()
+            start = time.perf_counter()
+            fn()
+            times[name].append(time.perf_counter() - start)
+    loop, batch = min(times['loop']), min(times['batch'])
+    return {'reactions': len(reactions), 'loop_s': loop, 'batch_s': batch, 'speedup': loop / batch if batch else 0.0}
+
+def compare(report: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float, min_delta_us: float) -> List[str]:
+    # Regresi: metrik lebih lambat dari baseline * (1 + threshold) dan selisihnya
+    # melebihi min_delta_us (menyaring derau untuk tahap yang sangat cepat)
+    failures = []
+    for name, metrics in report.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for key in ('p50_us', 'p99_us'):
+            current, previous = metrics.get(key, 0.0), base.get(key, 0.0)
+            if current > previous * (1 + threshold) and current - previous > min_delta_us:
+                failures.append(f"{name} {key}: {current:.1f} µs (baseline {previous:.1f} µs)")
+        if 'peak_kib' in metrics and 'peak_kib' in base and metrics['peak_kib'] > base['peak_kib'] * (1 + threshold):
+            failures.append(f"{name} peak_kib: {metrics['peak_kib']:.1f} KiB (baseline {base['peak_kib']:.1f} KiB)")
+    return failures
+
+def print_report(report: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'metrik':<24}{'n':>7}{'p50 µs':>12}{'p99 µs':>12}{'puncak KiB':>12}")
+    for name, metrics in report.items():
+        peak = f"{metrics['peak_kib']:.1f}" if 'peak_kib' in metrics else '-'
+        print(f"{name:<24}{metrics['count']:>7}{metrics['p50_us']:>12.1f}{metrics['p99_us']:>12.1f}{peak:>12}")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark tahap penyetaraan dengan gerbang regresi.")
+    parser.add_argument('--corpus', nargs='+', default=['readme', 'textbook', 'synthetic'],
+                        help="nama korpus di bench/corpus (default: readme textbook synthetic; "
+                             "fallback berisi kasus jalur cadangan)")
+    parser.add_argument('--repeat', type=int, default=3, help="jumlah pengulangan korpus")
+    parser.add_argument('--warm', action='store_true', help="jangan kosongkan cache antar reaksi")
+    parser.add_argument('--no-memory', action='store_true', help="lewati pengukuran memori puncak")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="berkas baseline JSON")
+    parser.add_argument('--save-baseline', action='store_true', help="simpan hasil sebagai baseline baru")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="batas kenaikan relatif sebelum dianggap regresi (default 0.25)")
+    parser.add_argument('--min-delta-us', type=float, default=5.0,
+                        help="selisih absolut minimal untuk dianggap regresi (default 5 µs)")
+    parser.add_argument('--json', help="tulis laporan JSON ke berkas ini")
+    parser.add_argument('--write-corpus', action='store_true', help="buat ulang berkas korpus lalu keluar")
+    parser.add_argument('--batch', action='store_true',
+                        help="bandingkan core.balance per reaksi dengan vectorized.balance_many lalu keluar")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.write_corpus:
+        write_corpus()
+        return 0
+
+    corpus = load_corpus(args.corpus)
+    if args.batch:
+        comparison = batch_comparison(corpus, max(1, args.repeat))
+        print(f"{comparison['reactions']} reaksi unik: satu per satu {comparison['loop_s'] * 1e3:.1f} ms, "
+              f"balance_many {comparison['batch_s'] * 1e3:.1f} ms ({comparison['speedup']:.2f}x)")
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(comparison, f, indent=2)
+        return 0
+    report = run(corpus, max(1, args.repeat), args.warm, not args.no_memory)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline disimpan ke {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        # Gerbang tanpa baseline tidak memeriksa apa pun; jangan anggap lolos
+        print(f"\nBaseline {args.baseline} tidak ada; jalankan dengan --save-baseline untuk membuatnya")
+        return 1
+    with open(args.baseline, encoding='utf-8') as f:
+        failures = compare(report, json.load(f), args.threshold, args.min_delta_us)
+    if failures:
+        print("\nRegresi terdeteksi:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nTidak ada regresi terhadap baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+from species import split_reaction
+
+# Batas jumlah hasil dan umur (detik) setiap entri di cache hasil
+RESULT_CACHE_SIZE = 2048
+RESULT_CACHE_TTL = 3600.0
+
+def canonical_reaction(reaction: str) -> str:
+    # Bentuk kanonik reaksi: ejaan ion diseragamkan (process_ion), spasi
+    # dinormalisasi dan spesies diurutkan di tiap sisi.
+    return canonical_key(*split_reaction(reaction))
+
+def canonical_key(reactants: List[str], products: List[str]) -> str:
+    # Bentuk kanonik dari reaksi yang sudah diparse
+    return f"{' + '.join(sorted(reactants))} -> {' + '.join(sorted(products))}"
+
+class ResultCache:
+    # Cache LRU dengan TTL yang aman dipakai banyak thread. Satu instance di
+    # level modul dibagi oleh semua sesi Streamlit dalam proses yang sama.
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._data), 'maxsize': self.maxsize}
+
+result_cache = ResultCache()
@@ -0,0 +1,635 @@
+import math
+import re
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import fallback
+import metrics
+from library import ReactionLibrary, open_default_library
+from balancer import BalanceError, IncrementalBalancer, balance_equation, enumerate_balances, format_equation, is_balanced, to_basic
+from cache import canonical_key, result_cache
+from rules import Terms, shortcut_rules
+from species import Species, split_reaction
+
+# Inti penyetaraan tanpa Streamlit. Semua fungsi di sini murni: hasil
+# dikembalikan sebagai objek BalanceResult dan lapisan UI (redoks.py),
+# mode batch maupun layanan lain cukup menampilkannya sekali.
+
+# Suku persamaan: (formula, koefisien)
+Term = Tuple[str, int]
+# Bilangan oksidasi satu unsur per keadaan: ((biloks, jumlah atom), ...)
+Sites = Tuple[Tuple[int, int], ...]
+
+# Versi solver; naikkan setiap kali hasil penyetaraan bisa berubah agar entri
+# lama di penyimpanan persisten tidak dipakai lagi
+SOLVER_VERSION = '12'
+
+# Penyimpanan persisten opsional di belakang cache proses (lihat store.py)
+persistent_store = None
+
+# Nama jalur solver yang menghasilkan jawaban
+SOLVER_SHORTCUT = 'shortcut'
+SOLVER_HALF_REACTION = 'half-reaction'
+SOLVER_STOICHIOMETRY = 'stoichiometry'
+SOLVER_CHEMPY = 'chempy'
+# Ruang nol berdimensi lebih dari satu: solusi minimal paling sederhana,
+# solusi minimal lain ada di BalanceResult.alternatives
+SOLVER_ENUMERATED = 'enumerated'
+SOLVER_FAILED = 'failed'
+# Jalur cadangan dihentikan karena melewati batas waktu atau memori
+SOLVER_TOO_COMPLEX = 'too-complex'
+
+# Hasil tidak setara dan solver eksak juga tidak menemukan solusi
+UNBALANCED_MESSAGE = "Hasil penyetaraan tidak setara dan solver eksak tidak menemukan solusi tunggal"
+
+# Pesan galat chempy (bahasa Inggris) dipetakan ke pesan aplikasi; komponen
+# chempy berupa nomor atom, dengan 0 untuk muatan
+CHEMPY_MESSAGES = (
+    (re.compile(r"Component '(\d+)' not among products"), "{component} hanya ada di sisi reaktan"),
+    (re.compile(r"Component '(\d+)' not among reactants"), "{component} hanya ada di sisi produk"),
+    (re.compile(r"Substances on both sides"), "Spesies yang sama muncul di kedua sisi reaksi"),
+    (re.compile(r"reactants and products identical"), "Reaktan dan produk identik"),
+    (re.compile(r"Superfluous species"), "Ada spesies yang tidak bisa ikut dalam reaksi setara"),
+)
+CHEMPY_DEFAULT_MESSAGE = "Reaksi tidak dapat disetarakan"
+
+TOO_COMPLEX_MESSAGES = {
+    fallback.LIMIT_TIME: "Reaksi terlalu kompleks: jalur cadangan melebihi batas waktu",
+    fallback.LIMIT_MEMORY: "Reaksi terlalu kompleks: jalur cadangan melebihi batas memori",
+    fallback.LIMIT_BUSY: "Jalur cadangan sedang sibuk, coba lagi nanti",
+}
+
+# Suasana larutan. Solver selalu bekerja dalam suasana asam (H2O/H^+);
+# bentuk basa dan netral diturunkan dari vektor koefisien yang sama
+MEDIUM_ACIDIC = 'acidic'
+MEDIUM_BASIC = 'basic'
+MEDIUM_NEUTRAL = 'neutral'
+MEDIA = (MEDIUM_ACIDIC, MEDIUM_BASIC, MEDIUM_NEUTRAL)
+MEDIUM_LABELS = {MEDIUM_BASIC: 'suasana basa', MEDIUM_NEUTRAL: 'suasana netral'}
+
+# Biloks H dan O yang juga tersedia dari H2O/H^+ (lihat find_couples)
+SPECTATOR_STATES = {'H': 1, 'O': -2}
+
+@dataclass(frozen=True)
+class HalfReaction:
+    reactant: str
+    product: str
+    element: str
+    change: int
+    reactant_count: int
+    product_count: int
+
+@dataclass(frozen=True)
+class BalanceResult:
+    reactants: Tuple[Term, ...] = ()
+    products: Tuple[Term, ...] = ()
+    solver: str = SOLVER_FAILED
+    # Semua pasangan redoks yang ditemukan (bisa lebih dari satu per sisi)
+    oxidations: Tuple[HalfReaction, ...] = ()
+    reductions: Tuple[HalfReaction, ...] = ()
+    electrons: Optional[int] = None
+    error: Optional[str] = None
+    medium: str = MEDIUM_ACIDIC
+    # Solusi minimal lain (reaktan, produk) untuk reaksi yang tidak tunggal
+    alternatives: Tuple[Tuple[Tuple[Term, ...], Tuple[Term, ...]], ...] = ()
+    # Detail debug (bilangan oksidasi, spesies tak dikenal); hanya diisi jika diminta
+    debug: Optional[Dict[str, Any]] = field(default=None, compare=False)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def cacheable(self) -> bool:
+        # Penolakan karena jalur cadangan sibuk bersifat sementara, jangan di-cache.
+        # Hasil jalan pintas juga tidak: tabel aturan bisa dimuat ulang dan
+        # selalu dicek sebelum cache.
+        if self.solver == SOLVER_SHORTCUT:
+            return False
+        return not (self.solver == SOLVER_TOO_COMPLEX and self.error == TOO_COMPLEX_MESSAGES[fallback.LIMIT_BUSY])
+
+    @property
+    def oxidation(self) -> Optional[HalfReaction]:
+        # Pasangan oksidasi utama (yang pertama ditemukan)
+        return self.oxidations[0] if self.oxidations else None
+
+    @property
+    def reduction(self) -> Optional[HalfReaction]:
+        return self.reductions[0] if self.reductions else None
+
+    @property
+    def equation(self) -> str:
+        return format_equation(self.reactants, self.products)
+
+    def coefficients(self) -> Dict[str, int]:
+        return {f: c for f, c in self.reactants + self.products}
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Bentuk JSON (tanpa detail debug) untuk penyimpanan dan layanan
+        return {
+            'reactants': [list(t) for t in self.reactants],
+            'products': [list(t) for t in self.products],
+            'solver': self.solver,
+            'oxidations': [asdict(h) for h in self.oxidations],
+            'reductions': [asdict(h) for h in self.reductions],
+            'electrons': self.electrons,
+            'error': self.error,
+            'medium': self.medium,
+            'alternatives': [[[list(t) for t in left], [list(t) for t in right]] for left, right in self.alternatives],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BalanceResult':
+        return cls(
+            tuple((f, int(c)) for f, c in data.get('reactants', ())),
+            tuple((f, int(c)) for f, c in data.get('products', ())),
+            data.get('solver', SOLVER_FAILED),
+            tuple(HalfReaction(**h) for h in data.get('oxidations') or ()),
+            tuple(HalfReaction(**h) for h in data.get('reductions') or ()),
+            data.get('electrons'),
+            data.get('error'),
+            data.get('medium', MEDIUM_ACIDIC),
+            tuple((tuple((f, int(c)) for f, c in left), tuple((f, int(c)) for f, c in right))
+                  for left, right in data.get('alternatives') or ()),
+        )
+
+    def in_medium(self, medium: str) -> 'BalanceResult':
+        # Bentuk hasil untuk suasana lain, diturunkan dari hasil suasana asam
+        # tanpa menjalankan solver lagi. Suasana netral: H^+ atau OH^- hanya
+        # boleh muncul sebagai produk, jadi dipilih bentuk asam atau basa yang
+        # memenuhi.
+        if medium not in MEDIA:
+            raise ValueError(f"Suasana tidak dikenal: {medium}")
+        if not self.ok or medium == self.medium:
+            return self
+        if self.medium != MEDIUM_ACIDIC:
+            raise ValueError("Konversi suasana hanya dari hasil suasana asam")
+        left, right = _convert_medium(self.reactants, self.products, medium)
+        alternatives = tuple(_convert_medium(l, r, medium) for l, r in self.alternatives)
+        return replace(self, reactants=left, products=right, alternatives=alternatives, medium=medium)
+
+    def in_order(self, reactants: Sequence[str], products: Sequence[str]) -> 'BalanceResult':
+        # Hasil bersama satu bentuk kanonik (cache, pustaka, penyimpanan) untuk
+        # reaksi yang diketik dengan urutan spesies lain: suku tiap sisi
+        # mengikuti urutan input pemanggil, spesies bantu tetap di belakang
+        def arrange(terms: Tuple[Term, ...], species: Sequence[str]) -> Tuple[Term, ...]:
+            rank: Dict[str, int] = {}
+            for position, formula in enumerate(species):
+                rank.setdefault(formula, position)
+            return tuple(sorted(terms, key=lambda term: rank.get(term[0], len(species))))
+
+        left, right = arrange(self.reactants, reactants), arrange(self.products, products)
+        alternatives = tuple((arrange(l, reactants), arrange(r, products)) for l, r in self.alternatives)
+        if (left, right, alternatives) == (self.reactants, self.products, self.alternatives):
+            return self
+        return replace(self, reactants=left, products=right, alternatives=alternatives)
+
+    def format(self) -> str:
+        # Teks hasil seperti yang ditampilkan di aplikasi
+        with metrics.span(metrics.STAGE_FORMATTING):
+            return self._format()
+
+    def _format(self) -> str:
+        if not self.ok:
+            return f"Gagal menyetarakan reaksi: {self.error}"
+        tags = ["stoikiometri"] if self.solver in (SOLVER_STOICHIOMETRY, SOLVER_CHEMPY) else []
+        if self.solver == SOLVER_ENUMERATED:
+            tags.append("solusi paling sederhana")
+        if self.medium in MEDIUM_LABELS:
+            tags.append(MEDIUM_LABELS[self.medium])
+        header = f"Reaksi setara ({', '.join(tags)}):" if tags else "Reaksi setara:"
+        result = [header, self.equation]
+        if self.alternatives:
+            result.append("\nSolusi lain:")
+            result.extend(format_equation(left, right) for left, right in self.alternatives)
+        if self.oxidations and self.reductions:
+            result.append("\nPenjelasan:")
+            for half in self.oxidations:
+                result.append(f"Oksidasi: {half.reactant} -> {half.product} + {half.change}e-")
+            for half in self.reductions:
+                result.append(f"Reduksi: {half.reactant} + {half.change}e- -> {half.product}")
+            result.append(f"KPK elektron: {self.electrons}")
+        return "\n".join(result)
+
+def _convert_medium(left: Sequence[Term], right: Sequence[Term], medium: str
+                    ) -> Tuple[Tuple[Term, ...], Tuple[Term, ...]]:
+    # Suasana netral: H^+ atau OH^- hanya boleh muncul sebagai produk
+    if medium == MEDIUM_BASIC or any(f == 'H^+' for f, _ in left):
+        left, right = to_basic(left, right)
+    return tuple(left), tuple(right)
+
+def get_oxidation_state(species: str) -> Dict[str, int]:
+    # Fungsi untuk mendapatkan bilangan oksidasi (dihitung sekali per spesies)
+    return dict(Species.get(species).oxidation_states)
+
+def get_oxidation_sites(species: str) -> Dict[str, Tuple[Tuple[int, int], ...]]:
+    # Bilangan oksidasi per keadaan: {unsur: ((biloks, jumlah atom), ...)}
+    return dict(Species.get(species).oxidation_sites)
+
+def parse_reaction(reaction: str) -> Tuple[List[str], List[str]]:
+    with metrics.span(metrics.STAGE_PARSE):
+        return split_reaction(reaction)
+
+def is_redox_reaction(reactants: List[str], products: List[str]) -> bool:
+    # Cek apakah ada ion dalam reaksi
+    has_ions = any('^' in r or r.endswith('+') or r.endswith('-') for r in reactants + products)
+    if has_ions:
+        return True
+
+    # Cek perubahan bilangan oksidasi untuk senyawa non-ion
+    reactant_states = [get_oxidation_state(r) for r in reactants]
+    product_states = [get_oxidation_state(p) for p in products]
+
+    # Bandingkan bilangan oksidasi
+    for i, r in enumerate(reactants):
+        for element, r_state in reactant_states[i].items():
+            for j, p in enumerate(products):
+                if element in product_states[j]:
+                    p_state = product_states[j][element]
+                    if r_state != p_state:
+                        return True
+    return False
+
+def balance_with_chempy(reactants: List[str], products: List[str]) -> BalanceResult:
+    # Jalur cadangan simbolik (chempy/sympy) untuk reaksi yang ditolak mesin bilangan bulat.
+    # Dalam praktik ini reaksi dengan banyak solusi yang melewati batas waktu
+    # enumerasi, jadi chempy diminta koefisien bulat positif terkecil
+    # (underdetermined=None, program bilangan bulat lewat pulp).
+    # chempy (dan sympy di belakangnya) baru diimpor saat jalur ini pertama kali dipakai.
+    from chempy import balance_stoichiometry
+
+    # Konversi format ion untuk chempy
+    def convert_for_chempy(species):
+        if '^' in species:
+            base, charge = species.split('^')
+            if charge.endswith('+'):
+                return f"{base}+{charge[:-1]}" if charge[:-1] else f"{base}+"
+            elif charge.endswith('-'):
+                return f"{base}-{charge[:-1]}" if charge[:-1] else f"{base}-"
+        return species
+
+    # H2O dan H^+ hanya ditambahkan bila reaksi tanpa keduanya tidak bisa
+    # disetarakan, dan hanya jika unsurnya memang ada di reaksi. chempy hanya
+    # menerima koefisien positif, jadi setiap sisi dicoba bergantian.
+    compositions = [Species.get(s).composition for s in reactants + products]
+    auxiliaries = [aux for aux, elements in (('H2O', 'O'), ('H^+', 'HO'))
+                   if aux not in reactants + products and any(e in c for c in compositions for e in elements)]
+    placements: List[Tuple[List[str], List[str]]] = [([], [])]
+    for aux in auxiliaries:
+        placements = [(left + side_left, right + side_right) for left, right in placements
+                      for side_left, side_right in (([], []), ([aux], []), ([], [aux]))]
+    placements.sort(key=lambda p: len(p[0]) + len(p[1]))
+
+    def terms(species: List[str], balanced: Dict[str, int]) -> Tuple[Term, ...]:
+        # Urutan suku mengikuti input, bukan urutan set chempy
+        return tuple((s, int(balanced[convert_for_chempy(s)])) for s in dict.fromkeys(species)
+                     if balanced.get(convert_for_chempy(s)))
+
+    error: Optional[Exception] = None
+    for extra_left, extra_right in placements:
+        left, right = reactants + extra_left, products + extra_right
+        try:
+            reac_bal, prod_bal = balance_stoichiometry({convert_for_chempy(s) for s in left},
+                                                       {convert_for_chempy(s) for s in right},
+                                                       underdetermined=None)
+        except Exception as e:
+            error = e
+            continue
+        return BalanceResult(terms(left, reac_bal), terms(right, prod_bal), SOLVER_CHEMPY)
+    return BalanceResult(error=chempy_error_message(error))
+
+def chempy_error_message(error: Optional[Exception]) -> str:
+    # Pesan galat chempy dalam bahasa aplikasi (lihat CHEMPY_MESSAGES)
+    from chempy.util.periodic import symbols
+
+    for pattern, message in CHEMPY_MESSAGES:
+        match = pattern.search(str(error))
+        if match:
+            if not match.groups():
+                return message
+            number = int(match.group(1))
+            component = 'Muatan' if number == 0 else f"Unsur {symbols[number - 1]}"
+            return message.format(component=component)
+    return CHEMPY_DEFAULT_MESSAGE
+
+def balance_fallback(reactants: List[str], products: List[str]) -> BalanceResult:
+    # Jalur cadangan chempy; secara default di subprocess terisolasi dengan
+    # batas waktu dan memori (lihat fallback.py)
+    if not fallback.enabled():
+        return balance_with_chempy(reactants, products)
+    kind, payload = fallback.default_pool().run(reactants, products)
+    if kind == 'ok':
+        return BalanceResult.from_dict(payload)
+    return BalanceResult(solver=SOLVER_TOO_COMPLEX, error=TOO_COMPLEX_MESSAGES[payload])
+
+def find_couples(reactants: List[str], products: List[str],
+                 reactant_sites: List[Mapping[str, Sites]], product_sites: List[Mapping[str, Sites]]
+                 ) -> Tuple[List[HalfReaction], List[HalfReaction]]:
+    # Semua pasangan oksidasi dan reduksi. Indeks unsur -> produk dibangun
+    # sekali sehingga setiap unsur reaktan hanya dibandingkan dengan produk
+    # yang memang mengandungnya (O(jumlah atom) untuk reaksi biasa).
+    # Disproporsionasi muncul sebagai pasangan oksidasi dan reduksi dari
+    # reaktan yang sama. Unsur dengan beberapa keadaan dalam satu spesies
+    # (get_oxidation_sites) dipasangkan per keadaan, sehingga komproporsionasi
+    # seperti NH4NO3 -> N2O + H2O (N -3 dan +5 menjadi +1) ikut terdeteksi.
+    index: Dict[str, List[Tuple[str, int, int]]] = {}
+    for p, sites in zip(products, product_sites):
+        for element, states in sites.items():
+            for state, atoms in states:
+                index.setdefault(element, []).append((p, state, atoms))
+
+    # Kumpulkan semua sumber (reaktan, biloks) untuk setiap unsur di tiap produk.
+    # Di reaktan dengan beberapa keadaan untuk satu unsur, keadaan yang juga
+    # ada di produk tidak berubah (Fe +3 di Fe3O4 -> Fe^3+, kedua gugus
+    # NH4NO3 -> NH4^+ + NO3^-); hanya keadaan lainnya yang dipasangkan
+    sources: Dict[Tuple[str, str], List[Tuple[str, int, int, int, int]]] = {}
+    for r, sites in zip(reactants, reactant_sites):
+        for element, states in sites.items():
+            if len(states) > 1:
+                unchanged = {state for _, state, _ in index.get(element, ())}
+                states = tuple(site for site in states if site[0] not in unchanged)
+            for r_state, r_atoms in states:
+                for p, p_state, p_atoms in index.get(element, ()):
+                    sources.setdefault((p, element), []).append((r, r_state, p_state, r_atoms, p_atoms))
+
+    # Satu unsur di satu produk bisa berasal dari beberapa reaktan. Tidak ada
+    # pasangan jika salah satu sumber sudah berbiloks sama; H(+1) dan O(-2)
+    # (bentuk yang juga dipasok H2O/H^+) hanya dipakai jika tidak ada sumber
+    # lain; dari sisanya dipilih perubahan terkecil per arah (mis. O2 dari
+    # H2O2, bukan dari oksigen oksida di ClO^-)
+    chosen: Dict[Tuple[str, str, bool], HalfReaction] = {}
+    for (p, element), candidates in sources.items():
+        if any(r_state == p_state for _, r_state, p_state, _, _ in candidates):
+            continue
+        active = [c for c in candidates if SPECTATOR_STATES.get(element) != c[1]] or candidates
+        for r, r_state, p_state, r_atoms, p_atoms in active:
+            key = (p, element, p_state > r_state)
+            current = chosen.get(key)
+            if current is None or abs(p_state - r_state) < current.change:
+                chosen[key] = HalfReaction(r, p, element, abs(p_state - r_state), r_atoms, p_atoms)
+    oxidations = [half for (_, _, oxidized), half in chosen.items() if oxidized]
+    reductions = [half for (_, _, oxidized), half in chosen.items() if not oxidized]
+    return oxidations, reductions
+
+def electrons_per_species(couples: List[HalfReaction]) -> Dict[str, int]:
+    # Elektron per satuan rumus tiap reaktan; satu tujuan per (reaktan, unsur)
+    seen = set()
+    totals: Dict[str, int] = {}
+    for half in couples:
+        if (half.reactant, half.element) in seen:
+            continue
+        seen.add((half.reactant, half.element))
+        totals[half.reactant] = totals.get(half.reactant, 0) + half.change * half.reactant_count
+    return totals
+
+@dataclass
+class BalancePlan:
+    # Semua yang dibutuhkan sebelum menyelesaikan sistem koefisien
+    reactants: List[str]
+    products: List[str]
+    oxidations: List[HalfReaction] = field(default_factory=list)
+    reductions: List[HalfReaction] = field(default_factory=list)
+    electrons: Optional[int] = None
+    electron_row: Optional[Dict[str, int]] = None
+    debug: Optional[Dict[str, Any]] = None
+
+class BalanceSession:
+    # Status penyetaraan satu sesi pengguna: faktorisasi matriks komposisi dan
+    # bilangan oksidasi spesies reaksi terakhir. Mengedit satu spesies hanya
+    # memperbarui kolom yang berubah dan tidak menghitung ulang spesies lain.
+    def __init__(self):
+        self.balancer = IncrementalBalancer()
+        self._sites: Dict[str, Dict[str, Sites]] = {}
+
+    def oxidation_sites(self, reactants: List[str], products: List[str]
+                        ) -> Tuple[List[Dict[str, Sites]], List[Dict[str, Sites]]]:
+        # Hanya spesies reaksi terakhir yang disimpan
+        sites = {f: self._sites[f] if f in self._sites else get_oxidation_sites(f)
+                 for f in reactants + products}
+        self._sites = sites
+        return [sites[f] for f in reactants], [sites[f] for f in products]
+
+def shortcut_result(reactants: List[str], products: List[str], shortcut: Terms) -> BalanceResult:
+    # Aturan cocok tanpa memandang urutan; suku disusun mengikuti input
+    return BalanceResult(shortcut[0], shortcut[1], SOLVER_SHORTCUT).in_order(reactants, products)
+
+def plan_balance(reactants: List[str], products: List[str], debug: bool = False,
+                 session: Optional[BalanceSession] = None, shortcuts: bool = True
+                 ) -> Union[BalanceResult, BalancePlan]:
+    # Tahap sebelum solver: jalan pintas, bilangan oksidasi dan setengah reaksi.
+    # Mengembalikan BalanceResult langsung jika jalan pintas cocok.
+    shortcut = shortcut_rules.lookup(reactants, products) if shortcuts else None
+    if shortcut:
+        return shortcut_result(reactants, products, shortcut)
+
+    # 1. Dapatkan bilangan oksidasi untuk setiap spesies
+    with metrics.span(metrics.STAGE_OXIDATION):
+        if session is not None:
+            reactant_sites, product_sites = session.oxidation_sites(reactants, products)
+        else:
+            reactant_sites = [get_oxidation_sites(r) for r in reactants]
+            product_sites = [get_oxidation_sites(p) for p in products]
+    details = None
+    if debug:
+        details = {
+            'reactants': list(reactants),
+            'products': list(products),
+            'reactant_states': [get_oxidation_state(r) for r in reactants],
+            'product_states': [get_oxidation_state(p) for p in products],
+            'unknown_species': [s for s, sites in zip(reactants + products, reactant_sites + product_sites)
+                                if not sites],
+        }
+
+    # 2. Identifikasi semua pasangan oksidasi dan reduksi
+    with metrics.span(metrics.STAGE_PAIRING):
+        oxidations, reductions = find_couples(reactants, products, reactant_sites, product_sites)
+
+    return plan_from_couples(reactants, products, oxidations, reductions, details)
+
+def plan_from_couples(reactants: List[str], products: List[str], oxidations: List[HalfReaction],
+                      reductions: List[HalfReaction], details: Optional[Dict[str, Any]] = None) -> BalancePlan:
+    # Jika masih tidak terdeteksi redoks, setarakan sebagai stoikiometri biasa
+    if not oxidations or not reductions:
+        return BalancePlan(reactants, products, debug=details)
+
+    # 3. KPK elektron per satuan rumus dari semua spesies yang dioksidasi dan direduksi
+    lcm = 1
+    for total in list(electrons_per_species(oxidations).values()) + list(electrons_per_species(reductions).values()):
+        lcm = lcm * total // math.gcd(lcm, total)
+
+    # 4. Baris elektron (total elektron dilepas = total elektron diterima, dihitung
+    # di kolom produk) untuk memilih solusi jika ruang nol tidak tunggal
+    electron_row: Dict[str, int] = {}
+    for sign, couples in ((1, oxidations), (-1, reductions)):
+        for half in couples:
+            electron_row[half.product] = electron_row.get(half.product, 0) + sign * half.change * half.product_count
+    return BalancePlan(reactants, products, oxidations, reductions, lcm, electron_row, details)
+
+def finish_balance(plan: BalancePlan, left: List[Term], right: List[Term]) -> BalanceResult:
+    if plan.oxidations and plan.reductions:
+        return BalanceResult(tuple(left), tuple(right), SOLVER_HALF_REACTION,
+                             tuple(plan.oxidations), tuple(plan.reductions), plan.electrons, debug=plan.debug)
+    return BalanceResult(tuple(left), tuple(right), SOLVER_STOICHIOMETRY, debug=plan.debug)
+
+def balance(reactants: List[str], products: List[str], debug: bool = False,
+            session: Optional[BalanceSession] = None, shortcuts: bool = True) -> BalanceResult:
+    # Setarakan reaksi dan kembalikan hasil terstruktur; `debug` menambahkan
+    # detail bilangan oksidasi ke hasil, `session` memakai ulang faktorisasi
+    # reaksi sebelumnya di sesi yang sama. `shortcuts=False` melewati tabel
+    # jalan pintas, mis. karena known_result sudah memeriksanya.
+    try:
+        result = plan_balance(reactants, products, debug, session, shortcuts)
+        if isinstance(result, BalancePlan):
+            plan = result
+            # Setarakan atom dan muatan dengan mesin ruang nol bulat;
+            # H2O dan H^+ ditambahkan otomatis bila diperlukan
+            with metrics.span(metrics.STAGE_BALANCING):
+                try:
+                    solve = session.balancer.balance_equation if session is not None else balance_equation
+                    left, right = solve(reactants, products, plan.electron_row)
+                    result = finish_balance(plan, left, right)
+                except BalanceError:
+                    result = balance_underdetermined(plan) or balance_fallback(reactants, products)
+                    if result.solver == SOLVER_TOO_COMPLEX:
+                        metrics.count_failure(metrics.FAILURE_TOO_COMPLEX)
+                    elif not result.ok:
+                        metrics.count_failure(metrics.FAILURE_CHEMPY)
+        if not verified(result):
+            # Hasil yang tidak setara tidak pernah ditampilkan
+            metrics.count_failure(metrics.FAILURE_UNBALANCED)
+            result = balance_exact(reactants, products, debug, session)
+    except Exception as e:
+        metrics.count_failure(metrics.FAILURE_EXCEPTION)
+        result = BalanceResult(error=str(e))
+    metrics.count_path(result.solver)
+    return result
+
+def balance_underdetermined(plan: BalancePlan) -> Optional[BalanceResult]:
+    # Reaksi dengan banyak solusi (ruang nol berdimensi > 1): solusi minimal
+    # paling sederhana sebagai hasil utama, sisanya sebagai alternatif. None
+    # jika tidak ada solusi dalam batas waktu pencarian.
+    solutions = [(tuple(left), tuple(right))
+                 for left, right in enumerate_balances(plan.reactants, plan.products)
+                 if is_balanced(left, right)]
+    if not solutions:
+        return None
+    (left, right), alternatives = solutions[0], tuple(solutions[1:])
+    return BalanceResult(left, right, SOLVER_ENUMERATED, alternatives=alternatives, debug=plan.debug)
+
+def reaches_fallback(reactants: List[str], products: List[str]) -> bool:
+    # True jika reaksi lolos jalan pintas dan mesin bilangan bulat (termasuk
+    # enumerasi dalam batas waktunya) sehingga diteruskan ke jalur cadangan.
+    # Bergantung pada ENUMERATION_BUDGET dan kecepatan mesin.
+    plan = plan_balance(reactants, products)
+    if not isinstance(plan, BalancePlan):
+        return False
+    try:
+        balance_equation(reactants, products, plan.electron_row)
+        return False
+    except BalanceError:
+        return balance_underdetermined(plan) is None
+
+def verified(result: BalanceResult) -> bool:
+    # Hasil gagal lolos apa adanya; hasil berhasil harus setara unsur dan muatan
+    return not result.ok or all(is_balanced(left, right) for left, right
+                                in ((result.reactants, result.products),) + result.alternatives)
+
+def balance_exact(reactants: List[str], products: List[str], debug: bool = False,
+                  session: Optional[BalanceSession] = None) -> BalanceResult:
+    # Hanya mesin ruang nol bulat, tanpa jalan pintas maupun jalur cadangan;
+    # dipakai ketika hasil jalur lain tidak lolos verifikasi
+    plan = plan_balance(reactants, products, debug, session, shortcuts=False)
+    solve = session.balancer.balance_equation if session is not None else balance_equation
+    try:
+        left, right = solve(reactants, products, plan.electron_row)
+    except BalanceError:
+        return BalanceResult(error=UNBALANCED_MESSAGE, debug=plan.debug)
+    result = finish_balance(plan, left, right)
+    return result if verified(result) else BalanceResult(error=UNBALANCED_MESSAGE, debug=plan.debug)
+
+def balance_redox_reaction(reactants: List[str], products: List[str]) -> str:
+    # Antarmuka lama: hasil dalam bentuk teks
+    return balance(reactants, products).format()
+
+def set_persistent_store(store) -> None:
+    # Pasang penyimpanan persisten (store.ResultStore) di belakang cache proses;
+    # None menonaktifkannya
+    global persistent_store
+    persistent_store = store
+
+def reaction_library() -> Optional[ReactionLibrary]:
+    # Pustaka reaksi bawaan (library.py) yang cocok dengan versi solver ini
+    return open_default_library(SOLVER_VERSION)
+
+def known_result(reactants: List[str], products: List[str], key: str) -> Optional[BalanceResult]:
+    # Hasil suasana asam yang sudah ada untuk reaksi terparse dengan bentuk
+    # kanonik `key`: tabel jalan pintas, cache proses, pustaka bawaan, lalu
+    # penyimpanan persisten. None jika harus dihitung; karena tabel jalan
+    # pintas sudah diperiksa di sini, pemanggil menghitungnya dengan
+    # balance(..., shortcuts=False). Tabel dicek lebih dulu: aturan yang
+    # ditambah atau diubah lewat muat ulang shortcuts.json menang atas hasil
+    # lama. Hasil disimpan sekali per bentuk kanonik, jadi sukunya disusun
+    # ulang mengikuti urutan input pemanggil (BalanceResult.in_order).
+    shortcut = shortcut_rules.lookup(reactants, products)
+    if shortcut is not None:
+        result = shortcut_result(reactants, products, shortcut)
+        if verified(result):
+            metrics.count_path(SOLVER_SHORTCUT)
+            return result
+        # Aturan yang tidak setara diabaikan seperti tidak ada
+        metrics.count_failure(metrics.FAILURE_UNBALANCED)
+    cached = result_cache.get(key)
+    if cached is not None:
+        metrics.count_path(metrics.PATH_CACHE)
+        return cached.in_order(reactants, products)
+    library = reaction_library()
+    shipped = library.get(key) if library is not None else None
+    if shipped is not None:
+        result = BalanceResult.from_dict(shipped)
+        if verified(result):
+            metrics.count_path(metrics.PATH_LIBRARY)
+            result_cache.put(key, result)
+            return result.in_order(reactants, products)
+        metrics.count_failure(metrics.FAILURE_UNBALANCED)
+    if persistent_store is not None:
+        stored = persistent_store.get(key)
+        if stored is not None and not verified(stored):
+            metrics.count_failure(metrics.FAILURE_UNBALANCED)
+            stored = None
+        if stored is not None:
+            metrics.count_path(metrics.PATH_STORE)
+            result_cache.put(key, stored)
+            return stored.in_order(reactants, products)
+    return None
+
+def remember_result(key: str, result: BalanceResult) -> None:
+    # Simpan hasil suasana asam di cache proses dan penyimpanan persisten
+    if result.cacheable:
+        result_cache.put(key, result)
+        if persistent_store is not None and result.ok:
+            persistent_store.put(key, result)
+
+def balance_reaction(reaction: str, debug: bool = False, medium: str = MEDIUM_ACIDIC,
+                     session: Optional[BalanceSession] = None) -> BalanceResult:
+    # Parse lalu setarakan; hasil dibagi per bentuk kanonik lewat cache proses,
+    # pustaka reaksi bawaan dan penyimpanan persisten (known_result).
+    # Cache selalu menyimpan hasil suasana asam; suasana lain diturunkan
+    # darinya sehingga satu entri melayani semua suasana.
+    # Permintaan debug selalu dihitung ulang agar detailnya tersedia.
+    if medium not in MEDIA:
+        raise ValueError(f"Suasana tidak dikenal: {medium}")
+    try:
+        reactants, products = parse_reaction(reaction)
+    except ValueError:
+        metrics.count_failure(metrics.FAILURE_PARSE)
+        raise
+    key = canonical_key(reactants, products)
+    if not debug:
+        known = known_result(reactants, products, key)
+        if known is not None:
+            return known.in_medium(medium)
+    # Tanpa debug, tabel jalan pintas sudah diperiksa known_result
+    result = balance(reactants, products, debug, session, shortcuts=debug)
+    if not debug:
+        remember_result(key, result)
+    return result.in_medium(medium)
@@ -0,0 +1,176 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Jalur cadangan chempy/sympy di subprocess terisolasi yang dipakai ulang.
+# Setiap panggilan dibatasi waktu (wall-clock) dan memori; subprocess yang
+# melewati batas dihentikan dan diganti, dan pemanggil menerima hasil
+# terstruktur "terlalu kompleks" alih-alih menunggu tanpa batas.
+
+# Konfigurasi lewat variabel lingkungan
+ISOLATED_ENV = 'REDOKS_FALLBACK_ISOLATED'    # 0 untuk menjalankan di proses yang sama
+TIMEOUT_ENV = 'REDOKS_FALLBACK_TIMEOUT'      # detik per reaksi
+MEMORY_ENV = 'REDOKS_FALLBACK_MEMORY_MB'     # batas memori subprocess
+WORKERS_ENV = 'REDOKS_FALLBACK_WORKERS'      # jumlah subprocess
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MEMORY_MB = 1024
+DEFAULT_WORKERS = 2
+# Batas waktu subprocess baru untuk mengimpor chempy dan siap menerima tugas
+STARTUP_TIMEOUT = 120.0
+# Selang pemeriksaan hasil dan pembatalan
+POLL_INTERVAL = 0.1
+
+# Alasan "terlalu kompleks"
+LIMIT_TIME = 'time'
+LIMIT_MEMORY = 'memory'
+LIMIT_BUSY = 'busy'
+
+# Callback opsional (detik berjalan) yang dipanggil selama menunggu. UI
+# memakainya untuk menampilkan status; jika callback melempar exception
+# (mis. Streamlit membatalkan run karena pengguna mengirim ulang), subprocess
+# dihentikan dan exception diteruskan.
+_checkpoint: ContextVar[Optional[Callable[[float], None]]] = ContextVar('fallback_checkpoint', default=None)
+
+@contextmanager
+def progress_callback(callback: Callable[[float], None]) -> Iterator[None]:
+    token = _checkpoint.set(callback)
+    try:
+        yield
+    finally:
+        _checkpoint.reset(token)
+
+def enabled() -> bool:
+    return os.environ.get(ISOLATED_ENV, '1') != '0'
+
+def _limit_memory(memory_mb: int) -> None:
+    # Batas ruang alamat subprocess (RLIMIT_AS); diabaikan di platform tanpa resource
+    try:
+        import resource
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        pass
+
+def _serve(conn, memory_mb: int) -> None:
+    # Loop subprocess: terima (reaktan, produk), kirim hasil sebagai dict
+    _limit_memory(memory_mb)
+    from core import balance_with_chempy
+    import chempy  # noqa: F401  (impor di muka agar tidak memakan batas waktu tugas pertama)
+    conn.send(('ready', None))
+    while True:
+        try:
+            reactants, products = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send(('ok', balance_with_chempy(reactants, products).to_dict()))
+        except MemoryError:
+            conn.send(('limit', LIMIT_MEMORY))
+            return
+
+class Sandbox:
+    # Satu subprocess pekerja; dibuat saat dibutuhkan dan dibuat ulang setelah dihentikan
+    def __init__(self, memory_mb: int):
+        self.memory_mb = memory_mb
+        self._process = None
+        self._conn = None
+
+    def _start(self) -> None:
+        ctx = multiprocessing.get_context('spawn')
+        parent, child = ctx.Pipe()
+        process = ctx.Process(target=_serve, args=(child, self.memory_mb), daemon=True)
+        process.start()
+        child.close()
+        try:
+            if not parent.poll(STARTUP_TIMEOUT):
+                raise EOFError
+            parent.recv()
+        except EOFError:
+            process.kill()
+            process.join()
+            raise RuntimeError("Subprocess jalur cadangan gagal dimulai")
+        self._process, self._conn = process, parent
+
+    def stop(self) -> None:
+        if self._process is not None:
+            self._process.kill()
+            self._process.join()
+            self._conn.close()
+        self._process = self._conn = None
+
+    def run(self, reactants: List[str], products: List[str], timeout: float,
+            checkpoint: Optional[Callable[[float], None]] = None) -> Tuple[str, Any]:
+        # ('ok', dict hasil) atau ('limit', alasan)
+        if self._process is None or not self._process.is_alive():
+            self.stop()
+            self._start()
+        start = time.monotonic()
+        try:
+            self._conn.send((reactants, products))
+            while True:
+                elapsed = time.monotonic() - start
+                if elapsed >= timeout:
+                    self.stop()
+                    return 'limit', LIMIT_TIME
+                if self._conn.poll(min(POLL_INTERVAL, timeout - elapsed)):
+                    try:
+                        kind, payload = self._conn.recv()
+                    except EOFError:
+                        # Subprocess mati (biasanya kehabisan memori)
+                        self.stop()
+                        return 'limit', LIMIT_MEMORY
+                    if kind == 'limit':
+                        self.stop()
+                    return kind, payload
+                if checkpoint is not None:
+                    checkpoint(time.monotonic() - start)
+        except BaseException:
+            # Dibatalkan pemanggil: hentikan tugas yang sedang berjalan
+            self.stop()
+            raise
+
+class SandboxPool:
+    def __init__(self, workers: int = DEFAULT_WORKERS, timeout: float = DEFAULT_TIMEOUT,
+                 memory_mb: int = DEFAULT_MEMORY_MB):
+        self.timeout = timeout
+        self._idle: 'queue.Queue[Sandbox]' = queue.Queue()
+        for _ in range(workers):
+            self._idle.put(Sandbox(memory_mb))
+        self.limited: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def run(self, reactants: List[str], products: List[str]) -> Tuple[str, Any]:
+        checkpoint = _checkpoint.get()
+        try:
+            sandbox = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            return self._limit(LIMIT_BUSY)
+        try:
+            kind, payload = sandbox.run(reactants, products, self.timeout, checkpoint)
+        finally:
+            self._idle.put(sandbox)
+        if kind == 'limit':
+            return self._limit(payload)
+        return kind, payload
+
+    def available(self) -> int:
+        # Jumlah subprocess yang sedang menganggur (untuk pemantauan kejenuhan)
+        return self._idle.qsize()
+
+    def _limit(self, reason: str) -> Tuple[str, Any]:
+        with self._lock:
+            self.limited[reason] = self.limited.get(reason, 0) + 1
+        return 'limit', reason
+
+@lru_cache(maxsize=None)
+def default_pool() -> SandboxPool:
+    return SandboxPool(int(os.environ.get(WORKERS_ENV) or DEFAULT_WORKERS),
+                       float(os.environ.get(TIMEOUT_ENV) or DEFAULT_TIMEOUT),
+                       int(os.environ.get(MEMORY_ENV) or DEFAULT_MEMORY_MB))
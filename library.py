@@ -0,0 +1,255 @@
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from balancer import format_equation
+
+logger = logging.getLogger(__name__)
+
+# Pustaka reaksi setara yang dihitung di muka dan dibaca lewat mmap. Berkas
+# dipetakan read-only sehingga semua proses pekerja berbagi halaman yang sama
+# di page cache, bukan menyalinnya. Ada dua indeks:
+# - indeks persis: hash 64-bit bentuk kanonik reaksi, terurut, dicari biner
+# - indeks awalan: teks reaksi dan rumus spesies, terurut per byte, untuk saran
+#   pelengkapan di bawah kolom input
+#
+# Tata letak berkas (little-endian):
+#   header | hash u64[R] | offset rekaman u32[R+1] | offset kunci u32[K+1]
+#          | nilai kunci u32[K] | blob rekaman | blob kunci
+# Rekaman ke-i untuk hash ke-i berisi tiga baris: bentuk kanonik, persamaan
+# setara, lalu JSON hasil; JSON hanya di-decode setelah kunci cocok. Nilai
+# kunci adalah indeks rekaman untuk kunci reaksi atau SPECIES_VALUE untuk
+# kunci spesies.
+
+# Variabel lingkungan berisi path pustaka; '0' menonaktifkannya
+LIBRARY_ENV = 'REDOKS_LIBRARY'
+LIBRARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'library.bin')
+# Korpus default untuk membangun pustaka
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench', 'corpus')
+DEFAULT_SOURCES = ('readme.txt', 'textbook.txt')
+
+MAGIC = b'REDOKSLB'
+FORMAT_VERSION = 1
+# magic, versi format, jumlah rekaman, jumlah kunci, versi solver
+HEADER = '<8sIII12s'
+HEADER_SIZE = 32
+SPECIES_VALUE = 0xFFFFFFFF
+# Jumlah saran default
+SUGGESTION_LIMIT = 5
+
+def reaction_digest(canonical: str) -> int:
+    return int.from_bytes(hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).digest(), 'little')
+
+class _Keys:
+    # Urutan kunci (bytes) di atas mmap agar bisect bisa langsung dipakai
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> bytes:
+        return self._blob[self._offsets[index]:self._offsets[index + 1]].tobytes()
+
+class ReactionLibrary:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        magic, version, n_records, n_keys, solver = struct.unpack_from(HEADER, view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Berkas pustaka tidak dikenal: {path}")
+        self.solver_version = solver.rstrip(b'\0').decode('ascii')
+        position = HEADER_SIZE
+        sections = []
+        for code, count in (('Q', n_records), ('I', n_records + 1), ('I', n_keys + 1), ('I', n_keys)):
+            size = count * array(code).itemsize
+            sections.append(view[position:position + size].cast(code))
+            position += size
+        self._hashes, self._record_offsets, key_offsets, self._values = sections
+        records_end = position + self._record_offsets[-1]
+        self._records = view[position:records_end]
+        self._keys = _Keys(key_offsets, view[records_end:records_end + key_offsets[-1]])
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def _record(self, index: int) -> List[bytes]:
+        # [bentuk kanonik, persamaan, JSON hasil]
+        return self._records[self._record_offsets[index]:self._record_offsets[index + 1]].tobytes().split(b'\n', 2)
+
+    def get(self, canonical: str) -> Optional[Dict[str, Any]]:
+        # Hasil (dict BalanceResult suasana asam) untuk bentuk kanonik reaksi
+        digest = reaction_digest(canonical)
+        key = canonical.encode('utf-8')
+        index = bisect_left(self._hashes, digest)
+        while index < len(self._hashes) and self._hashes[index] == digest:
+            record = self._record(index)
+            if record[0] == key:
+                return json.loads(record[2])
+            index += 1
+        return None
+
+    def prefix(self, text: str, limit: int = SUGGESTION_LIMIT) -> Iterator[Tuple[str, int]]:
+        # Kunci yang diawali `text` beserta nilainya, sesuai urutan byte
+        prefix = text.encode('utf-8')
+        index = bisect_left(self._keys, prefix)
+        while limit > 0 and index < len(self._keys):
+            key = self._keys[index]
+            if not key.startswith(prefix):
+                break
+            yield key.decode('utf-8'), self._values[index]
+            index += 1
+            limit -= 1
+
+    def suggest(self, text: str, limit: int = SUGGESTION_LIMIT) -> List[Tuple[str, Optional[str]]]:
+        # Saran (isi input, persamaan setara atau None): reaksi yang diawali
+        # teks input, lalu pelengkapan spesies yang sedang diketik
+        text = text.lstrip()
+        if not text:
+            return []
+        suggestions: List[Tuple[str, Optional[str]]] = []
+        for key, value in self.prefix(text, limit + 1):
+            if value != SPECIES_VALUE and key != text:
+                suggestions.append((key, self._record(value)[1].decode('utf-8')))
+        # Spesies terakhir dimulai setelah ' + ' atau '->' terakhir
+        start = max((i + len(sep) for sep in (' + ', '->') for i in (text.rfind(sep),) if i >= 0), default=0)
+        fragment = text[start:].lstrip()
+        head = text[:len(text) - len(fragment)]
+        if fragment and ' ' not in fragment:
+            for key, value in self.prefix(fragment, limit + 1):
+                if value == SPECIES_VALUE and key != fragment:
+                    suggestions.append((head + key, None))
+        return suggestions[:limit]
+
+def write_library(path: str, entries: Iterable[Tuple[str, str, Dict[str, Any]]], solver_version: str) -> int:
+    # Tulis pustaka dari (teks reaksi, bentuk kanonik, dict hasil); bentuk
+    # kanonik ganda hanya disimpan sekali
+    records: Dict[int, List[Tuple[str, str, Dict[str, Any]]]] = {}
+    seen = set()
+    for reaction, canonical, result in entries:
+        if canonical in seen:
+            continue
+        seen.add(canonical)
+        records.setdefault(reaction_digest(canonical), []).append((reaction, canonical, result))
+    ordered = [(digest, item) for digest in sorted(records) for item in records[digest]]
+
+    hashes, record_offsets, blob = array('Q'), array('I', [0]), bytearray()
+    keys: Dict[bytes, int] = {}
+    for index, (digest, (reaction, canonical, result)) in enumerate(ordered):
+        hashes.append(digest)
+        equation = format_equation(result['reactants'], result['products'])
+        blob += f"{canonical}\n{equation}\n".encode('utf-8')
+        blob += json.dumps(result, separators=(',', ':')).encode('utf-8')
+        record_offsets.append(len(blob))
+        keys.setdefault(reaction.encode('utf-8'), index)
+        for term in result['reactants'] + result['products']:
+            keys.setdefault(term[0].encode('utf-8'), SPECIES_VALUE)
+
+    key_offsets, values, key_blob = array('I', [0]), array('I'), bytearray()
+    for key in sorted(keys):
+        key_blob += key
+        key_offsets.append(len(key_blob))
+        values.append(keys[key])
+
+    if sys.byteorder != 'little':
+        for section in (hashes, record_offsets, key_offsets, values):
+            section.byteswap()
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(struct.pack(HEADER, MAGIC, FORMAT_VERSION, len(hashes), len(values),
+                            solver_version.encode('ascii')))
+        for section in (hashes, record_offsets, key_offsets, values):
+            f.write(section.tobytes())
+        f.write(blob)
+        f.write(key_blob)
+    os.replace(tmp, path)
+    return len(hashes)
+
+@lru_cache(maxsize=None)
+def open_default_library(solver_version: str) -> Optional[ReactionLibrary]:
+    # Satu pemetaan per proses; None jika nonaktif, tidak ada, atau dibangun
+    # oleh versi solver lain
+    path = os.environ.get(LIBRARY_ENV) or LIBRARY_PATH
+    if path == '0' or not os.path.exists(path):
+        return None
+    if sys.byteorder != 'little':
+        logger.warning("Pustaka reaksi hanya didukung di mesin little-endian")
+        return None
+    try:
+        library = ReactionLibrary(path)
+    except (OSError, ValueError) as e:
+        logger.error(f"Gagal membuka pustaka reaksi {path}: {e}")
+        return None
+    if library.solver_version != solver_version:
+        logger.warning(f"Pustaka reaksi {path} dibangun solver versi {library.solver_version}, "
+                       f"bukan {solver_version}; jalankan ulang 'python library.py build'")
+        return None
+    return library
+
+def build_chunk(chunk: Sequence[Tuple[int, str, Any, Optional[str]]]) -> List[Tuple[str, str, Dict[str, Any]]]:
+    # Dijalankan di proses pekerja: hanya reaksi yang berhasil disetarakan
+    from cache import canonical_reaction
+    from core import balance, parse_reaction
+    entries = []
+    for _, reaction, _, error in chunk:
+        if error:
+            continue
+        try:
+            canonical = canonical_reaction(reaction)
+            result = balance(*parse_reaction(reaction))
+        except ValueError:
+            continue
+        if result.ok:
+            entries.append((reaction, canonical, result.to_dict()))
+    return entries
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Bangun atau periksa pustaka reaksi setara (mmap).")
+    parser.add_argument('--library', default=os.environ.get(LIBRARY_ENV) or LIBRARY_PATH,
+                        help=f"berkas pustaka (default: ${LIBRARY_ENV} atau data/library.bin)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="setarakan daftar reaksi lalu tulis pustaka")
+    build.add_argument('inputs', nargs='*', help="berkas reaksi (default: korpus readme dan textbook)")
+    build.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1)
+    suggest = commands.add_parser('suggest', help="tampilkan saran untuk awalan input")
+    suggest.add_argument('text')
+    commands.add_parser('stats', help="tampilkan jumlah entri")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == 'build':
+        # Impor di sini: core sendiri membaca pustaka lewat modul ini
+        from batch import read_tasks, run_batch
+        from core import SOLVER_VERSION
+        inputs = args.inputs or [os.path.join(CORPUS_DIR, name) for name in DEFAULT_SOURCES]
+        tasks = []
+        for name in inputs:
+            with open(name, encoding='utf-8') as f:
+                tasks.extend(read_tasks(f))
+        entries = run_batch(tasks, max(1, args.workers), 64, ordered=True, worker=build_chunk)
+        written = write_library(args.library, entries, SOLVER_VERSION)
+        print(f"{written} reaksi ditulis ke {args.library}")
+        return 0
+    library = ReactionLibrary(args.library)
+    if args.command == 'suggest':
+        for text, equation in library.suggest(args.text):
+            print(f"{text}  =>  {equation}" if equation else text)
+    else:
+        print(f"{len(library)} reaksi (solver versi {library.solver_version}) di {args.library}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,388 @@
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from benchmark import fallback_reactions, percentile
+
+# Harness beban offline: N sesi bersamaan mengirim campuran reaksi ke
+# aplikasi Streamlit (redoks.py) lewat AppTest headless, semuanya di satu
+# proses seperti server Streamlit sungguhan sehingga cache, pustaka dan pool
+# jalur cadangan ikut dibagi. Laporan: persentil latensi rerun, throughput,
+# memori per sesi dan kejenuhan thread/pool pekerja. Mode `--driver direct`
+# adalah pengganti lokal tanpa Streamlit (balance_reaction + format) untuk
+# memisahkan biaya UI dari biaya solver.
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'redoks.py')
+
+# Reaksi per jalur yang dibebani
+REACTION_POOLS = {
+    'shortcut': [
+        "H2O2 + MnO4^- -> Mn^2+ + O2",
+        "Cr2O7^2- + I^- -> Cr^3+ + I2",
+        "H2O2 + I^- -> I2 + H2O",
+        "MnO4^- + C2O4^2- -> Mn^2+ + CO2",
+        "CH4 + O2 -> CO2 + H2O",
+    ],
+    'half-reaction': [
+        "Cr2O7^2- + Fe^2+ -> Cr^3+ + Fe^3+",
+        "MnO4^- + Fe^2+ -> Mn^2+ + Fe^3+",
+        "Cu + NO3^- -> Cu^2+ + NO",
+        "As2S3 + NO3^- -> H3AsO4 + SO4^2- + NO",
+        "ClO3^- + SO2 -> Cl^- + SO4^2-",
+        "KMnO4 + HCl -> KCl + MnCl2 + Cl2 + H2O",
+        "Cl2 + NaOH -> NaCl + NaClO + H2O",
+        "C8H18 + O2 -> CO2 + H2O",
+    ],
+    # Diserahkan mesin bilangan bulat ke subprocess chempy; diisi
+    # benchmark.fallback_reactions() saat uji beban dimulai karena ambangnya
+    # bergantung pada kecepatan mesin
+    'fallback': [],
+}
+# Versi Streamlit tempat shared_runtime() diuji; tambalannya menyentuh
+# internal privat Streamlit yang bisa berubah antarversi
+TESTED_STREAMLIT = '1.31'
+DEFAULT_MIX = 'shortcut=2,half-reaction=6,fallback=1'
+# Selang pengambilan sampel kejenuhan (detik)
+SAMPLE_INTERVAL = 0.01
+
+Submission = Tuple[str, str]
+
+def parse_mix(text: str) -> Dict[str, float]:
+    # "shortcut=2,half-reaction=6,fallback=1" -> bobot per kelompok
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in REACTION_POOLS:
+            raise ValueError(f"Kelompok reaksi tidak dikenal: {name} (pilihan: {', '.join(REACTION_POOLS)})")
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("Campuran reaksi tidak boleh kosong")
+    return mix
+
+def plan_submissions(mix: Dict[str, float], sessions: int, requests: int, seed: int) -> List[List[Submission]]:
+    # Urutan (kelompok, reaksi) per sesi; deterministik untuk seed yang sama
+    names = [name for name in mix if mix[name] > 0]
+    weights = [mix[name] for name in names]
+    plans = []
+    for session in range(sessions):
+        rng = random.Random(seed * 1000003 + session)
+        groups = rng.choices(names, weights, k=requests)
+        plans.append([(group, rng.choice(REACTION_POOLS[group])) for group in groups])
+    return plans
+
+def rss_bytes() -> int:
+    # RSS proses saat ini (Linux); 0 jika /proc tidak tersedia
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def check_streamlit() -> None:
+    # shared_runtime() menambal Runtime.instance dan ScriptCache milik
+    # AppTest; tolak versi lain daripada menghasilkan angka yang salah
+    import streamlit
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import local_script_runner
+    if streamlit.__version__.rsplit('.', 1)[0] != TESTED_STREAMLIT:
+        raise RuntimeError(f"Driver apptest hanya diuji dengan Streamlit {TESTED_STREAMLIT}.x "
+                           f"(terpasang {streamlit.__version__}); pasang versi dari requirements.txt "
+                           f"atau pakai --driver direct")
+    if not (hasattr(Runtime, 'instance') and hasattr(Runtime, 'exists')
+            and hasattr(local_script_runner, 'ScriptCache')):
+        raise RuntimeError("Internal Streamlit yang ditambal driver apptest tidak ditemukan; "
+                           "pakai --driver direct")
+
+@contextmanager
+def shared_runtime() -> Iterator[None]:
+    # AppTest memasang Runtime tiruan global di awal setiap run lalu
+    # menghapusnya di akhir, dan mengompilasi ulang skrip di setiap run,
+    # sehingga run yang bersamaan saling merusak (compile() bersamaan tidak
+    # aman di CPython 3.11). Selama uji beban semua sesi memakai satu runtime
+    # tiruan dan satu ScriptCache, seperti server Streamlit sungguhan.
+    # Hanya untuk versi TESTED_STREAMLIT (lihat check_streamlit).
+    from unittest import mock
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import local_script_runner
+    runtime = mock.MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    script_cache = ScriptCache()
+    with mock.patch.object(Runtime, 'instance', classmethod(lambda cls: runtime)), \
+            mock.patch.object(Runtime, 'exists', classmethod(lambda cls: True)), \
+            mock.patch.object(local_script_runner, 'ScriptCache', lambda: script_cache):
+        yield
+
+class AppSession:
+    # Satu sesi browser: halaman dimuat sekali, lalu setiap kiriman mengisi
+    # kolom reaksi dan menekan "Hitung" (satu rerun skrip)
+    def __init__(self, timeout: float):
+        from streamlit.testing.v1 import AppTest
+        self._app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    def load(self) -> None:
+        self._app.run()
+
+    def submit(self, reaction: str) -> bool:
+        # True jika rerun selesai tanpa exception dan hasilnya tampil
+        self._app.text_input(key='reaction_input').input(reaction)
+        self._app.button[0].click()
+        self._app.run()
+        return not self._app.exception and any(m.value.startswith("### Hasil") for m in self._app.markdown)
+
+class DirectSession:
+    # Pengganti lokal tanpa Streamlit: jalur yang sama dengan tombol "Hitung"
+    def __init__(self, timeout: float):
+        from core import BalanceSession
+        self._session = BalanceSession()
+
+    def load(self) -> None:
+        pass
+
+    def submit(self, reaction: str) -> bool:
+        from core import balance_reaction
+        result = balance_reaction(reaction, session=self._session)
+        result.format()
+        return result.ok
+
+DRIVERS: Dict[str, Callable[[float], object]] = {'apptest': AppSession, 'direct': DirectSession}
+
+class Sampler:
+    # Sampel berkala: rerun yang sedang berjalan, jumlah thread, subprocess
+    # jalur cadangan yang menganggur dan RSS
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.in_flight = 0
+        self.samples: List[Tuple[int, int, Optional[int], int]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='loadtest-sampler', daemon=True)
+
+    @contextmanager
+    def running(self) -> Iterator[None]:
+        with self._lock:
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _run(self) -> None:
+        import fallback
+        pool = fallback.default_pool() if fallback.enabled() else None
+        while not self._stop.wait(self.interval):
+            self.samples.append((self.in_flight, threading.active_count(),
+                                 pool.available() if pool is not None else None, rss_bytes()))
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+def run_load(driver: str, sessions: int, requests: int, mix: Dict[str, float], seed: int,
+             think: float, timeout: float) -> Dict[str, object]:
+    import fallback
+    plans = plan_submissions(mix, sessions, requests, seed)
+    factory = DRIVERS[driver]
+
+    # Sesi pemanasan: impor modul, muat halaman dan mulai subprocess cadangan
+    # sebelum baseline memori diambil
+    warmup = factory(timeout)
+    warmup.load()
+    for group in mix:
+        warmup.submit(REACTION_POOLS[group][0])
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    load_latencies: List[float] = []
+    failures: Dict[str, int] = defaultdict(int)
+    lock = threading.Lock()
+    sampler = Sampler()
+    created: List[object] = []
+    start_barrier = threading.Barrier(sessions + 1)
+
+    def client(index: int) -> None:
+        session = factory(timeout)
+        start_barrier.wait()
+        begin = time.perf_counter()
+        session.load()
+        with lock:
+            load_latencies.append(time.perf_counter() - begin)
+            created.append(session)
+        for group, reaction in plans[index]:
+            with sampler.running():
+                begin = time.perf_counter()
+                try:
+                    ok = session.submit(reaction)
+                except Exception:
+                    ok = False
+                elapsed = time.perf_counter() - begin
+            with lock:
+                latencies[group].append(elapsed)
+                if not ok:
+                    failures[group] += 1
+            if think:
+                time.sleep(think)
+
+    baseline_rss = rss_bytes()
+    limited_before = dict(fallback.default_pool().limited) if fallback.enabled() else {}
+    threads = [threading.Thread(target=client, args=(i,), name=f'loadtest-session-{i}') for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    sampler.start()
+    start_barrier.wait()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    for thread in threads:
+        thread.join()
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    sampler.stop()
+    # Sesi masih dirujuk `created` sehingga status sesinya ikut terukur
+    final_rss = rss_bytes()
+
+    samples = sampler.samples or [(0, threading.active_count(), None, final_rss)]
+    idle = [s[2] for s in samples if s[2] is not None]
+    limited_after = dict(fallback.default_pool().limited) if fallback.enabled() else {}
+    everything = [value for values in latencies.values() for value in values]
+    report: Dict[str, object] = {
+        'driver': driver,
+        'sessions': sessions,
+        'requests_per_session': requests,
+        'seed': seed,
+        'wall_s': wall,
+        'throughput_rps': len(everything) / wall if wall else 0.0,
+        'latency_ms': {name: _summary(values) for name, values in
+                       sorted(latencies.items()) + [('semua', everything), ('muat halaman', load_latencies)]},
+        'failures': dict(failures),
+        'memory': {
+            'baseline_mib': baseline_rss / 2**20,
+            'final_mib': final_rss / 2**20,
+            'peak_mib': max(s[3] for s in samples) / 2**20,
+            'per_session_kib': max(0, final_rss - baseline_rss) / 1024 / max(1, len(created)),
+        },
+        'saturation': {
+            # Rerun yang berjalan bersamaan relatif terhadap jumlah sesi
+            'in_flight_mean': sum(s[0] for s in samples) / len(samples),
+            'in_flight_max': max(s[0] for s in samples),
+            'threads_max': max(s[1] for s in samples),
+            # Core yang terpakai proses ini; mendekati 1 berarti terikat GIL
+            'cpu_cores': cpu / wall if wall else 0.0,
+            'fallback_saturated_pct': 100.0 * sum(1 for i in idle if i == 0) / len(idle) if idle else None,
+            'fallback_rejected': {reason: count - limited_before.get(reason, 0)
+                                  for reason, count in limited_after.items()
+                                  if count > limited_before.get(reason, 0)},
+        },
+    }
+    return report
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {
+        'count': len(values),
+        'p50': percentile(values, 0.50) * 1000,
+        'p90': percentile(values, 0.90) * 1000,
+        'p99': percentile(values, 0.99) * 1000,
+        'max': max(values) * 1000 if values else 0.0,
+    }
+
+def print_report(report: Dict[str, object]) -> None:
+    print(f"Driver {report['driver']}: {report['sessions']} sesi x {report['requests_per_session']} kiriman "
+          f"(seed {report['seed']}) dalam {report['wall_s']:.2f} dtk")
+    print(f"Throughput: {report['throughput_rps']:.1f} rerun/dtk\n")
+    print(f"{'latensi rerun':<16}{'n':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'maks ms':>10}")
+    for name, summary in report['latency_ms'].items():
+        print(f"{name:<16}{summary['count']:>7}{summary['p50']:>10.1f}{summary['p90']:>10.1f}"
+              f"{summary['p99']:>10.1f}{summary['max']:>10.1f}")
+    if report['failures']:
+        print(f"\nKiriman gagal: {report['failures']}")
+    memory = report['memory']
+    print(f"\nMemori: baseline {memory['baseline_mib']:.1f} MiB, akhir {memory['final_mib']:.1f} MiB, "
+          f"puncak {memory['peak_mib']:.1f} MiB, per sesi {memory['per_session_kib']:.1f} KiB")
+    saturation = report['saturation']
+    print(f"Rerun bersamaan: rata-rata {saturation['in_flight_mean']:.2f}, maks {saturation['in_flight_max']} "
+          f"dari {report['sessions']} sesi")
+    print(f"Thread maks: {saturation['threads_max']}, core terpakai: {saturation['cpu_cores']:.2f}")
+    if saturation['fallback_saturated_pct'] is not None:
+        print(f"Pool jalur cadangan penuh: {saturation['fallback_saturated_pct']:.1f}% waktu, "
+              f"ditolak: {saturation['fallback_rejected'] or 0}")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Uji beban banyak sesi bersamaan untuk aplikasi Streamlit.")
+    parser.add_argument('-n', '--sessions', type=int, default=8, help="jumlah sesi bersamaan")
+    parser.add_argument('-r', '--requests', type=int, default=20, help="kiriman per sesi")
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help=f"bobot kelompok reaksi (default: {DEFAULT_MIX})")
+    parser.add_argument('--seed', type=int, default=1, help="seed urutan kiriman")
+    parser.add_argument('--think-ms', type=float, default=0.0, help="jeda antar kiriman per sesi")
+    parser.add_argument('--timeout', type=float, default=60.0, help="batas waktu satu rerun (detik)")
+    parser.add_argument('--driver', choices=sorted(DRIVERS), default='apptest',
+                        help="apptest (Streamlit headless) atau direct (tanpa UI)")
+    parser.add_argument('--warm', action='store_true',
+                        help="pakai cache hasil dan pustaka bawaan (default: semua kiriman dihitung ulang)")
+    parser.add_argument('--fallback-workers', type=int,
+                        help="jumlah subprocess jalur cadangan (default: REDOKS_FALLBACK_WORKERS)")
+    parser.add_argument('--fallback-timeout', type=float,
+                        help="batas waktu jalur cadangan per reaksi, detik (default: REDOKS_FALLBACK_TIMEOUT)")
+    parser.add_argument('--max-p99-ms', type=float, help="keluar dengan kode 1 jika p99 semua kiriman melebihi ini")
+    parser.add_argument('--json', help="tulis laporan JSON ke berkas ini")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    # Konfigurasi harus dipasang sebelum pustaka dan pool cadangan dibuka
+    if args.fallback_workers:
+        os.environ['REDOKS_FALLBACK_WORKERS'] = str(args.fallback_workers)
+    if args.fallback_timeout:
+        os.environ['REDOKS_FALLBACK_TIMEOUT'] = str(args.fallback_timeout)
+    if not args.warm:
+        os.environ['REDOKS_LIBRARY'] = '0'
+        from cache import result_cache
+        # Cache berukuran nol: setiap kiriman menjalankan solver
+        result_cache.maxsize = 0
+
+    # Log INFO aplikasi per rerun akan menenggelamkan laporan
+    logging.basicConfig(level=logging.WARNING)
+    if args.driver == 'apptest':
+        try:
+            check_streamlit()
+        except (ImportError, RuntimeError) as e:
+            print(e, file=sys.stderr)
+            return 2
+    if mix.get('fallback', 0) > 0:
+        REACTION_POOLS['fallback'] = fallback_reactions()
+        if not REACTION_POOLS['fallback']:
+            print("Tidak ada reaksi yang diteruskan ke jalur cadangan dan diselesaikan chempy "
+                  "(naikkan --fallback-timeout atau buang kelompok fallback dari --mix)", file=sys.stderr)
+            return 2
+    with shared_runtime() if args.driver == 'apptest' else nullcontext():
+        report = run_load(args.driver, max(1, args.sessions), max(1, args.requests), mix, args.seed,
+                          args.think_ms / 1000, args.timeout)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.max_p99_ms is not None and report['latency_ms']['semua']['p99'] > args.max_p99_ms:
+        print(f"\np99 melebihi batas {args.max_p99_ms:.1f} ms")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
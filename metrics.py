@@ -0,0 +1,154 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List, Tuple
+
+# Instrumentasi jalur panas: durasi per tahap (parse, bilangan oksidasi,
+# pemasangan setengah reaksi, penyetaraan, pemformatan), penghitung per jalur
+# solver dan per alasan gagal. Nonaktif secara default; saat nonaktif setiap
+# span hanya berupa satu pengecekan flag dan context manager kosong.
+
+# Variabel lingkungan untuk mengaktifkan instrumentasi (mis. REDOKS_METRICS=1)
+METRICS_ENV = 'REDOKS_METRICS'
+
+# Nama tahap
+STAGE_PARSE = 'parse'
+STAGE_OXIDATION = 'oxidation'
+STAGE_PAIRING = 'pairing'
+STAGE_BALANCING = 'balancing'
+STAGE_FORMATTING = 'formatting'
+
+# Jalur untuk hasil yang tidak melewati solver (dihitung terpisah agar total
+# jalur sama dengan jumlah permintaan)
+PATH_CACHE = 'cache'
+PATH_LIBRARY = 'library'
+PATH_STORE = 'store'
+
+# Alasan kegagalan
+FAILURE_PARSE = 'parse'
+FAILURE_CHEMPY = 'chempy'
+FAILURE_TOO_COMPLEX = 'too-complex'
+FAILURE_UNBALANCED = 'unbalanced'
+FAILURE_EXCEPTION = 'exception'
+
+# Batas atas bucket histogram (detik)
+BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+_NULL_SPAN = nullcontext()
+
+class Registry:
+    # Kumpulan metrik satu proses; aman dipakai banyak thread
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            # Per tahap: [jumlah per bucket..., count, sum, max]
+            self._stages: Dict[str, List[float]] = {}
+            self._paths: Dict[str, int] = {}
+            self._failures: Dict[str, int] = {}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            data = self._stages.get(stage)
+            if data is None:
+                data = self._stages[stage] = [0] * (len(BUCKETS) + 1) + [0, 0.0, 0.0]
+            data[bisect.bisect_left(BUCKETS, seconds)] += 1
+            data[-3] += 1
+            data[-2] += seconds
+            data[-1] = max(data[-1], seconds)
+
+    def count_path(self, path: str) -> None:
+        with self._lock:
+            self._paths[path] = self._paths.get(path, 0) + 1
+
+    def count_failure(self, reason: str) -> None:
+        with self._lock:
+            self._failures[reason] = self._failures.get(reason, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {}
+            for stage, data in self._stages.items():
+                cumulative, buckets = 0, {}
+                for bound, count in zip(BUCKETS + (float('inf'),), data[:len(BUCKETS) + 1]):
+                    cumulative += count
+                    buckets['+Inf' if bound == float('inf') else repr(bound)] = cumulative
+                stages[stage] = {'count': data[-3], 'sum': data[-2], 'max': data[-1], 'buckets': buckets}
+            return {
+                'enabled': enabled(),
+                'stages': stages,
+                'solver_paths': dict(self._paths),
+                'failures': dict(self._failures),
+            }
+
+registry = Registry()
+_enabled = os.environ.get(METRICS_ENV, '') not in ('', '0')
+
+def enabled() -> bool:
+    return _enabled
+
+def enable(flag: bool = True) -> None:
+    global _enabled
+    _enabled = flag
+
+class _Span:
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registry.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+def span(stage: str):
+    # Context manager pengukur durasi satu tahap
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(stage)
+
+def count_path(path: str) -> None:
+    if _enabled:
+        registry.count_path(path)
+
+def count_failure(reason: str) -> None:
+    if _enabled:
+        registry.count_failure(reason)
+
+def snapshot_json() -> str:
+    return json.dumps(registry.snapshot(), indent=2)
+
+def _labels(**labels: str) -> str:
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels.items()) + '}'
+
+def prometheus_text() -> str:
+    # Dump dalam format teks eksposisi Prometheus
+    snapshot = registry.snapshot()
+    lines: List[str] = [
+        '# HELP redoks_stage_seconds Durasi tiap tahap penyetaraan.',
+        '# TYPE redoks_stage_seconds histogram',
+    ]
+    for stage, data in sorted(snapshot['stages'].items()):
+        for bound, count in data['buckets'].items():
+            lines.append(f"redoks_stage_seconds_bucket{_labels(stage=stage, le=bound)} {count}")
+        lines.append(f"redoks_stage_seconds_sum{_labels(stage=stage)} {data['sum']:.9f}")
+        lines.append(f"redoks_stage_seconds_count{_labels(stage=stage)} {data['count']}")
+    counters: Tuple[Tuple[str, str, str, Dict[str, int]], ...] = (
+        ('redoks_solver_path_total', 'Jumlah hasil per jalur solver.', 'path', snapshot['solver_paths']),
+        ('redoks_failures_total', 'Jumlah kegagalan per alasan.', 'reason', snapshot['failures']),
+    )
+    for name, help_text, label, values in counters:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for value, count in sorted(values.items()):
+            lines.append(f"{name}{_labels(**{label: value})} {count}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,354 @@
+import argparse
+import heapq
+import json
+import sys
+import time
+from dataclasses import dataclass
+from fractions import Fraction
+from math import gcd, lcm
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from balancer import ENUMERATION_BUDGET, format_equation, is_balanced, minimal_solutions
+from core import MEDIA, MEDIUM_ACIDIC, BalanceResult, Term, parse_reaction
+from vectorized import balance_many
+from worksheet import parse_worksheet
+
+# Mode jaringan reaksi: sekumpulan reaksi yang berbagi spesies (sel
+# elektrokimia, proses industri bertahap). Semua langkah disetarakan
+# sekaligus lewat vectorized.balance_many, lalu koefisiennya disusun menjadi
+# satu matriks stoikiometri jarang (spesies x langkah, gaya CSC). Reaksi
+# bersih adalah S @ m dengan m > 0 pengali bulat tiap langkah yang membuat
+# semua zat antara habis: m adalah vektor ruang nol baris-baris zat antara.
+# Ruang nol dihitung per komponen terhubung dengan eliminasi Gauss jarang
+# (pivot Markowitz) sehingga jaringan berantai ratusan langkah tetap linear.
+
+# Spesies pelarut tidak perlu habis; sisanya muncul di reaksi bersih
+SOLVENT_SPECIES = ('H2O', 'H^+', 'OH^-')
+# Batas jumlah langkah per jaringan
+MAX_STEPS = 1000
+
+@dataclass(frozen=True)
+class NetworkResult:
+    # Hasil tiap langkah (sesuai urutan input) dan pengalinya; pengali bisa
+    # pecahan jika reaksi bersih disederhanakan (mis. 3/2)
+    steps: Tuple[BalanceResult, ...] = ()
+    multipliers: Tuple[Union[int, Fraction], ...] = ()
+    # Reaksi bersih setelah zat antara dihabiskan
+    reactants: Tuple[Term, ...] = ()
+    products: Tuple[Term, ...] = ()
+    intermediates: Tuple[str, ...] = ()
+    # False jika ada lebih dari satu cara menggabungkan langkah; yang dipakai
+    # adalah pengali paling sederhana
+    unique: bool = True
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def equation(self) -> str:
+        return format_equation(self.reactants, self.products)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'steps': [step.to_dict() for step in self.steps],
+            'multipliers': [m if isinstance(m, int) else str(m) for m in self.multipliers],
+            'reactants': [list(t) for t in self.reactants],
+            'products': [list(t) for t in self.products],
+            'intermediates': list(self.intermediates),
+            'unique': self.unique,
+            'error': self.error,
+        }
+
+    def format(self) -> str:
+        result = ["Langkah:"]
+        for number, step in enumerate(self.steps, 1):
+            if not step.ok:
+                result.append(f"{number}. gagal: {step.error}")
+                continue
+            factor = self.multipliers[number - 1] if self.multipliers else 1
+            result.append(f"{number}. {step.equation if factor == 1 else f'{factor} × ({step.equation})'}")
+        if not self.ok:
+            result.append(f"\nGagal menyusun reaksi bersih: {self.error}")
+            return "\n".join(result)
+        header = "Reaksi bersih:" if self.unique else "Reaksi bersih (pengali paling sederhana):"
+        result.extend(["", header, self.equation])
+        if self.intermediates:
+            result.append(f"\nZat antara: {', '.join(self.intermediates)}")
+        return "\n".join(result)
+
+class StoichiometricMatrix:
+    # Matriks stoikiometri jarang gaya CSC: kolom j adalah langkah j, entri
+    # positif untuk produk dan negatif untuk reaktan
+    def __init__(self, steps: Sequence[BalanceResult]):
+        index: Dict[str, int] = {}
+        pointer, rows, values = [0], [], []
+        for step in steps:
+            for terms, sign in ((step.reactants, -1), (step.products, 1)):
+                for formula, count in terms:
+                    rows.append(index.setdefault(formula, len(index)))
+                    values.append(sign * count)
+            pointer.append(len(rows))
+        self.species = list(index)
+        self.indptr = np.array(pointer, dtype=np.int64)
+        self.indices = np.array(rows, dtype=np.int64)
+        # Koefisien di luar int64 tetap eksak sebagai objek Python
+        try:
+            self.data = np.array(values, dtype=np.int64)
+        except OverflowError:
+            self.data = np.array(values, dtype=object)
+        self.columns = np.repeat(np.arange(len(steps)), np.diff(self.indptr))
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.species), len(self.indptr) - 1
+
+    def intermediates(self) -> np.ndarray:
+        # Penanda spesies yang dihasilkan satu langkah dan dipakai langkah lain
+        produced = np.zeros(len(self.species), dtype=bool)
+        consumed = np.zeros(len(self.species), dtype=bool)
+        produced[self.indices[self.data > 0]] = True
+        consumed[self.indices[self.data < 0]] = True
+        solvent = np.isin(np.array(self.species, dtype=object), SOLVENT_SPECIES)
+        return produced & consumed & ~solvent
+
+    def rows(self, mask: np.ndarray) -> Dict[int, Dict[int, int]]:
+        # Baris jarang {spesies: {langkah: koefisien}} untuk spesies bertanda
+        selected = mask[self.indices]
+        rows: Dict[int, Dict[int, int]] = {}
+        for row, column, value in zip(self.indices[selected].tolist(), self.columns[selected].tolist(),
+                                      self.data[selected].tolist()):
+            entries = rows.setdefault(row, {})
+            entries[column] = entries.get(column, 0) + value
+        rows = {row: {c: v for c, v in entries.items() if v} for row, entries in rows.items()}
+        return {row: entries for row, entries in rows.items() if entries}
+
+    def combine(self, multipliers: Sequence[int]) -> Tuple[Tuple[Term, ...], Tuple[Term, ...]]:
+        # S @ m sebagai (reaktan, produk); spesies yang habis dibuang
+        factors = np.array(list(multipliers), dtype=object)
+        totals = np.zeros(len(self.species), dtype=object)
+        np.add.at(totals, self.indices, self.data.astype(object) * factors[self.columns])
+        left = tuple((self.species[i], -int(totals[i])) for i in np.flatnonzero(totals < 0))
+        right = tuple((self.species[i], int(totals[i])) for i in np.flatnonzero(totals > 0))
+        return left, right
+
+def _components(rows: Dict[int, Dict[int, int]], n_steps: int) -> List[Tuple[List[int], List[int]]]:
+    # Komponen terhubung (langkah, baris zat antara) lewat union-find
+    parent = list(range(n_steps))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for entries in rows.values():
+        first, *rest = entries
+        for column in rest:
+            parent[find(column)] = find(first)
+    groups: Dict[int, Tuple[List[int], List[int]]] = {}
+    for column in range(n_steps):
+        groups.setdefault(find(column), ([], []))[0].append(column)
+    for row, entries in rows.items():
+        groups[find(next(iter(entries)))][1].append(row)
+    return list(groups.values())
+
+def sparse_nullspace(rows: Sequence[Dict[int, int]], columns: Sequence[int]) -> List[Dict[int, int]]:
+    # Basis bulat primitif {x : baris . x = 0} atas `columns`. Eliminasi maju
+    # jarang: baris dengan entri paling sedikit dipilih lebih dulu, lalu kolom
+    # pivot yang paling jarang muncul di baris lain agar isian baru minimal.
+    # Setelah itu substitusi mundur untuk tiap kolom bebas.
+    active = [dict(row) for row in rows if row]
+    where: Dict[int, Set[int]] = {column: set() for column in columns}
+    for r, row in enumerate(active):
+        for column in row:
+            where[column].add(r)
+    # Antrean prioritas malas: entri usang (panjang baris sudah berubah) dilewati
+    queue = [(len(row), r) for r, row in enumerate(active)]
+    heapq.heapify(queue)
+    done: Set[int] = set()
+    pivots: List[Tuple[int, Dict[int, int]]] = []
+    while queue:
+        size, r = heapq.heappop(queue)
+        if r in done or size != len(active[r]):
+            continue
+        done.add(r)
+        row = active[r]
+        for column in row:
+            where[column].discard(r)
+        if not row:
+            continue
+        pivot = min(row, key=lambda j: (len(where[j]), j))
+        p = row[pivot]
+        for other in list(where[pivot]):
+            target = active[other]
+            g = gcd(p, target[pivot])
+            scale, factor = p // g, target[pivot] // g
+            for column in set(target) | set(row):
+                value = scale * target.get(column, 0) - factor * row.get(column, 0)
+                if value:
+                    if column not in target:
+                        where[column].add(other)
+                    target[column] = value
+                elif column in target:
+                    del target[column]
+                    where[column].discard(other)
+            content = 0
+            for value in target.values():
+                content = gcd(content, value)
+            if content > 1:
+                for column in target:
+                    target[column] //= content
+            heapq.heappush(queue, (len(target), other))
+        pivots.append((pivot, row))
+
+    pivot_columns = {pivot for pivot, _ in pivots}
+    basis = []
+    for free in columns:
+        if free in pivot_columns:
+            continue
+        x: Dict[int, Fraction] = {free: Fraction(1)}
+        for pivot, row in reversed(pivots):
+            total = sum((value * x[column] for column, value in row.items() if column != pivot and column in x),
+                        Fraction(0))
+            if total:
+                x[pivot] = -total / row[pivot]
+        scale = lcm(*(v.denominator for v in x.values()))
+        vector = {column: int(v * scale) for column, v in x.items()}
+        content = 0
+        for value in vector.values():
+            content = gcd(content, value)
+        basis.append({column: value // content for column, value in vector.items()})
+    return basis
+
+def _multipliers(rows: Dict[int, Dict[int, int]], steps: List[int], deadline: float
+                 ) -> Tuple[Optional[Dict[int, int]], bool]:
+    # Pengali positif untuk satu komponen dan penanda ketunggalannya
+    basis = sparse_nullspace([rows[r] for r in sorted(rows)], steps)
+    if len(basis) == 1:
+        vector = basis[0]
+        if all(vector.get(s, 0) < 0 for s in steps):
+            vector = {s: -v for s, v in vector.items()}
+        if all(vector.get(s, 0) > 0 for s in steps):
+            return vector, True
+        return None, True
+    if not basis:
+        return None, True
+    # Lebih dari satu cara menggabungkan langkah: pakai solusi minimal
+    # paling sederhana, seperti reaksi tunggal yang tidak tunggal
+    position = {s: i for i, s in enumerate(steps)}
+    matrix = [[0] * len(steps) for _ in rows]
+    for i, r in enumerate(sorted(rows)):
+        for column, value in rows[r].items():
+            matrix[i][position[column]] = value
+    dense = [[vector.get(s, 0) for s in steps] for vector in basis]
+    solutions = minimal_solutions(matrix, dense, len(steps), deadline, limit=1)
+    if not solutions:
+        return None, False
+    return dict(zip(steps, solutions[0])), False
+
+def _solve_component(rows: Dict[int, Dict[int, int]], steps: List[int], deadline: float
+                     ) -> Tuple[Optional[Dict[int, int]], bool, Optional[int]]:
+    # Seperti _multipliers, tetapi jika semua zat antara tidak bisa habis
+    # bersamaan, satu spesies boleh tersisa di reaksi bersih (mis. H2SO4 pada
+    # proses kontak: dipakai satu langkah, dihasilkan lebih banyak di langkah
+    # berikutnya). Spesies dicoba sesuai urutan kemunculan pertamanya.
+    vector, single = _multipliers(rows, steps, deadline)
+    if vector is not None:
+        return vector, single, None
+    for released in sorted(rows):
+        if time.monotonic() > deadline:
+            break
+        vector, _ = _multipliers({r: entries for r, entries in rows.items() if r != released}, steps, deadline)
+        if vector is not None:
+            return vector, False, released
+    return None, True, None
+
+def _reduced(value: Fraction) -> Union[int, Fraction]:
+    return value.numerator if value.denominator == 1 else value
+
+def combine_steps(steps: Sequence[BalanceResult], budget: float = ENUMERATION_BUDGET) -> NetworkResult:
+    # Reaksi bersih dari langkah-langkah yang sudah setara
+    steps = tuple(steps)
+    for number, step in enumerate(steps, 1):
+        if not step.ok:
+            return NetworkResult(steps, error=f"Langkah {number} gagal disetarakan")
+    matrix = StoichiometricMatrix(steps)
+    mask = matrix.intermediates()
+    rows = matrix.rows(mask)
+    deadline = time.monotonic() + budget
+
+    multipliers = [0] * len(steps)
+    unique = True
+    for columns, members in _components(rows, len(steps)):
+        vector, single, released = _solve_component({r: rows[r] for r in members}, columns, deadline)
+        if vector is None:
+            numbers = ', '.join(str(c + 1) for c in columns)
+            blocked = ', '.join(matrix.species[r] for r in sorted(members))
+            return NetworkResult(steps, error=f"Zat antara {blocked} tidak bisa dihabiskan oleh langkah {numbers}")
+        if released is not None:
+            mask[released] = False
+        unique = unique and single
+        for column in columns:
+            multipliers[column] = vector[column]
+    intermediates = tuple(matrix.species[i] for i in np.flatnonzero(mask))
+
+    left, right = matrix.combine(multipliers)
+    # Sederhanakan seluruh jaringan dengan FPB koefisien reaksi bersih (yang
+    # juga habis membagi FPB pengali); pengali langkah dibagi dengan faktor yang sama
+    divisor = gcd(*(count for _, count in left + right)) or gcd(*multipliers) or 1
+    if divisor > 1:
+        left = tuple((formula, count // divisor) for formula, count in left)
+        right = tuple((formula, count // divisor) for formula, count in right)
+        multipliers = [_reduced(Fraction(m, divisor)) for m in multipliers]
+    if not left or not right:
+        return NetworkResult(steps, tuple(multipliers), intermediates=intermediates, unique=unique,
+                             error="Semua spesies saling menghabiskan; tidak ada reaksi bersih")
+    if not is_balanced(left, right):
+        return NetworkResult(steps, tuple(multipliers), intermediates=intermediates, unique=unique,
+                             error="Reaksi bersih tidak setara")
+    return NetworkResult(steps, tuple(multipliers), left, right, intermediates, unique)
+
+def balance_network(reactions: Sequence[str], medium: str = MEDIUM_ACIDIC) -> NetworkResult:
+    # Setarakan setiap langkah lalu susun reaksi bersihnya
+    if len(reactions) > MAX_STEPS:
+        raise ValueError(f"Maksimal {MAX_STEPS} reaksi per jaringan")
+    steps: List[Optional[BalanceResult]] = [None] * len(reactions)
+    parsed, positions = [], []
+    for index, reaction in enumerate(reactions):
+        try:
+            parsed.append(parse_reaction(reaction))
+            positions.append(index)
+        except ValueError as e:
+            steps[index] = BalanceResult(error=str(e))
+    for index, result in zip(positions, balance_many(parsed)):
+        steps[index] = result.in_medium(medium)
+    return combine_steps(steps)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Setarakan jaringan reaksi yang berbagi spesies lalu turunkan reaksi bersihnya.")
+    parser.add_argument('input', nargs='?', default='-', help="berkas reaksi (satu per baris); '-' untuk stdin")
+    parser.add_argument('--medium', choices=MEDIA, default=MEDIUM_ACIDIC, help="suasana larutan (default: acidic)")
+    parser.add_argument('--json', action='store_true', help="cetak hasil sebagai JSON")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.input == '-':
+        text = sys.stdin.read()
+    else:
+        with open(args.input, encoding='utf-8') as f:
+            text = f.read()
+    result = balance_network(parse_worksheet(text), args.medium)
+    if args.json:
+        print(json.dumps(result.to_dict(), ensure_ascii=False))
+    else:
+        print(result.format())
+    return 0 if result.ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
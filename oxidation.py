@@ -0,0 +1,322 @@
+import re
+from collections import deque
+from functools import lru_cache
+from itertools import product
+from typing import Dict, List, Mapping, Optional, Tuple
+
+# Tabel bilangan oksidasi per unsur: (prioritas, bilangan oksidasi yang dicoba
+# berurutan). Prioritas kecil ditetapkan lebih dulu (F, logam golongan 1/2,
+# H, O, ...); unsur dengan prioritas terbesar dalam satu spesies menjadi atom
+# pusat yang menyerap sisa muatan. Menambah unsur cukup dengan menambah baris.
+# Daftar bilangan oksidasi adalah batas keras: spesies yang tidak bisa diberi
+# keadaan dari daftar ini dianggap tidak diketahui (tanpa bilangan oksidasi).
+ELEMENT_TABLE: Dict[str, Tuple[int, Tuple[int, ...]]] = {
+    'F': (0, (-1,)),
+    'Li': (1, (1,)), 'Na': (1, (1,)), 'K': (1, (1,)), 'Rb': (1, (1,)), 'Cs': (1, (1,)),
+    'Be': (2, (2,)), 'Mg': (2, (2,)), 'Ca': (2, (2,)), 'Sr': (2, (2,)), 'Ba': (2, (2,)),
+    'Al': (3, (3,)), 'Zn': (3, (2,)), 'Ag': (3, (1,)),
+    'H': (4, (1, -1)),
+    'O': (5, (-2, -1)),
+    'Cl': (6, (-1, 1, 3, 5, 7)),
+    'Br': (6, (-1, 1, 3, 5, 7)),
+    'I': (6, (-1, 1, 3, 5, 7)),
+    'S': (7, (-2, 6, 4, 2, -1)),
+    'Se': (7, (-2, 6, 4)),
+    'N': (7, (-3, 5, 3, 2, 4, 1, -2, -1)),
+    'P': (7, (5, 3, -3)),
+    'As': (7, (5, 3, -3)),
+    'C': (8, (4, -4, 2, -2, 0, -1, -3, 1, 3)),
+    'Si': (8, (4,)),
+    'Fe': (9, (3, 2)),
+    'Cu': (9, (2, 1)),
+    'Mn': (9, (2, 4, 7, 6, 3)),
+    'Cr': (9, (3, 6, 2)),
+    'Co': (9, (2, 3)),
+    'Ni': (9, (2,)),
+    'Pb': (9, (2, 4)),
+    'Sn': (9, (2, 4)),
+    'Hg': (9, (2, 1)),
+    'Au': (9, (3, 1)),
+    'Ti': (9, (4, 3)),
+    'V': (9, (5, 4, 3, 2)),
+}
+
+# Elektronegativitas Pauling sebagai pemecah seri prioritas: dalam satu
+# prioritas, unsur yang lebih elektronegatif ditetapkan lebih dulu sehingga
+# unsur yang kurang elektronegatif menjadi atom pusat (ICl: Cl -1, I +1)
+ELECTRONEGATIVITY: Dict[str, float] = {
+    'F': 3.98, 'O': 3.44, 'Cl': 3.16, 'N': 3.04, 'Br': 2.96, 'I': 2.66, 'S': 2.58, 'Se': 2.55,
+    'C': 2.55, 'Au': 2.54, 'Pb': 2.33, 'H': 2.20, 'P': 2.19, 'As': 2.18, 'Hg': 2.00, 'Sn': 1.96,
+    'Ag': 1.93, 'Ni': 1.91, 'Cu': 1.90, 'Si': 1.90, 'Co': 1.88, 'Fe': 1.83, 'Cr': 1.66, 'Zn': 1.65,
+    'V': 1.63, 'Al': 1.61, 'Be': 1.57, 'Mn': 1.55, 'Ti': 1.54, 'Mg': 1.31, 'Ca': 1.00, 'Li': 0.98,
+    'Sr': 0.95, 'Na': 0.93, 'Ba': 0.89, 'K': 0.82, 'Rb': 0.82, 'Cs': 0.79,
+}
+
+# Prioritas untuk unsur yang tidak ada di tabel: selalu menjadi atom pusat
+UNKNOWN_PRIORITY = 10
+
+# Bilangan oksidasi satu unsur dalam spesies: ((biloks, jumlah atom), ...)
+Sites = Tuple[Tuple[int, int], ...]
+
+def _priority(element: str) -> Tuple[int, float]:
+    entry = ELEMENT_TABLE.get(element)
+    return (entry[0] if entry else UNKNOWN_PRIORITY), -ELECTRONEGATIVITY.get(element, 0.0)
+
+def _candidates(element: str) -> Tuple[int, ...]:
+    entry = ELEMENT_TABLE.get(element)
+    # Unsur tak dikenal selain atom pusat dianggap 0 seperti perilaku lama
+    return entry[1] if entry else (0,)
+
+def _distribute(element: str, count: int, total: int, homoatomic: bool = False) -> Optional[Sites]:
+    # Bagi muatan `total` ke `count` atom unsur pusat. Satu keadaan jika
+    # hasil baginya ada di tabel; jika tidak, valensi campuran dari dua
+    # keadaan tabel dengan selisih terkecil (Fe3O4: dua Fe +3 dan satu +2).
+    # Unsur di luar tabel menerima dua bilangan bulat terdekat; unsur bebas
+    # atau ion homoatomik boleh memakai 0 (I3^-: satu I -1 dan dua I 0).
+    if element in ELEMENT_TABLE:
+        states = ELEMENT_TABLE[element][1] + ((0,) if homoatomic else ())
+    else:
+        states = (total // count, -(-total // count))
+    if not total % count and (total // count in states or (homoatomic and not total)):
+        return ((total // count, count),)
+    pairs = sorted(((low, high) for low in states for high in states if low * count < total < high * count),
+                   key=lambda pair: pair[1] - pair[0])
+    for low, high in pairs:
+        high_atoms, rest = divmod(total - low * count, high - low)
+        if not rest:
+            return ((low, count - high_atoms), (high, high_atoms))
+    return None
+
+def _solve(order: List[Tuple[str, int]], charge: int) -> Optional[Dict[str, Sites]]:
+    # Coba kombinasi bilangan oksidasi untuk semua unsur kecuali atom pusat
+    # (urutan preferensi tabel), lalu atom pusat menyerap sisa muatan.
+    # Hasil atom pusat harus ada di daftar tabelnya (unsur di luar tabel
+    # menerima berapa pun).
+    center, center_count = order[-1]
+    others = order[:-1]
+    for states in product(*(_candidates(element) for element, _ in others)):
+        remaining = charge - sum(state * count for state, (_, count) in zip(states, others))
+        if remaining % center_count:
+            continue
+        center_state = remaining // center_count
+        if center in ELEMENT_TABLE and center_state not in ELEMENT_TABLE[center][1]:
+            continue
+        result = {element: ((state, count),) for (element, count), state in zip(others, states)}
+        result[center] = ((center_state, center_count),)
+        return result
+    # Tanpa satu keadaan per unsur: unsur lain pada keadaan utamanya, lalu
+    # valensi campuran di atom pusat (Fe3O4, Pb3O4, C3H8)
+    result = {element: ((_candidates(element)[0], count),) for element, count in others}
+    remaining = charge - sum(_candidates(element)[0] * count for element, count in others)
+    sites = _distribute(center, center_count, remaining)
+    if sites is not None:
+        result[center] = sites
+        return result
+    # Peroksida: pasangan O -1 (gugus O-O) sesedikit mungkin, atom pusat tetap
+    # dalam tabelnya (S +6 di H2SO5 dan S2O8^2-, Cr +6 di CrO5)
+    oxygen = result.get('O')
+    if oxygen is None or oxygen[0][0] != -2:
+        return None
+    atoms = oxygen[0][1]
+    for peroxo in range(2, atoms + 1, 2):
+        total = remaining - peroxo
+        if total % center_count:
+            continue
+        center_state = total // center_count
+        if center in ELEMENT_TABLE and center_state not in ELEMENT_TABLE[center][1]:
+            continue
+        result['O'] = ((-2, atoms - peroxo), (-1, peroxo)) if peroxo < atoms else ((-1, atoms),)
+        result[center] = ((center_state, center_count),)
+        return result
+    return None
+
+@lru_cache(maxsize=4096)
+def _assign(composition: Tuple[Tuple[str, int], ...], charge: int) -> Tuple[Tuple[str, Sites], ...]:
+    if not composition:
+        return ()
+    # Tuple kosong berarti bilangan oksidasi spesies tidak diketahui: tidak ada
+    # kombinasi dari tabel yang cocok dengan muatannya
+    if len(composition) == 1:
+        # Unsur bebas atau ion monoatomik/homoatomik
+        element, count = composition[0]
+        sites = _distribute(element, count, charge, homoatomic=True)
+        return ((element, sites),) if sites is not None else ()
+
+    order = sorted(composition, key=lambda item: _priority(item[0]))
+    states = _solve(order, charge)
+    if states is None:
+        return ()
+    return tuple((element, states[element]) for element, _ in composition)
+
+# Ion poliatom umum: (ejaan dalam formula, muatan, bilangan oksidasi unsur).
+# Gugus yang ditemukan di formula menetapkan bilangan oksidasinya sendiri,
+# sehingga sisa formula (biasanya satu kation) diselesaikan terpisah. Ion
+# logam transisi yang bilangan oksidasinya bervariasi (MnO4^-/MnO4^2-)
+# sengaja tidak dimasukkan; atom pusat menanganinya.
+POLYATOMIC_IONS: Tuple[Tuple[str, int, Dict[str, int]], ...] = (
+    ('SO4', -2, {'S': 6, 'O': -2}), ('HSO4', -1, {'H': 1, 'S': 6, 'O': -2}),
+    ('SO3', -2, {'S': 4, 'O': -2}), ('HSO3', -1, {'H': 1, 'S': 4, 'O': -2}),
+    ('S2O3', -2, {'S': 2, 'O': -2}),
+    ('NO3', -1, {'N': 5, 'O': -2}), ('NO2', -1, {'N': 3, 'O': -2}), ('NH4', 1, {'N': -3, 'H': 1}),
+    ('PO4', -3, {'P': 5, 'O': -2}), ('HPO4', -2, {'H': 1, 'P': 5, 'O': -2}),
+    ('H2PO4', -1, {'H': 1, 'P': 5, 'O': -2}),
+    ('AsO4', -3, {'As': 5, 'O': -2}), ('AsO3', -3, {'As': 3, 'O': -2}),
+    ('CO3', -2, {'C': 4, 'O': -2}), ('HCO3', -1, {'H': 1, 'C': 4, 'O': -2}),
+    ('C2O4', -2, {'C': 3, 'O': -2}),
+    ('CH3COO', -1, {'C': 0, 'H': 1, 'O': -2}), ('C2H3O2', -1, {'C': 0, 'H': 1, 'O': -2}),
+    ('CN', -1, {'C': 2, 'N': -3}), ('SCN', -1, {'S': -2, 'C': 4, 'N': -3}),
+    ('ClO', -1, {'Cl': 1, 'O': -2}), ('ClO2', -1, {'Cl': 3, 'O': -2}),
+    ('ClO3', -1, {'Cl': 5, 'O': -2}), ('ClO4', -1, {'Cl': 7, 'O': -2}),
+    ('BrO3', -1, {'Br': 5, 'O': -2}), ('IO3', -1, {'I': 5, 'O': -2}), ('IO4', -1, {'I': 7, 'O': -2}),
+    ('CrO4', -2, {'Cr': 6, 'O': -2}), ('Cr2O7', -2, {'Cr': 6, 'O': -2}),
+    ('SiO3', -2, {'Si': 4, 'O': -2}), ('BO3', -3, {'B': 3, 'O': -2}),
+)
+
+# Bilangan oksidasi per unsur: (unsur, ((biloks, jumlah atom), ...))
+AssignedSites = Tuple[Tuple[str, Sites], ...]
+
+# Batas cache dekomposisi per formula
+FRAGMENT_CACHE_SIZE = 4096
+
+def _build_automaton(patterns: List[str]) -> Tuple[List[Dict[str, int]], List[int], List[List[int]]]:
+    # Automaton Aho-Corasick: transisi trie, tautan gagal dan daftar pola
+    # (indeks) yang berakhir di tiap simpul
+    goto: List[Dict[str, int]] = [{}]
+    outputs: List[List[int]] = [[]]
+    for index, pattern in enumerate(patterns):
+        node = 0
+        for c in pattern:
+            if c not in goto[node]:
+                goto.append({})
+                outputs.append([])
+                goto[node][c] = len(goto) - 1
+            node = goto[node][c]
+        outputs[node].append(index)
+    fail = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        node = queue.popleft()
+        for c, child in goto[node].items():
+            queue.append(child)
+            state = fail[node]
+            while state and c not in goto[state]:
+                state = fail[state]
+            fail[child] = goto[state].get(c, 0)
+            outputs[child] = outputs[child] + outputs[fail[child]]
+    return goto, fail, outputs
+
+_GOTO, _FAIL, _OUTPUTS = _build_automaton([spelling for spelling, _, _ in POLYATOMIC_IONS])
+
+def _composition(spelling: str) -> Dict[str, int]:
+    # Komposisi ejaan gugus tanpa kurung (unsur boleh berulang, mis. CH3COO)
+    composition: Dict[str, int] = {}
+    for element, count in re.findall(r'([A-Z][a-z]?)(\d*)', spelling):
+        composition[element] = composition.get(element, 0) + int(count or 1)
+    return composition
+
+_FRAGMENT_COMPOSITIONS = [_composition(spelling) for spelling, _, _ in POLYATOMIC_IONS]
+
+def _multipliers(body: str) -> List[int]:
+    # Pengali tiap karakter formula: hasil kali angka setelah kurung yang
+    # melingkupinya dan koefisien bagian hidrat (mis. 3 untuk SO4 di Fe2(SO4)3)
+    multipliers = [1] * len(body)
+    stack: List[int] = []
+    segment = 0
+    for i, c in enumerate(body):
+        if c in '([':
+            stack.append(i)
+        elif c in ')]' and stack:
+            start = stack.pop()
+            match = re.match(r'\d+', body[i + 1:])
+            count = int(match.group()) if match else 1
+            for k in range(start, i + 1):
+                multipliers[k] *= count
+        elif c in '·•*.' and not stack:
+            segment = i + 1
+            match = re.match(r'\d+', body[segment:])
+            count = int(match.group()) if match else 1
+            for k in range(segment, len(body)):
+                multipliers[k] *= count
+    return multipliers
+
+def find_fragments(body: str) -> List[Tuple[int, int]]:
+    # Ion poliatom dalam formula (tanpa muatan) dalam satu lintasan
+    # automaton: (indeks di POLYATOMIC_IONS, jumlah). Di setiap posisi dipilih
+    # kecocokan terpanjang yang berakhir di batas unsur (tidak diikuti huruf
+    # kecil atau angka), lalu pencarian dilanjutkan setelahnya.
+    best: Dict[int, Tuple[int, int]] = {}
+    node = 0
+    for end, c in enumerate(body, 1):
+        while node and c not in _GOTO[node]:
+            node = _FAIL[node]
+        node = _GOTO[node].get(c, 0)
+        if end < len(body) and (body[end].islower() or body[end].isdigit()):
+            continue
+        for index in _OUTPUTS[node]:
+            start = end - len(POLYATOMIC_IONS[index][0])
+            if start not in best or best[start][1] < end:
+                best[start] = (index, end)
+    multipliers = _multipliers(body)
+    fragments = []
+    position = 0
+    for start in sorted(best):
+        if start >= position:
+            index, end = best[start]
+            fragments.append((index, multipliers[start]))
+            position = end
+    return fragments
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def _assign_fragments(body: str, composition: Tuple[Tuple[str, int], ...], charge: int) -> Optional[AssignedSites]:
+    # Bilangan oksidasi lewat dekomposisi ion poliatom; None jika tidak ada
+    # gugus yang cocok atau sisanya tidak konsisten (mis. SO3 atau NO2 netral)
+    fragments = find_fragments(body)
+    if not fragments:
+        return None
+    remaining = dict(composition)
+    remaining_charge = charge
+    # Atom per (unsur, biloks): setiap gugus mempertahankan keadaannya sendiri
+    sites: Dict[str, Dict[int, int]] = {}
+    for index, count in fragments:
+        _, fragment_charge, states = POLYATOMIC_IONS[index]
+        remaining_charge -= fragment_charge * count
+        for element, atoms in _FRAGMENT_COMPOSITIONS[index].items():
+            remaining[element] = remaining.get(element, 0) - atoms * count
+            element_sites = sites.setdefault(element, {})
+            element_sites[states[element]] = element_sites.get(states[element], 0) + atoms * count
+    if any(atoms < 0 for atoms in remaining.values()):
+        return None
+    rest = tuple((element, atoms) for element, atoms in remaining.items() if atoms)
+    if not rest and remaining_charge:
+        return None
+    assigned = _assign(rest, remaining_charge)
+    if rest and not assigned:
+        return None
+    for element, element_states in assigned:
+        element_sites = sites.setdefault(element, {})
+        for state, atoms in element_states:
+            element_sites[state] = element_sites.get(state, 0) + atoms
+    return tuple((element, tuple(sorted(sites[element].items()))) for element, _ in composition)
+
+def assign_oxidation_sites(composition: Mapping[str, int], charge: int, formula: str = ''
+                           ) -> Dict[str, Sites]:
+    # Bilangan oksidasi tiap unsur sebagai ((biloks, jumlah atom), ...). Jika
+    # formula diberikan, ion poliatom yang dikenal menetapkan bilangan
+    # oksidasinya lebih dulu, sehingga satu unsur bisa punya beberapa keadaan
+    # (N di NH4NO3: -3 dan +5); hasil disimpan per formula dan per komposisi.
+    items = tuple(composition.items())
+    if formula:
+        sites = _assign_fragments(formula.split('^')[0], items, charge)
+        if sites is not None:
+            return dict(sites)
+    return dict(_assign(items, charge))
+
+def average_states(sites: Mapping[str, Sites]) -> Dict[str, int]:
+    # Satu bilangan oksidasi per unsur untuk tampilan: unsur dengan beberapa
+    # keadaan mendapat rata-ratanya, dibulatkan ke bawah
+    return {element: sum(state * atoms for state, atoms in states) // sum(atoms for _, atoms in states)
+            for element, states in sites.items()}
+
+def assign_oxidation_states(composition: Mapping[str, int], charge: int, formula: str = '') -> Dict[str, int]:
+    # Bilangan oksidasi rata-rata tiap unsur (lihat assign_oxidation_sites)
+    return average_states(assign_oxidation_sites(composition, charge, formula))
@@ -0,0 +1,79 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from balancer import parse_terms
+from species import process_ion
+
+logger = logging.getLogger(__name__)
+
+# Berkas tabel reaksi yang sudah dikurasi
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'shortcuts.json')
+
+# Selang minimal (detik) antar pemeriksaan perubahan berkas
+RELOAD_INTERVAL = 2.0
+
+# Kunci: multiset reaktan dan multiset produk (tidak bergantung urutan)
+RuleKey = Tuple[FrozenSet[Tuple[str, int]], FrozenSet[Tuple[str, int]]]
+Terms = Tuple[Tuple[Tuple[str, int], ...], Tuple[Tuple[str, int], ...]]
+
+def rule_key(reactants: Iterable[str], products: Iterable[str]) -> RuleKey:
+    return frozenset(Counter(reactants).items()), frozenset(Counter(products).items())
+
+class RuleTable:
+    # Tabel jalan pintas untuk reaksi yang sudah dikurasi, dimuat dari berkas
+    # JSON. Pencarian cukup satu probe hash; berkas dimuat ulang otomatis saat
+    # berubah (dicek paling sering sekali per RELOAD_INTERVAL).
+    def __init__(self, path: str = RULES_PATH, reload_interval: float = RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._rules: Dict[RuleKey, Terms] = {}
+        self._mtime: Optional[float] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self) -> bool:
+        # Muat ulang jika berkas berubah; tabel lama tetap dipakai jika berkas rusak
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                entries = json.load(f)
+            rules = {}
+            for entry in entries:
+                key = rule_key((process_ion(s) for s in entry['reactants']),
+                               (process_ion(s) for s in entry['products']))
+                left, right = entry['equation'].split(' -> ')
+                rules[key] = (parse_terms(left), parse_terms(right))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Gagal memuat tabel reaksi {self.path}: {e}")
+            return False
+        with self._lock:
+            self._rules = rules
+            self._mtime = mtime
+        logger.info(f"Tabel reaksi dimuat: {len(rules)} aturan")
+        return True
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._checked >= self.reload_interval:
+            self._checked = now
+            self.reload()
+
+    def lookup(self, reactants: List[str], products: List[str]) -> Optional[Terms]:
+        self._maybe_reload()
+        return self._rules.get(rule_key(reactants, products))
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+shortcut_rules = RuleTable()
@@ -0,0 +1,267 @@
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+
+from cache import canonical_key, result_cache
+from batch import balance_to_dict
+from core import MEDIA, MEDIUM_ACIDIC, SOLVER_FAILED, BalanceResult, known_result, parse_reaction, remember_result, set_persistent_store
+from store import open_default_store
+
+logger = logging.getLogger(__name__)
+
+# Layanan HTTP JSON lokal di atas inti penyetaraan. Front end asyncio
+# (hanya pustaka standar) menerima permintaan; solver berjalan di pool
+# pekerja berukuran tetap. Reaksi identik yang sedang dihitung digabung
+# menjadi satu tugas, dan permintaan ditolak dengan 429 jika antrean penuh.
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8600
+# Jumlah maksimal reaksi berbeda yang sedang dihitung atau menunggu pekerja
+DEFAULT_QUEUE_SIZE = 256
+# Batas ukuran badan permintaan dan jumlah reaksi per batch
+MAX_BODY_BYTES = 1 << 20
+MAX_BATCH = 1000
+# Saran jeda (detik) di header Retry-After saat antrean penuh
+RETRY_AFTER = 1
+
+# Reaktan dan produk hasil parse, dalam urutan input peminta
+Sides = Tuple[List[str], List[str]]
+# Reaksi yang sudah divalidasi: (reaksi, kunci kanonik, spesies, hasil yang
+# sudah ada, pesan galat)
+Planned = Tuple[str, Optional[str], Optional[Sides], Optional[BalanceResult], Optional[str]]
+
+class QueueFull(Exception):
+    pass
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def result_record(reaction: str, result: BalanceResult) -> Dict[str, Any]:
+    record = {'reaction': reaction, **result.to_dict()}
+    if result.ok:
+        record['equation'] = result.equation
+        record['coefficients'] = result.coefficients()
+    record['result'] = result.format()
+    return record
+
+class BalanceService:
+    def __init__(self, executor: Executor, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.executor = executor
+        self.queue_size = queue_size
+        # Tugas yang sedang berjalan per bentuk kanonik reaksi
+        self._inflight: Dict[str, 'asyncio.Future[BalanceResult]'] = {}
+        self.coalesced = 0
+        self.rejected = 0
+
+    def _submit(self, key: str, reaction: str) -> 'asyncio.Future[BalanceResult]':
+        loop = asyncio.get_running_loop()
+        # Pekerja selalu menghitung suasana asam (bentuk yang di-cache). Hasil
+        # disimpan di proses ini karena pekerja spawn tidak memasang
+        # penyimpanan persisten (seperti worksheet.balance_rows).
+        future = loop.run_in_executor(self.executor, balance_to_dict, reaction)
+
+        async def finish() -> BalanceResult:
+            try:
+                result = BalanceResult.from_dict(await future)
+                remember_result(key, result)
+                return result
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.ensure_future(finish())
+        self._inflight[key] = task
+        return task
+
+    def plan(self, reactions: List[str]) -> List[Planned]:
+        # Validasi lalu cari hasil yang sudah ada (cache proses, pustaka bawaan,
+        # penyimpanan persisten) untuk semua reaksi sekaligus
+        planned = []
+        for reaction in reactions:
+            try:
+                reactants, products = parse_reaction(reaction)
+            except ValueError as e:
+                planned.append((reaction, None, None, None, str(e)))
+                continue
+            key = canonical_key(reactants, products)
+            planned.append((reaction, key, (reactants, products), known_result(reactants, products, key), None))
+        return planned
+
+    def reserve(self, planned: List[Planned]) -> None:
+        # Tolak seluruh permintaan jika tugas baru tidak muat di antrean
+        new = {key for _, key, _, known, _ in planned if key and known is None and key not in self._inflight}
+        if len(self._inflight) + len(new) > self.queue_size:
+            self.rejected += 1
+            raise QueueFull()
+
+    async def balance(self, planned: Planned, medium: str) -> Dict[str, Any]:
+        reaction, key, sides, known, error = planned
+        if error is not None:
+            return {'reaction': reaction, 'error': error}
+        if known is None:
+            task = self._inflight.get(key)
+            if task is None:
+                task = self._submit(key, reaction)
+            else:
+                self.coalesced += 1
+            try:
+                known = await asyncio.shield(task)
+            except Exception as e:
+                logger.error(f"Pekerja gagal untuk {reaction}: {e}")
+                return {'reaction': reaction, 'solver': SOLVER_FAILED, 'error': f"Terjadi kesalahan: {e}"}
+            # Tugas gabungan dihitung dari ejaan peminta pertama
+            known = known.in_order(*sides)
+        return result_record(reaction, known.in_medium(medium))
+
+    async def balance_many(self, reactions: List[str], medium: str) -> List[Dict[str, Any]]:
+        planned = self.plan(reactions)
+        self.reserve(planned)
+        return list(await asyncio.gather(*(self.balance(item, medium) for item in planned)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {'inflight': len(self._inflight), 'queue_size': self.queue_size,
+                'coalesced': self.coalesced, 'rejected': self.rejected, 'cache': result_cache.stats()}
+
+def _medium(payload: Dict[str, Any]) -> str:
+    medium = payload.get('medium', MEDIUM_ACIDIC)
+    if medium not in MEDIA:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"Suasana tidak dikenal: {medium}")
+    return medium
+
+async def route(service: BalanceService, method: str, path: str, body: bytes) -> Tuple[HTTPStatus, Dict[str, Any]]:
+    if path == '/health':
+        if method != 'GET':
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, "Gunakan GET")
+        return HTTPStatus.OK, {'status': 'ok', **service.stats()}
+    if path not in ('/balance', '/balance/batch'):
+        raise HttpError(HTTPStatus.NOT_FOUND, f"Tidak ditemukan: {path}")
+    if method != 'POST':
+        raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, "Gunakan POST")
+    try:
+        payload = json.loads(body or b'{}')
+    except ValueError as e:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"JSON tidak valid: {e}")
+    if not isinstance(payload, dict):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Badan permintaan harus objek JSON")
+    medium = _medium(payload)
+
+    if path == '/balance':
+        reaction = payload.get('reaction')
+        if not isinstance(reaction, str) or not reaction.strip():
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Kunci 'reaction' wajib diisi")
+        record = (await service.balance_many([reaction], medium))[0]
+        status = HTTPStatus.BAD_REQUEST if 'solver' not in record else HTTPStatus.OK
+        return status, record
+
+    reactions = payload.get('reactions')
+    if not isinstance(reactions, list) or not all(isinstance(r, str) for r in reactions):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Kunci 'reactions' harus daftar string")
+    if len(reactions) > MAX_BATCH:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Maksimal {MAX_BATCH} reaksi per batch")
+    return HTTPStatus.OK, {'results': await service.balance_many(reactions, medium)}
+
+def _response(status: HTTPStatus, payload: Dict[str, Any], keep_alive: bool,
+              extra: Optional[Dict[str, str]] = None) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    headers = {
+        'Content-Type': 'application/json; charset=utf-8',
+        'Content-Length': str(len(body)),
+        'Connection': 'keep-alive' if keep_alive else 'close',
+        **(extra or {}),
+    }
+    head = f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+    head += ''.join(f"{k}: {v}\r\n" for k, v in headers.items())
+    return head.encode('latin-1') + b'\r\n' + body
+
+async def handle_connection(service: BalanceService, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+    # HTTP/1.1 minimal dengan keep-alive; cukup untuk klien JSON lokal
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            try:
+                method, target, version = request_line.decode('latin-1').split()
+            except ValueError:
+                writer.write(_response(HTTPStatus.BAD_REQUEST, {'error': "Baris permintaan tidak valid"}, False))
+                break
+            headers: Dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close')
+            length = int(headers.get('content-length') or 0)
+            if length > MAX_BODY_BYTES:
+                writer.write(_response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                       {'error': f"Badan permintaan melebihi {MAX_BODY_BYTES} byte"}, False))
+                break
+            body = await reader.readexactly(length) if length else b''
+
+            extra = None
+            try:
+                status, payload = await route(service, method.upper(), target.split('?')[0], body)
+            except HttpError as e:
+                status, payload = e.status, {'error': e.message}
+            except QueueFull:
+                status, payload = HTTPStatus.TOO_MANY_REQUESTS, {'error': "Antrean penuh, coba lagi nanti"}
+                extra = {'Retry-After': str(RETRY_AFTER)}
+            except Exception as e:
+                logger.error(f"Error umum: {e}")
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"Terjadi kesalahan: {e}"}
+            writer.write(_response(status, payload, keep_alive, extra))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def serve(host: str, port: int, service: BalanceService) -> None:
+    server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), host, port)
+    logger.info(f"Layanan penyetaraan berjalan di http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Layanan HTTP JSON lokal untuk penyetaraan reaksi.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="jumlah pekerja solver (default: jumlah core)")
+    parser.add_argument('--queue', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="jumlah maksimal reaksi berbeda dalam antrean sebelum 429")
+    parser.add_argument('--threads', action='store_true', help="pakai pool thread, bukan proses")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    workers = max(1, args.workers)
+    set_persistent_store(open_default_store())
+    # Konteks spawn: pekerja tidak mewarisi koneksi SQLite proses ini
+    executor = (ThreadPoolExecutor(workers) if args.threads
+                else ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')))
+    try:
+        asyncio.run(serve(args.host, args.port, BalanceService(executor, max(1, args.queue))))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(cancel_futures=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Tuple
+
+from oxidation import assign_oxidation_sites, average_states
+
+# Batas jumlah spesies yang disimpan di cache per proses
+SPECIES_CACHE_SIZE = 1024
+
+# Tanda keadaan yang diabaikan, mis. Fe^3+(aq) atau AgCl(s)
+STATE_TAGS = ('aq', 's', 'l', 'g')
+
+# Pemisah hidrat, mis. CuSO4·5H2O, CuSO4*5H2O atau CuSO4.5H2O
+HYDRATE_SEPARATORS = '·•*.'
+
+# Elektron pada setengah reaksi yang ditulis lengkap (Zn -> Zn^2+ + 2e^-)
+ELECTRON = 'e^-'
+ELECTRON_SPELLINGS = ('e^-', 'e-', 'e^1-', 'e^-1')
+
+class Formula(NamedTuple):
+    # Hasil tokenisasi satu spesies: formula kanonik, komposisi dan muatan
+    formula: str
+    composition: Tuple[Tuple[str, int], ...]
+    charge: int
+
+def _read_number(text: str, i: int) -> Tuple[int, int]:
+    # Baca bilangan bulat mulai dari posisi i; (nilai atau 0, posisi berikutnya)
+    j = i
+    while j < len(text) and text[j].isdigit():
+        j += 1
+    return (int(text[i:j]) if j > i else 0), j
+
+def _read_state_tag(text: str, i: int) -> int:
+    # Jika text[i] membuka tanda keadaan seperti (aq), kembalikan posisi setelah ')'
+    close = text.find(')', i)
+    if close != -1 and text[i + 1:close].strip().lower() in STATE_TAGS:
+        return close + 1
+    return -1
+
+def tokenize(raw: str) -> Formula:
+    # Tokenizer satu lintasan: koefisien di depan, unsur, gugus bersarang
+    # (...) / [...], hidrat ·xH2O, tanda keadaan dan semua ejaan muatan yang
+    # diterima process_ion (Fe^3+, Fe^3, Fe^+3, OH^-, OH-, H+)
+    text = raw.strip()
+    if not text:
+        raise ValueError('Spesies tidak boleh kosong')
+    n = len(text)
+    _, i = _read_number(text, 0)
+    if text[i:].strip() in ELECTRON_SPELLINGS:
+        return Formula(ELECTRON, (), -1)
+    body_start = i
+    body_end = n
+    # Tumpukan gugus; setiap gugus menyimpan jumlah atom per unsur
+    stack: List[Dict[str, int]] = [{}]
+    total: Dict[str, int] = {}
+    multiplier = 1
+    charge = 0
+
+    def flush():
+        for element, count in stack[0].items():
+            total[element] = total.get(element, 0) + count * multiplier
+
+    while i < n:
+        c = text[i]
+        if body_end != n and (c.isupper() or c in '()[]' + HYDRATE_SEPARATORS) and _read_state_tag(text, i) == -1:
+            raise ValueError(f"Muatan atau tanda keadaan harus di akhir spesies {raw}")
+        if c.isupper():
+            j = i + 1
+            if j < n and text[j].islower():
+                j += 1
+            element = text[i:j]
+            count, i = _read_number(text, j)
+            group = stack[-1]
+            group[element] = group.get(element, 0) + (count or 1)
+        elif c in '([':
+            end = _read_state_tag(text, i) if c == '(' else -1
+            if end != -1:
+                body_end = min(body_end, i)
+                i = end
+            else:
+                stack.append({})
+                i += 1
+        elif c in ')]':
+            if len(stack) == 1:
+                raise ValueError(f"Kurung tidak seimbang dalam spesies {raw}")
+            group = stack.pop()
+            count, i = _read_number(text, i + 1)
+            parent = stack[-1]
+            for element, value in group.items():
+                parent[element] = parent.get(element, 0) + value * (count or 1)
+        elif c in HYDRATE_SEPARATORS:
+            if len(stack) != 1:
+                raise ValueError(f"Kurung tidak seimbang dalam spesies {raw}")
+            flush()
+            stack[0] = {}
+            multiplier, i = _read_number(text, i + 1)
+            multiplier = multiplier or 1
+        elif c == '^':
+            # Muatan: angka lalu tanda, tanda lalu angka, atau angka saja (positif)
+            body_end = min(body_end, i)
+            i += 1
+            start = i
+            sign = 1
+            if i < n and text[i] in '+-':
+                sign = -1 if text[i] == '-' else 1
+                i += 1
+                value, i = _read_number(text, i)
+            else:
+                value, i = _read_number(text, i)
+                if i < n and text[i] in '+-':
+                    sign = -1 if text[i] == '-' else 1
+                    i += 1
+            if i == start:
+                raise ValueError(f"Muatan kosong setelah ^ dalam spesies {raw}")
+            charge = sign * (value or 1)
+        elif c in '+-' and body_end == n:
+            # Muatan satu tanpa ^ di akhir formula (OH-, H+)
+            body_end = i
+            charge = -1 if c == '-' else 1
+            i += 1
+        elif c.isspace():
+            i += 1
+        else:
+            raise ValueError(f"Karakter '{c}' tidak dikenali dalam spesies {raw}")
+    if len(stack) != 1:
+        raise ValueError(f"Kurung tidak seimbang dalam spesies {raw}")
+    flush()
+    if not total:
+        # Mis. "^2+" atau angka sisa dari "Fe+3" yang terpisah di tanda '+'
+        raise ValueError(f"Spesies {raw} tidak memuat unsur; tulis muatan di akhir formula, mis. Fe^3+")
+
+    body = text[body_start:body_end].strip()
+    if charge == 0:
+        formula = body
+    else:
+        magnitude = '' if abs(charge) == 1 else str(abs(charge))
+        formula = f"{body}^{magnitude}{'+' if charge > 0 else '-'}"
+    return Formula(formula, tuple(total.items()), charge)
+
+def process_ion(ion_str: str) -> str:
+    # Bentuk kanonik spesies: tanpa koefisien dan tanda keadaan, muatan ditulis ^n+/^n-
+    return tokenize(ion_str).formula
+
+def _split_side(side: str) -> List[str]:
+    # Pisahkan satu sisi reaksi pada '+' pemisah. '+' dianggap muatan jika
+    # langsung mengikuti ^ (dengan atau tanpa angka), atau menempel pada
+    # formula dan diikuti '+' lain, tanda keadaan atau akhir sisi (Na+ + Cl-).
+    terms = []
+    start = 0
+    i = side.find('+')
+    while i != -1:
+        current = side[start:i]
+        rest = side[i + 1:].lstrip()
+        if not (current.rstrip('0123456789').endswith('^')
+                or (current.strip() and not current[-1].isspace() and (not rest or rest[0] in '+('))):
+            terms.append(current)
+            start = i + 1
+        i = side.find('+', i + 1)
+    terms.append(side[start:])
+    return [t.strip() for t in terms if t.strip()]
+
+def split_reaction(reaction: str) -> Tuple[List[str], List[str]]:
+    # Pisahkan reaksi menjadi daftar reaktan dan produk yang sudah dinormalisasi.
+    # Setiap ejaan ditokenisasi sekali lalu disimpan di cache Species.
+    if '->' not in reaction:
+        raise ValueError('Format reaksi salah, harus dengan tanda "->"')
+    reactants_str, products_str = reaction.split('->')
+    reactants = [_lookup(r).formula for r in _split_side(reactants_str)]
+    products = [_lookup(p).formula for p in _split_side(products_str)]
+    if not reactants or not products:
+        raise ValueError('Reaktan atau produk tidak boleh kosong')
+    return reactants, products
+
+def count_atoms(species: str) -> Dict[str, int]:
+    # Jumlah atom tiap unsur dalam suatu spesies
+    return dict(tokenize(species).composition)
+
+def get_charge(species: str) -> int:
+    # Muatan suatu spesies
+    return tokenize(species).charge
+
+class Species:
+    # Spesies kimia yang sudah diparsing: komposisi, muatan dan bilangan oksidasi.
+    # Objek dibuat sekali per formula kanonik (hasil tokenize) lalu dipakai
+    # ulang. Cache berada di level modul sehingga tetap hidup di antara rerun
+    # Streamlit dan dibagi oleh semua sesi dalam satu proses.
+    __slots__ = ('formula', 'composition', 'charge', 'oxidation_sites', 'oxidation_states')
+
+    def __init__(self, parsed: Formula):
+        self.formula = parsed.formula
+        self.composition: Mapping[str, int] = MappingProxyType(dict(parsed.composition))
+        self.charge = parsed.charge
+        # Per keadaan (untuk pemasangan setengah reaksi) dan rata-rata per unsur
+        sites = assign_oxidation_sites(self.composition, self.charge, self.formula)
+        self.oxidation_sites: Mapping[str, Tuple[Tuple[int, int], ...]] = MappingProxyType(sites)
+        self.oxidation_states: Mapping[str, int] = MappingProxyType(average_states(sites))
+
+    @staticmethod
+    def get(formula: str) -> 'Species':
+        # Ambil objek Species untuk formula mentah (boleh belum dinormalisasi)
+        return _lookup(formula)
+
+    def __repr__(self) -> str:
+        return f"Species({self.formula!r})"
+
+@lru_cache(maxsize=SPECIES_CACHE_SIZE)
+def _intern(parsed: Formula) -> Species:
+    # Formula kanonik yang sama selalu menghasilkan tuple yang sama
+    return Species(parsed)
+
+@lru_cache(maxsize=SPECIES_CACHE_SIZE)
+def _parse(raw: str) -> Formula:
+    # Setiap ejaan hanya dipindai sekali oleh tokenizer
+    return tokenize(raw)
+
+def _lookup(raw: str) -> Species:
+    # Ejaan berbeda dari spesies yang sama (mis. "H+" dan "H^+") menuju objek
+    # yang sama. Cache ejaan menyimpan Formula, bukan Species, sehingga objek
+    # yang dikeluarkan dari _intern tidak tertinggal di cache ejaan
+    return _intern(_parse(raw))
+
+def species_cache_info() -> Dict[str, int]:
+    # Statistik cache untuk pemantauan
+    info = _intern.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'maxsize': info.maxsize}
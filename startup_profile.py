@@ -0,0 +1,64 @@
+import argparse
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# Baris keluaran `python -X importtime`: "import time: self | cumulative | nama"
+IMPORTTIME_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+def measure_imports(modules: List[str]) -> Tuple[List[Tuple[str, int, int, int]], float]:
+    # Impor modul di interpreter baru dengan -X importtime lalu kumpulkan
+    # biaya per modul: (nama, self µs, kumulatif µs, kedalaman)
+    code = '; '.join(f"import {name}" for name in modules)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'import gagal')
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows, wall
+
+def by_package(rows: List[Tuple[str, int, int, int]]) -> Dict[str, int]:
+    # Total biaya "self" per paket tingkat atas (streamlit, sympy, chempy, ...)
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        totals[name.split('.')[0]] += self_us
+    return dict(totals)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Ukur biaya impor saat startup per modul.")
+    parser.add_argument('modules', nargs='*', default=['redoks'],
+                        help="modul yang diimpor (default: redoks)")
+    parser.add_argument('--fallback', action='store_true',
+                        help="ikut impor chempy untuk mengukur biaya jalur cadangan")
+    parser.add_argument('--top', type=int, default=20, help="jumlah baris yang ditampilkan")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    modules = list(args.modules) + (['chempy'] if args.fallback else [])
+    rows, wall = measure_imports(modules)
+
+    print(f"Waktu startup total: {wall * 1000:.1f} ms ({', '.join(modules)})")
+    print("\nPer paket (self):")
+    packages = sorted(by_package(rows).items(), key=lambda item: item[1], reverse=True)
+    for name, self_us in packages[:args.top]:
+        print(f"  {self_us / 1000:9.1f} ms  {name}")
+
+    print("\nModul langsung (kumulatif):")
+    top_level = sorted((row for row in rows if row[3] == 0), key=lambda row: row[2], reverse=True)
+    for name, _, cumulative_us, _ in top_level[:args.top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  {name}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
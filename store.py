@@ -0,0 +1,158 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from batch import Task, read_tasks, run_batch
+from cache import canonical_reaction
+from core import SOLVER_VERSION, BalanceResult, balance_reaction
+
+# Variabel lingkungan berisi path berkas SQLite; jika kosong penyimpanan nonaktif
+STORE_ENV = 'REDOKS_STORE'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    reaction TEXT NOT NULL,
+    solver_version TEXT NOT NULL,
+    coefficients TEXT NOT NULL,
+    explanation TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_solver_version ON results (solver_version);
+'''
+
+def reaction_hash(canonical: str) -> str:
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class ResultStore:
+    # Penyimpanan hasil penyetaraan di SQLite yang bertahan setelah restart.
+    # Mode WAL membuat banyak pembaca bisa berjalan bersamaan dengan satu
+    # penulis; setiap thread memakai koneksinya sendiri.
+    def __init__(self, path: str, version: str = SOLVER_VERSION):
+        self.path = path
+        self.version = version
+        self._local = threading.local()
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        self.purge_stale()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def purge_stale(self) -> int:
+        # Hapus entri dari versi solver lain
+        cursor = self._connection().execute('DELETE FROM results WHERE solver_version != ?', (self.version,))
+        return cursor.rowcount
+
+    def get(self, canonical: str) -> Optional[BalanceResult]:
+        row = self._connection().execute(
+            'SELECT coefficients, explanation FROM results WHERE key = ? AND solver_version = ?',
+            (reaction_hash(canonical), self.version)).fetchone()
+        if row is None:
+            return None
+        data = json.loads(row[0])
+        data.update(json.loads(row[1]))
+        return BalanceResult.from_dict(data)
+
+    def put(self, canonical: str, result: BalanceResult) -> None:
+        self.put_many([(canonical, result.to_dict())])
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        # Simpan banyak hasil dalam satu transaksi; hanya hasil yang berhasil
+        rows = []
+        now = time.time()
+        for canonical, data in items:
+            if data.get('error'):
+                continue
+            coefficients = {k: data.get(k) for k in ('reactants', 'products', 'alternatives')}
+            explanation = {k: data.get(k) for k in ('solver', 'oxidations', 'reductions', 'electrons')}
+            rows.append((reaction_hash(canonical), canonical, self.version,
+                         json.dumps(coefficients), json.dumps(explanation), now))
+        if rows:
+            conn = self._connection()
+            with conn:
+                conn.execute('BEGIN')
+                conn.executemany('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def count(self) -> int:
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM results WHERE solver_version = ?', (self.version,)).fetchone()[0]
+
+@lru_cache(maxsize=None)
+def open_default_store() -> Optional[ResultStore]:
+    # Satu penyimpanan per proses, dari variabel lingkungan REDOKS_STORE
+    path = os.environ.get(STORE_ENV)
+    return ResultStore(path) if path else None
+
+def warm_chunk(chunk: List[Task]) -> List[Tuple[str, Dict[str, Any]]]:
+    # Dijalankan di proses pekerja: setarakan tanpa menulis ke SQLite. Hasil
+    # yang tidak boleh disimpan (BalanceResult.cacheable), misalnya jalan
+    # pintas dari shortcuts.json yang bisa diubah kapan saja, dilewati.
+    items = []
+    for _, reaction, _, error in chunk:
+        if error:
+            continue
+        try:
+            result = balance_reaction(reaction)
+            if result.cacheable:
+                items.append((canonical_reaction(reaction), result.to_dict()))
+        except ValueError:
+            continue
+    return items
+
+def warm(store: ResultStore, tasks: Iterable[Task], workers: int = 1, chunksize: int = 64) -> int:
+    # Isi penyimpanan dari daftar reaksi; penulisan dilakukan di proses utama
+    # per potongan agar transaksi tetap pendek
+    written = 0
+    batch: List[Tuple[str, Dict[str, Any]]] = []
+    for item in run_batch(tasks, workers, chunksize, worker=warm_chunk):
+        batch.append(item)
+        if len(batch) >= chunksize:
+            written += store.put_many(batch)
+            batch = []
+    written += store.put_many(batch)
+    return written
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Kelola penyimpanan hasil penyetaraan (SQLite).")
+    parser.add_argument('--db', default=os.environ.get(STORE_ENV, 'redoks.db'),
+                        help=f"berkas SQLite (default: ${STORE_ENV} atau redoks.db)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    warm_parser = commands.add_parser('warm', help="isi penyimpanan dari daftar reaksi")
+    warm_parser.add_argument('input', nargs='?', default='-', help="berkas reaksi; '-' untuk stdin")
+    warm_parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1)
+    warm_parser.add_argument('--chunksize', type=int, default=64)
+    commands.add_parser('stats', help="tampilkan jumlah entri")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    store = ResultStore(args.db)
+    if args.command == 'warm':
+        source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+        try:
+            written = warm(store, read_tasks(source), args.workers, max(1, args.chunksize))
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        print(f"{written} hasil disimpan, total {store.count()} entri di {args.db}")
+    else:
+        print(f"{store.count()} entri (solver versi {store.version}) di {args.db}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+# Uji memakai mesin penyetaraan, bukan pustaka bawaan data/library.bin;
+# harus diatur sebelum core membuka pustaka
+os.environ['REDOKS_LIBRARY'] = '0'
+
+from cache import result_cache  # noqa: E402
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench', 'corpus')
+
+def corpus(name):
+    with open(os.path.join(CORPUS_DIR, f"{name}.txt"), encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+# Reaksi dengan lebih dari satu solusi bebas (enumerasi solusi minimal)
+UNDERDETERMINED = [
+    'C + O2 -> CO + CO2',
+    'CH4 + C2H6 + O2 -> CO2 + H2O',
+    'H2 + O2 -> H2O + H2O2',
+    'Fe + O2 -> FeO + Fe2O3 + Fe3O4',
+    'NH3 + O2 -> NO + NO2 + H2O',
+    'KClO3 -> KCl + KClO4 + O2',
+    'Cu + HNO3 -> Cu(NO3)2 + NO + NO2 + H2O',
+]
+
+@pytest.fixture(autouse=True)
+def empty_result_cache():
+    # Setiap uji mulai dengan cache hasil kosong
+    result_cache.clear()
+    yield
+    result_cache.clear()
@@ -0,0 +1,172 @@
+import time
+from fractions import Fraction
+
+import pytest
+
+from balancer import CHARGE_ROW, BalanceError, IncrementalBalancer, _circuit_pieces, balance_equation, candidate_matrix, enumerate_balances, imbalance, integer_kernel, integer_nullspace, is_balanced, lll_reduce, parse_terms, to_basic
+from core import SOLVER_ENUMERATED, BalanceSession, balance, parse_reaction, plan_balance
+
+from .conftest import UNDERDETERMINED, corpus
+
+def apply(matrix, vector):
+    return [sum(a * x for a, x in zip(row, vector)) for row in matrix]
+
+def gram_determinant(basis):
+    # Volume kisi kuadrat: det(B B^T), eliminasi Gauss pecahan
+    gram = [[Fraction(sum(a * b for a, b in zip(u, v))) for v in basis] for u in basis]
+    det = Fraction(1)
+    for i in range(len(gram)):
+        pivot = next((r for r in range(i, len(gram)) if gram[r][i]), None)
+        if pivot is None:
+            return Fraction(0)
+        if pivot != i:
+            gram[i], gram[pivot] = gram[pivot], gram[i]
+            det = -det
+        det *= gram[i][i]
+        for r in range(i + 1, len(gram)):
+            factor = gram[r][i] / gram[i][i]
+            gram[r] = [a - factor * b for a, b in zip(gram[r], gram[i])]
+    return det
+
+def combustion_matrix():
+    reactants, products = parse_reaction('C + O2 -> CO + CO2')
+    return candidate_matrix(reactants + products, len(reactants))
+
+def test_integer_nullspace_is_primitive_kernel():
+    matrix = candidate_matrix(['MnO4^-', 'Fe^2+', 'H^+', 'Mn^2+', 'Fe^3+', 'H2O'], 3)
+    basis = integer_nullspace(matrix, 6)
+    assert len(basis) == 1
+    assert [abs(x) for x in basis[0]] == [1, 5, 8, 1, 5, 4]
+    assert apply(matrix, basis[0]) == [0] * len(matrix)
+
+def test_integer_nullspace_full_rank():
+    assert integer_nullspace([[1, 0], [0, 1]], 2) == []
+
+def test_balance_equation_adds_auxiliaries():
+    left, right = balance_equation(['MnO4^-', 'Fe^2+'], ['Mn^2+', 'Fe^3+'])
+    assert left == [('MnO4^-', 1), ('Fe^2+', 5), ('H^+', 8)]
+    assert right == [('Mn^2+', 1), ('Fe^3+', 5), ('H2O', 4)]
+
+def test_balance_equation_plain_stoichiometry():
+    assert balance_equation(['Fe', 'O2'], ['Fe2O3']) == ([('Fe', 4), ('O2', 3)], [('Fe2O3', 2)])
+
+def test_balance_equation_rejects_non_unique():
+    with pytest.raises(BalanceError):
+        balance_equation(['C', 'O2'], ['CO', 'CO2'])
+
+def test_balance_equation_rejects_impossible():
+    with pytest.raises(BalanceError):
+        balance_equation(['Na'], ['Cl2'])
+
+def test_integer_kernel_spans_solutions():
+    matrix = combustion_matrix()
+    basis = integer_kernel(matrix, 4)
+    assert len(basis) == 2
+    assert all(apply(matrix, vector) == [0] * len(matrix) for vector in basis)
+    # 3C + 2O2 -> 2CO + CO2 adalah kombinasi bulat basis kisi
+    assert gram_determinant(basis + [[3, 2, 2, 1]]) == 0
+
+def test_lll_keeps_lattice_and_shortens():
+    matrix = combustion_matrix()
+    u, v = integer_kernel(matrix, 4)
+    skewed = [u, [7 * a + b for a, b in zip(u, v)]]
+    reduced = lll_reduce(skewed)
+    assert all(apply(matrix, vector) == [0] * len(matrix) for vector in reduced)
+    assert gram_determinant(reduced) == gram_determinant(skewed)
+    assert max(sum(x * x for x in vector) for vector in reduced) <= max(sum(x * x for x in vector) for vector in skewed)
+
+def test_lll_stops_at_deadline():
+    basis = [[1, 0, 0], [1000, 1, 0], [1000, 1000, 1]]
+    assert lll_reduce(basis, deadline=time.monotonic() - 1) == basis
+
+def test_circuit_pieces_are_balanced():
+    matrix = combustion_matrix()
+    pieces = list(_circuit_pieces(matrix, 4, time.monotonic() + 1))
+    assert pieces
+    for piece in pieces:
+        assert apply(matrix, piece) == [0] * len(matrix)
+        assert min(piece) >= 0 and max(piece) > 0
+
+@pytest.mark.parametrize('reaction', UNDERDETERMINED)
+def test_enumerated_balances_are_balanced(reaction):
+    reactants, products = parse_reaction(reaction)
+    with pytest.raises(BalanceError):
+        balance_equation(reactants, products)
+    solutions = enumerate_balances(reactants, products, budget=5)
+    assert solutions
+    for left, right in solutions:
+        assert is_balanced(left, right), imbalance(left, right)
+        assert all(c > 0 for _, c in left + right)
+
+def test_enumerated_balances_ranked_by_simplicity():
+    result = balance(*parse_reaction('C + O2 -> CO + CO2'))
+    assert result.solver == SOLVER_ENUMERATED
+    assert result.equation == '3C + 2O2 -> 2CO + CO2'
+    sizes = [sum(c for _, c in left + right) for left, right in ((result.reactants, result.products),) + result.alternatives]
+    assert sizes == sorted(sizes)
+
+def test_enumeration_respects_budget():
+    # Puluhan spesies: pencarian berhenti pada batas waktu, bukan menggantung
+    reactants, products = [f"C{n}H{2 * n + 2}" for n in range(1, 16)] + ['O2'], ['CO2', 'H2O', 'CO']
+    start = time.monotonic()
+    enumerate_balances(reactants, products, budget=0.2)
+    assert time.monotonic() - start < 2
+
+def test_imbalance_counts_atoms_and_charge():
+    assert imbalance(parse_terms('MnO4^- + 5Fe^2+ + 8H^+'), parse_terms('Mn^2+ + 5Fe^3+ + 4H2O')) == {}
+    # Elektron yang dibuang terlihat sebagai selisih muatan
+    assert imbalance(parse_terms('MnO4^- + Fe^2+ + 8H^+'), parse_terms('Mn^2+ + Fe^3+ + 4H2O')) == {CHARGE_ROW: 4}
+    assert imbalance(parse_terms('Fe + O2'), parse_terms('Fe2O3')) == {'Fe': -1, 'O': -1}
+
+def test_is_balanced_needs_positive_integers():
+    assert is_balanced([('H2', 2), ('O2', 1)], [('H2O', 2)])
+    assert not is_balanced([('H2', 4), ('O2', 2)], [('H2O', 2)])
+    assert not is_balanced([('H2', 2.0), ('O2', 1)], [('H2O', 2)])
+    assert not is_balanced([('H2', 0), ('H2', 2), ('O2', 1)], [('H2O', 2)])
+    assert not is_balanced([], [])
+
+def test_incremental_balancer_matches_balance_equation():
+    balancer = IncrementalBalancer()
+    compared = 0
+    for line in corpus('textbook'):
+        reactants, products = parse_reaction(line)
+        plan = plan_balance(reactants, products, shortcuts=False)
+        try:
+            expected = balance_equation(reactants, products, plan.electron_row)
+        except BalanceError:
+            with pytest.raises(BalanceError):
+                balancer.balance_equation(reactants, products, plan.electron_row)
+            continue
+        assert balancer.balance_equation(reactants, products, plan.electron_row) == expected, line
+        compared += 1
+    assert compared > 500
+
+def test_incremental_balancer_updates_columns():
+    balancer = IncrementalBalancer()
+    balancer.balance_equation(['C3H8', 'O2'], ['CO2', 'H2'])
+    first = balancer.factorization
+    # Mengganti satu produk hanya mengubah satu kolom pada faktorisasi yang sama
+    assert balancer.balance_equation(['C3H8', 'O2'], ['CO2', 'H2O']) == ([('C3H8', 1), ('O2', 5)], [('CO2', 3), ('H2O', 4)])
+    assert balancer.factorization is first
+    assert ('H2O', -1) in first.columns and ('H2', -1) not in first.columns
+    assert balancer.balance_equation(['C3H8', 'O2'], ['CO2', 'H2']) == balance_equation(['C3H8', 'O2'], ['CO2', 'H2'])
+
+def test_session_reuses_unchanged_oxidation_sites(monkeypatch):
+    import core
+    session = BalanceSession()
+    reactants, products = ['MnO4^-', 'Fe^2+'], ['Mn^2+', 'Fe^3+']
+    first = balance(reactants, products, session=session)
+    computed = []
+    original = core.get_oxidation_sites
+    monkeypatch.setattr(core, 'get_oxidation_sites', lambda f: computed.append(f) or original(f))
+    # Mengganti satu produk hanya menghitung bilangan oksidasi spesies baru
+    balance(reactants, ['Mn^2+', 'Fe^3+', 'H2O'], session=session)
+    assert computed == ['H2O']
+    assert balance(reactants, products, session=session) == first == balance(reactants, products)
+
+def test_to_basic_round_trip():
+    left, right = parse_terms('Cr2O7^2- + 6I^- + 14H^+'), parse_terms('2Cr^3+ + 3I2 + 7H2O')
+    basic_left, basic_right = to_basic(left, right)
+    assert is_balanced(basic_left, basic_right)
+    assert ('OH^-', 14) in basic_right
+    assert not any(f == 'H^+' for f, _ in basic_left + basic_right)
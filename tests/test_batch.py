@@ -0,0 +1,51 @@
+import io
+import json
+
+from batch import balance_one, main, read_tasks, run_batch
+
+INPUT = '''# komentar
+H2 + O2 -> H2O
+{"id": "r2", "reaction": "Zn + Cu^2+ -> Zn^2+ + Cu"}
+{"id": rusak}
+
+H2 + O2
+'''
+
+def test_read_tasks_lines_and_jsonl():
+    tasks = list(read_tasks(io.StringIO(INPUT)))
+    assert [(index, reaction, ident) for index, reaction, ident, _ in tasks] == [
+        (1, 'H2 + O2 -> H2O', None), (2, 'Zn + Cu^2+ -> Zn^2+ + Cu', 'r2'),
+        (3, '{"id": rusak}', None), (5, 'H2 + O2', None)]
+    assert [error is not None for *_, error in tasks] == [False, False, True, False]
+
+def test_read_tasks_forced_lines():
+    tasks = list(read_tasks(io.StringIO('{"reaction": "H2 -> H2"}\n'), 'lines'))
+    assert tasks == [(0, '{"reaction": "H2 -> H2"}', None, None)]
+
+def test_balance_one_records():
+    record = balance_one(0, 'H2O2 + I^- -> I2 + H2O', 'x', medium='basic')
+    assert record['id'] == 'x'
+    assert record['equation'] == 'H2O2 + 2I^- -> I2 + 2OH^-'
+    assert record['coefficients']['OH^-'] == 2
+    assert 'error' not in balance_one(1, 'H2 + O2 -> H2O')
+    assert balance_one(2, 'H2 + O2')['error'] == 'Format reaksi salah, harus dengan tanda "->"'
+    assert balance_one(3, 'x', error='JSON tidak valid') == {'index': 3, 'reaction': 'x', 'error': 'JSON tidak valid'}
+
+def test_run_batch_ordered_with_workers():
+    tasks = [(i, f'C{n}H{2 * n + 2} + O2 -> CO2 + H2O', None, None) for i, n in enumerate(range(1, 40))]
+    records = list(run_batch(iter(tasks), workers=2, chunksize=4, ordered=True))
+    assert [record['index'] for record in records] == list(range(len(tasks)))
+    unordered = list(run_batch(iter(tasks), workers=2, chunksize=4))
+    assert sorted(record['index'] for record in unordered) == list(range(len(tasks)))
+    assert sorted(unordered, key=lambda r: r['index']) == records
+
+def test_cli_streams_jsonl(tmp_path):
+    source, target = tmp_path / 'reaksi.txt', tmp_path / 'hasil.jsonl'
+    source.write_text(INPUT, encoding='utf-8')
+    assert main([str(source), '-o', str(target), '-j', '1', '--ordered', '--medium', 'basic']) == 0
+    records = [json.loads(line) for line in target.read_text(encoding='utf-8').splitlines()]
+    assert [record['index'] for record in records] == [1, 2, 3, 5]
+    assert records[0]['equation'] == '2H2 + O2 -> 2H2O'
+    assert records[1]['id'] == 'r2'
+    assert records[2]['error'].startswith('JSON tidak valid')
+    assert 'error' in records[3] and 'equation' not in records[3]
@@ -0,0 +1,48 @@
+import json
+
+from benchmark import batch_comparison, compare, load_corpus, main, run
+from core import SOLVER_CHEMPY, balance, parse_reaction, verified
+
+from .conftest import corpus
+
+def test_compare_flags_slower_metrics_only():
+    baseline = {'stage.parse': {'p50_us': 10.0, 'p99_us': 20.0, 'peak_kib': 1.0},
+                'path.half-reaction': {'p50_us': 100.0, 'p99_us': 200.0}}
+    report = {'stage.parse': {'p50_us': 11.0, 'p99_us': 60.0, 'peak_kib': 2.0},
+              'path.half-reaction': {'p50_us': 150.0, 'p99_us': 210.0},
+              'path.enumerated': {'p50_us': 1e6, 'p99_us': 1e6}}
+    failures = compare(report, baseline, threshold=0.2, min_delta_us=5.0)
+    assert [failure.split(':')[0] for failure in failures] == [
+        'stage.parse p99_us', 'stage.parse peak_kib', 'path.half-reaction p50_us']
+    # Selisih di bawah min_delta_us dianggap derau
+    assert compare(report, baseline, threshold=0.2, min_delta_us=100.0) == ['stage.parse peak_kib: 2.0 KiB (baseline 1.0 KiB)']
+
+def test_run_reports_stages_and_paths():
+    report = run(load_corpus(['readme']), repeat=1, warm=False, memory=True)
+    assert 'stage.parse' in report
+    assert any(name.startswith('path.') for name in report)
+    for metrics in report.values():
+        assert metrics['count'] >= 1
+        assert metrics['p99_us'] >= metrics['p50_us'] >= 0
+        assert metrics['peak_kib'] >= 0
+
+def test_gate_needs_a_baseline(tmp_path, capsys):
+    baseline = str(tmp_path / 'baseline.json')
+    args = ['--corpus', 'readme', '--repeat', '1', '--no-memory', '--baseline', baseline]
+    assert main(args) == 1
+    assert main(args + ['--save-baseline']) == 0
+    with open(baseline, encoding='utf-8') as f:
+        assert 'stage.parse' in json.load(f)
+    assert main(args + ['--threshold', '1000']) == 0
+    assert 'Tidak ada regresi' in capsys.readouterr().out
+
+def test_textbook_corpus_balances_without_fallback():
+    for reaction in corpus('textbook'):
+        result = balance(*parse_reaction(reaction))
+        assert result.ok and result.solver != SOLVER_CHEMPY and verified(result), reaction
+
+def test_batch_comparison_counts_unique_reactions():
+    reactions = load_corpus(['readme']) * 2
+    comparison = batch_comparison(reactions, repeat=1)
+    assert comparison['reactions'] == len(corpus('readme'))
+    assert comparison['loop_s'] > 0 and comparison['batch_s'] > 0
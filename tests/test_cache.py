@@ -0,0 +1,38 @@
+import time
+
+from cache import ResultCache, canonical_key, canonical_reaction, result_cache
+from core import balance_reaction
+
+def test_canonical_key_ignores_order_and_spelling():
+    key = canonical_key(['Cl^-', 'Na^+'], ['NaCl'])
+    assert key == 'Cl^- + Na^+ -> NaCl'
+    assert canonical_reaction('Na+ + Cl- -> NaCl') == key
+    assert canonical_reaction('Cl^-  +  Na^+ -> NaCl') == key
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats() == {'hits': 3, 'misses': 1, 'size': 2, 'maxsize': 2}
+
+def test_result_cache_expires_entries():
+    cache = ResultCache(ttl=0.01)
+    cache.put('a', 1)
+    time.sleep(0.02)
+    assert cache.get('a') is None
+    assert cache.stats()['size'] == 0
+
+def test_cache_hit_follows_caller_order():
+    first = balance_reaction('MnO4^- + Fe^2+ -> Mn^2+ + Fe^3+')
+    second = balance_reaction('Fe^2+ + MnO4^- -> Fe^3+ + Mn^2+')
+    assert result_cache.stats()['hits'] == 1
+    assert first.equation == 'MnO4^- + 5Fe^2+ + 8H^+ -> Mn^2+ + 5Fe^3+ + 4H2O'
+    assert second.equation == '5Fe^2+ + MnO4^- + 8H^+ -> 5Fe^3+ + Mn^2+ + 4H2O'
+    basic = balance_reaction('Fe^2+ + MnO4^- -> Fe^3+ + Mn^2+', medium='basic')
+    assert basic.equation == '5Fe^2+ + MnO4^- + 4H2O -> 5Fe^3+ + Mn^2+ + 8OH^-'
+    # Entri cache tetap dalam urutan peminta pertama
+    assert balance_reaction('MnO4^- + Fe^2+ -> Mn^2+ + Fe^3+') == first
@@ -0,0 +1,210 @@
+import json
+
+import pytest
+
+import core
+from core import MEDIA, MEDIUM_ACIDIC, MEDIUM_BASIC, MEDIUM_NEUTRAL, SOLVER_HALF_REACTION, SOLVER_SHORTCUT, SOLVER_STOICHIOMETRY, UNBALANCED_MESSAGE, BalanceResult, balance, balance_reaction, balance_redox_reaction, balance_with_chempy, find_couples, get_oxidation_sites, parse_reaction, verified
+from rules import RuleTable
+
+from .conftest import corpus
+
+ROUND_TRIP = [
+    'H2O2 + MnO4^- -> Mn^2+ + O2',
+    'Zn + Cu^2+ -> Zn^2+ + Cu',
+    'Fe + O2 -> Fe2O3',
+    'C + O2 -> CO + CO2',
+]
+
+def test_balance_reaction_returns_structured_result():
+    result = balance_reaction('Zn + Cu^2+ -> Zn^2+ + Cu')
+    assert result.ok
+    assert result.solver == SOLVER_HALF_REACTION
+    assert result.coefficients() == {'Zn': 1, 'Cu^2+': 1, 'Zn^2+': 1, 'Cu': 1}
+    assert (result.oxidation.reactant, result.oxidation.product, result.oxidation.change) == ('Zn', 'Zn^2+', 2)
+    assert (result.reduction.reactant, result.reduction.product) == ('Cu^2+', 'Cu')
+    assert result.electrons == 2
+
+def test_stoichiometry_without_redox():
+    result = balance(*parse_reaction('NaOH + HCl -> NaCl + H2O'))
+    assert result.solver == SOLVER_STOICHIOMETRY
+    assert result.equation == 'NaOH + HCl -> NaCl + H2O'
+    assert result.oxidations == () and result.reductions == ()
+
+def test_format_lists_half_reactions():
+    text = balance_redox_reaction(['Zn', 'Cu^2+'], ['Zn^2+', 'Cu'])
+    assert text.splitlines()[:2] == ['Reaksi setara:', 'Zn + Cu^2+ -> Zn^2+ + Cu']
+    assert 'Oksidasi: Zn -> Zn^2+ + 2e-' in text
+    assert 'Reduksi: Cu^2+ + 2e- -> Cu' in text
+    assert 'KPK elektron: 2' in text
+
+@pytest.mark.parametrize('reaction', ROUND_TRIP)
+def test_result_dict_round_trip(reaction):
+    result = balance(*parse_reaction(reaction))
+    data = json.loads(json.dumps(result.to_dict()))
+    assert BalanceResult.from_dict(data) == result
+    assert BalanceResult.from_dict(data).format() == result.format()
+
+def test_debug_details():
+    result = balance_reaction('Zn + Cu^2+ -> Zn^2+ + Cu', debug=True)
+    assert result.debug['reactant_states'] == [{'Zn': 0}, {'Cu': 2}]
+    assert result.debug['unknown_species'] == []
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        balance_reaction('H2 + O2')
+    with pytest.raises(ValueError):
+        balance_reaction('H2 + O2 -> H2O', medium='alkaline')
+    failed = BalanceResult(error='gagal')
+    assert not failed.ok
+    assert failed.format() == 'Gagal menyetarakan reaksi: gagal'
+
+@pytest.mark.parametrize('reaction, message', [
+    ('Na -> Cl2', 'Unsur Na hanya ada di sisi reaktan'),
+    ('Fe^2+ -> Fe', 'Muatan hanya ada di sisi reaktan'),
+    ('Fe + Cl2 -> FeCl3 + Cu', 'Unsur Cu hanya ada di sisi produk'),
+])
+def test_chempy_errors_use_app_messages(reaction, message):
+    assert balance_with_chempy(*parse_reaction(reaction)).error == message
+
+def couples(reaction):
+    reactants, products = parse_reaction(reaction)
+    oxidations, reductions = find_couples(reactants, products, [get_oxidation_sites(r) for r in reactants],
+                                          [get_oxidation_sites(p) for p in products])
+    return ([(h.reactant, h.product, h.element, h.change) for h in oxidations],
+            [(h.reactant, h.product, h.element, h.change) for h in reductions])
+
+def test_couples_for_disproportionation():
+    assert couples('Cl2 + OH^- -> Cl^- + ClO^-') == ([('Cl2', 'ClO^-', 'Cl', 1)], [('Cl2', 'Cl^-', 'Cl', 1)])
+
+def test_every_couple_is_kept():
+    oxidations, reductions = couples('FeS2 + O2 -> Fe2O3 + SO2')
+    assert oxidations == [('FeS2', 'Fe2O3', 'Fe', 1), ('FeS2', 'SO2', 'S', 5)]
+    assert reductions == [('O2', 'Fe2O3', 'O', 2), ('O2', 'SO2', 'O', 2)]
+
+def test_couples_prefer_the_smallest_change():
+    # O2 berasal dari H2O2 (-1), bukan dari oksigen oksida di ClO^- (-2)
+    assert couples('H2O2 + ClO^- -> Cl^- + O2 + H2O') == ([('H2O2', 'O2', 'O', 1)], [('ClO^-', 'Cl^-', 'Cl', 2)])
+
+def test_no_couples_without_a_change():
+    assert couples('NaOH + HCl -> NaCl + H2O') == ([], [])
+    assert couples('NH4NO3 -> NH4^+ + NO3^-') == ([], [])
+    assert couples('Fe3O4 + H^+ -> Fe^2+ + Fe^3+ + H2O') == ([], [])
+
+def test_couples_for_mixed_valence():
+    # Hanya Fe +2 di Fe3O4 yang teroksidasi; Pb +4 di Pb3O4 yang tereduksi
+    assert couples('Fe3O4 + MnO4^- -> Fe^3+ + Mn^2+') == ([('Fe3O4', 'Fe^3+', 'Fe', 1)], [('MnO4^-', 'Mn^2+', 'Mn', 5)])
+    assert couples('Pb3O4 + HCl -> PbCl2 + Cl2 + H2O') == ([('HCl', 'Cl2', 'Cl', 1)], [('Pb3O4', 'PbCl2', 'Pb', 2)])
+    assert balance_reaction('Fe3O4 + MnO4^- -> Fe^3+ + Mn^2+').electrons == 5
+
+# Contoh README: (suasana asam, suasana basa); suasana netral sama dengan basa
+# karena H^+ hanya boleh muncul sebagai produk
+README_EXAMPLES = {
+    'H2O2 + MnO4^- -> Mn^2+ + O2': (
+        '5H2O2 + 2MnO4^- + 6H^+ -> 2Mn^2+ + 5O2 + 8H2O',
+        '5H2O2 + 2MnO4^- -> 2Mn^2+ + 5O2 + 2H2O + 6OH^-',
+    ),
+    'Cr2O7^2- + I^- -> Cr^3+ + I2': (
+        'Cr2O7^2- + 6I^- + 14H^+ -> 2Cr^3+ + 3I2 + 7H2O',
+        'Cr2O7^2- + 6I^- + 7H2O -> 2Cr^3+ + 3I2 + 14OH^-',
+    ),
+    'H2O2 + I^- -> I2 + H2O': (
+        'H2O2 + 2I^- + 2H^+ -> I2 + 2H2O',
+        'H2O2 + 2I^- -> I2 + 2OH^-',
+    ),
+    'MnO4^- + C2O4^2- -> Mn^2+ + CO2': (
+        '2MnO4^- + 5C2O4^2- + 16H^+ -> 2Mn^2+ + 10CO2 + 8H2O',
+        '2MnO4^- + 5C2O4^2- + 8H2O -> 2Mn^2+ + 10CO2 + 16OH^-',
+    ),
+}
+
+def test_readme_corpus_matches_examples():
+    assert sorted(corpus('readme')) == sorted(README_EXAMPLES)
+
+@pytest.mark.parametrize('reaction', sorted(README_EXAMPLES))
+@pytest.mark.parametrize('shortcuts', [True, False])
+def test_readme_examples_in_every_medium(reaction, shortcuts, monkeypatch, tmp_path):
+    if not shortcuts:
+        # Hasil mesin penyetaraan harus sama dengan tabel jalan pintas
+        path = tmp_path / 'shortcuts.json'
+        path.write_text('[]', encoding='utf-8')
+        monkeypatch.setattr(core, 'shortcut_rules', RuleTable(str(path)))
+    acidic, basic = README_EXAMPLES[reaction]
+    expected = {MEDIUM_ACIDIC: acidic, MEDIUM_BASIC: basic, MEDIUM_NEUTRAL: basic}
+    assert set(expected) == set(MEDIA)
+    for medium in MEDIA:
+        result = balance_reaction(reaction, medium=medium)
+        assert result.ok and verified(result)
+        assert result.medium == medium
+        assert result.equation == expected[medium]
+
+def test_neutral_medium_keeps_hydrogen_ions_on_the_product_side():
+    reaction = 'SO2 + MnO4^- -> SO4^2- + Mn^2+'
+    acidic = '5SO2 + 2MnO4^- + 2H2O -> 5SO4^2- + 2Mn^2+ + 4H^+'
+    assert balance_reaction(reaction, medium=MEDIUM_NEUTRAL).equation == acidic
+    assert balance_reaction(reaction, medium=MEDIUM_BASIC).equation == '5SO2 + 2MnO4^- + 4OH^- -> 5SO4^2- + 2Mn^2+ + 2H2O'
+
+def test_unknown_medium_rejected():
+    with pytest.raises(ValueError):
+        balance_reaction('H2 + O2 -> H2O', medium='alkaline')
+
+def test_shortcut_follows_caller_order():
+    assert balance_reaction('MnO4^- + H2O2 -> O2 + Mn^2+').equation == '2MnO4^- + 5H2O2 + 6H^+ -> 5O2 + 2Mn^2+ + 8H2O'
+
+def test_shortcut_table_wins_over_cache(monkeypatch, tmp_path):
+    reaction = 'H2 + O2 -> H2O'
+    assert balance_reaction(reaction).equation == '2H2 + O2 -> 2H2O'
+    path = tmp_path / 'shortcuts.json'
+    path.write_text(json.dumps([{'reactants': ['H2', 'O2'], 'products': ['H2O'],
+                                 'equation': '4H2 + 2O2 -> 4H2O'}]), encoding='utf-8')
+    monkeypatch.setattr(core, 'shortcut_rules', RuleTable(str(path)))
+    result = balance_reaction(reaction)
+    assert result.solver == SOLVER_SHORTCUT
+    assert result.equation == '4H2 + 2O2 -> 4H2O'
+    assert not result.cacheable
+
+def test_unbalanced_shortcut_is_ignored(monkeypatch, tmp_path):
+    path = tmp_path / 'shortcuts.json'
+    path.write_text(json.dumps([{'reactants': ['H2', 'O2'], 'products': ['H2O'],
+                                 'equation': 'H2 + O2 -> H2O'}]), encoding='utf-8')
+    monkeypatch.setattr(core, 'shortcut_rules', RuleTable(str(path)))
+    assert balance_reaction('H2 + O2 -> H2O').equation == '2H2 + O2 -> 2H2O'
+
+@pytest.mark.parametrize('reaction', ['CH4 + O2 -> CO2 + H2O', 'Zn + Cu^2+ -> Zn^2+ + Cu'])
+def test_shortcut_table_is_consulted_once(monkeypatch, reaction):
+    lookups = []
+
+    class CountingTable(RuleTable):
+        def lookup(self, reactants, products):
+            lookups.append(reaction)
+            return super().lookup(reactants, products)
+
+    monkeypatch.setattr(core, 'shortcut_rules', CountingTable())
+    assert balance_reaction(reaction).ok
+    assert len(lookups) == 1
+
+def test_verified_checks_every_equation():
+    good = balance_reaction('Fe + O2 -> Fe2O3')
+    assert verified(good) and verified(BalanceResult(error='x'))
+    assert not verified(BalanceResult((('Fe', 2), ('O2', 3)), (('Fe2O3', 2),)))
+    assert not verified(BalanceResult(good.reactants, good.products, alternatives=((good.reactants, (('Fe2O3', 1),)),)))
+
+def test_unbalanced_result_goes_to_exact_solver(monkeypatch):
+    calls = []
+    original = core.finish_balance
+
+    def dropping(plan, left, right):
+        # Panggilan pertama kehilangan satu produk, seperti jalur lama
+        calls.append(plan)
+        result = original(plan, left, right)
+        return result if len(calls) > 1 else BalanceResult(result.reactants, result.products[:-1], result.solver)
+
+    monkeypatch.setattr(core, 'finish_balance', dropping)
+    result = balance(['MnO4^-', 'Fe^2+'], ['Mn^2+', 'Fe^3+'], shortcuts=False)
+    assert len(calls) == 2
+    assert result.equation == 'MnO4^- + 5Fe^2+ + 8H^+ -> Mn^2+ + 5Fe^3+ + 4H2O'
+
+def test_unbalanced_result_is_never_shown(monkeypatch):
+    bogus = BalanceResult((('C', 1), ('O2', 1)), (('CO', 1), ('CO2', 1)), core.SOLVER_ENUMERATED)
+    monkeypatch.setattr(core, 'balance_underdetermined', lambda plan: bogus)
+    result = balance(['C', 'O2'], ['CO', 'CO2'])
+    assert not result.ok and result.error == UNBALANCED_MESSAGE
@@ -0,0 +1,135 @@
+import time
+
+import pytest
+
+import core
+import fallback
+from core import SOLVER_CHEMPY, SOLVER_TOO_COMPLEX, TOO_COMPLEX_MESSAGES
+from fallback import LIMIT_BUSY, LIMIT_MEMORY, LIMIT_TIME, Sandbox, SandboxPool, progress_callback
+
+# Pengganti fallback._serve yang dijalankan di subprocess spawn (harus bisa
+# diimpor dari modul ini); tidak mengimpor chempy sehingga cepat dimulai
+
+def serve_result(conn, memory_mb):
+    conn.send(('ready', None))
+    while True:
+        try:
+            reactants, products = conn.recv()
+        except EOFError:
+            return
+        conn.send(('ok', {'reactants': [[r, 1] for r in reactants], 'products': [[p, 1] for p in products],
+                          'solver': SOLVER_CHEMPY}))
+
+def serve_slow(conn, memory_mb):
+    conn.send(('ready', None))
+    conn.recv()
+    time.sleep(60)
+
+def serve_hungry(conn, memory_mb):
+    # Batas memori yang sama dengan _serve, lalu alokasi melebihi batas itu
+    fallback._limit_memory(memory_mb)
+    conn.send(('ready', None))
+    conn.recv()
+    try:
+        blocks = [bytearray(memory_mb * 1024 * 1024) for _ in range(4)]
+    except MemoryError:
+        conn.send(('limit', LIMIT_MEMORY))
+        return
+    conn.send(('ok', {'blocks': len(blocks)}))
+
+@pytest.fixture
+def serve(monkeypatch):
+    def install(function):
+        monkeypatch.setattr(fallback, '_serve', function)
+    return install
+
+def test_sandbox_is_reused_between_calls(serve):
+    serve(serve_result)
+    sandbox = Sandbox(256)
+    try:
+        assert sandbox.run(['A'], ['B'], timeout=30)[0] == 'ok'
+        process = sandbox._process
+        kind, payload = sandbox.run(['C'], ['D'], timeout=30)
+        assert kind == 'ok' and payload['products'] == [['D', 1]]
+        assert sandbox._process is process
+    finally:
+        sandbox.stop()
+
+def test_timeout_kills_and_replaces_the_subprocess(serve):
+    serve(serve_slow)
+    pool = SandboxPool(workers=1, timeout=0.5, memory_mb=256)
+    start = time.monotonic()
+    assert pool.run(['A'], ['B']) == ('limit', LIMIT_TIME)
+    assert time.monotonic() - start < 10
+    assert pool.limited == {LIMIT_TIME: 1}
+    assert pool.available() == 1
+    # Subprocess pengganti dibuat untuk tugas berikutnya
+    serve(serve_result)
+    pool.timeout = 30
+    assert pool.run(['A'], ['B'])[0] == 'ok'
+
+def test_memory_limit_is_enforced(serve):
+    serve(serve_hungry)
+    sandbox = Sandbox(256)
+    try:
+        assert sandbox.run(['A'], ['B'], timeout=30) == ('limit', LIMIT_MEMORY)
+        assert sandbox._process is None
+    finally:
+        sandbox.stop()
+
+def test_busy_pool_reports_a_limit(serve):
+    serve(serve_result)
+    pool = SandboxPool(workers=1, timeout=0.1, memory_mb=256)
+    taken = pool._idle.get()
+    try:
+        assert pool.run(['A'], ['B']) == ('limit', LIMIT_BUSY)
+    finally:
+        pool._idle.put(taken)
+    assert pool.limited == {LIMIT_BUSY: 1}
+
+def test_cancelling_stops_the_running_task(serve):
+    serve(serve_slow)
+    sandbox = Sandbox(256)
+    seen = []
+
+    def cancel(elapsed):
+        seen.append(elapsed)
+        if len(seen) > 2:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        sandbox.run(['A'], ['B'], timeout=30, checkpoint=cancel)
+    assert sandbox._process is None
+    assert seen == sorted(seen)
+
+def test_pool_passes_the_progress_callback(serve):
+    serve(serve_slow)
+    pool = SandboxPool(workers=1, timeout=30, memory_mb=256)
+
+    def cancel(elapsed):
+        raise KeyboardInterrupt
+
+    with progress_callback(cancel), pytest.raises(KeyboardInterrupt):
+        pool.run(['A'], ['B'])
+    assert pool.available() == 1
+
+@pytest.mark.parametrize('reason', [LIMIT_TIME, LIMIT_MEMORY, LIMIT_BUSY])
+def test_limits_become_too_complex_results(monkeypatch, reason):
+    class LimitedPool:
+        def run(self, reactants, products):
+            return 'limit', reason
+
+    monkeypatch.setattr(fallback, 'default_pool', lambda: LimitedPool())
+    monkeypatch.setenv(fallback.ISOLATED_ENV, '1')
+    result = core.balance_fallback(['A'], ['B'])
+    assert result.solver == SOLVER_TOO_COMPLEX
+    assert result.error == TOO_COMPLEX_MESSAGES[reason]
+    # Sibuk hanya sementara, jadi tidak disimpan
+    assert result.cacheable == (reason != LIMIT_BUSY)
+
+def test_real_chempy_subprocess():
+    pool = SandboxPool(workers=1, timeout=120)
+    kind, payload = pool.run(['Fe', 'Cl2'], ['FeCl3'])
+    assert kind == 'ok'
+    assert payload['reactants'] == [['Fe', 2], ['Cl2', 3]]
+    assert payload['products'] == [['FeCl3', 2]]
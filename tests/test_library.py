@@ -0,0 +1,70 @@
+import pytest
+
+import core
+from cache import canonical_reaction
+from core import SOLVER_VERSION, balance, balance_reaction, parse_reaction
+from library import ReactionLibrary, main, open_default_library, write_library
+
+REACTIONS = ['Zn + Cu^2+ -> Zn^2+ + Cu', 'Fe + O2 -> Fe2O3', 'Fe^2+ + MnO4^- -> Fe^3+ + Mn^2+', 'Fe + Cl2 -> FeCl3']
+
+def entries(reactions):
+    return [(reaction, canonical_reaction(reaction), balance(*parse_reaction(reaction)).to_dict())
+            for reaction in reactions]
+
+@pytest.fixture
+def library(tmp_path):
+    path = str(tmp_path / 'library.bin')
+    # Bentuk kanonik ganda hanya disimpan sekali
+    assert write_library(path, entries(REACTIONS + ['Cu^2+ + Zn -> Cu + Zn^2+']), SOLVER_VERSION) == len(REACTIONS)
+    return ReactionLibrary(path)
+
+def test_get_by_canonical_form(library):
+    assert len(library) == len(REACTIONS)
+    assert library.solver_version == SOLVER_VERSION
+    for reaction, canonical, result in entries(REACTIONS):
+        assert library.get(canonical) == result
+    assert library.get(canonical_reaction('H2 + O2 -> H2O')) is None
+
+def test_suggest_reactions_and_species(library):
+    assert library.suggest('Fe + ') == [('Fe + Cl2 -> FeCl3', '2Fe + 3Cl2 -> 2FeCl3'),
+                                        ('Fe + O2 -> Fe2O3', '4Fe + 3O2 -> 2Fe2O3')]
+    assert library.suggest('Fe + O2 -> Fe2') == [('Fe + O2 -> Fe2O3', '4Fe + 3O2 -> 2Fe2O3'),
+                                                 ('Fe + O2 -> Fe2O3', None)]
+    assert ('Zn + Cu^2+ -> Zn^2+ + Cu', None) in library.suggest('Zn + Cu^2+ -> Zn^2+ + C')
+    assert library.suggest('Fe', limit=1) == [('Fe + Cl2 -> FeCl3', '2Fe + 3Cl2 -> 2FeCl3')]
+    assert library.suggest('   ') == []
+
+def test_default_library_checks_solver_version(tmp_path, monkeypatch):
+    path = str(tmp_path / 'library.bin')
+    write_library(path, entries(REACTIONS[:1]), 'lama')
+    monkeypatch.setenv('REDOKS_LIBRARY', path)
+    open_default_library.cache_clear()
+    try:
+        assert open_default_library(SOLVER_VERSION) is None
+        assert len(open_default_library('lama')) == 1
+    finally:
+        open_default_library.cache_clear()
+
+def test_library_hit_follows_caller_order(library, monkeypatch):
+    monkeypatch.setattr(core, 'reaction_library', lambda: library)
+    result = balance_reaction('Cu^2+ + Zn -> Cu + Zn^2+')
+    assert result.equation == 'Cu^2+ + Zn -> Cu + Zn^2+'
+    assert balance_reaction('Zn + Cu^2+ -> Zn^2+ + Cu').equation == 'Zn + Cu^2+ -> Zn^2+ + Cu'
+
+def test_unverified_library_entry_is_recomputed(tmp_path, monkeypatch):
+    reaction, canonical, result = entries(['Fe + O2 -> Fe2O3'])[0]
+    result['reactants'] = [['Fe', 1], ['O2', 3]]
+    path = str(tmp_path / 'library.bin')
+    write_library(path, [(reaction, canonical, result)], SOLVER_VERSION)
+    monkeypatch.setattr(core, 'reaction_library', lambda: ReactionLibrary(path))
+    assert balance_reaction(reaction).equation == '4Fe + 3O2 -> 2Fe2O3'
+
+def test_cli_build_suggest_and_stats(tmp_path, capsys):
+    source, path = tmp_path / 'reaksi.txt', str(tmp_path / 'library.bin')
+    source.write_text('\n'.join(REACTIONS) + '\nbukan reaksi\n', encoding='utf-8')
+    assert main(['--library', path, 'build', str(source), '-j', '1']) == 0
+    assert capsys.readouterr().out.startswith(f"{len(REACTIONS)} reaksi ditulis")
+    assert main(['--library', path, 'suggest', 'Zn']) == 0
+    assert capsys.readouterr().out == 'Zn + Cu^2+ -> Zn^2+ + Cu  =>  Zn + Cu^2+ -> Zn^2+ + Cu\nZn^2+\n'
+    assert main(['--library', path, 'stats']) == 0
+    assert capsys.readouterr().out.startswith(f"{len(REACTIONS)} reaksi (solver versi {SOLVER_VERSION})")
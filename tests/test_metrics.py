@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+import metrics
+from core import balance_reaction
+
+@pytest.fixture
+def recording():
+    # Instrumentasi aktif dengan registry kosong; keadaan semula dipulihkan
+    previous = metrics.enabled()
+    metrics.enable(True)
+    metrics.registry.reset()
+    yield metrics.registry
+    metrics.enable(previous)
+    metrics.registry.reset()
+
+def test_disabled_metrics_record_nothing():
+    previous = metrics.enabled()
+    metrics.enable(False)
+    try:
+        metrics.registry.reset()
+        with metrics.span(metrics.STAGE_PARSE):
+            pass
+        metrics.count_path(metrics.PATH_CACHE)
+        metrics.count_failure(metrics.FAILURE_PARSE)
+        snapshot = metrics.registry.snapshot()
+        assert (snapshot['stages'], snapshot['solver_paths'], snapshot['failures']) == ({}, {}, {})
+    finally:
+        metrics.enable(previous)
+
+def test_histogram_buckets_are_cumulative(recording):
+    for seconds in (2e-5, 2e-5, 0.2, 10.0):
+        recording.observe(metrics.STAGE_BALANCING, seconds)
+    data = recording.snapshot()['stages'][metrics.STAGE_BALANCING]
+    assert data['count'] == 4
+    assert data['max'] == 10.0
+    assert data['buckets']['1e-05'] == 0
+    assert data['buckets']['5e-05'] == 2
+    assert data['buckets']['0.5'] == 3
+    assert data['buckets']['5.0'] == 3
+    assert data['buckets']['+Inf'] == 4
+
+def test_prometheus_text(recording):
+    recording.observe(metrics.STAGE_PARSE, 2e-5)
+    metrics.count_path('half-reaction')
+    metrics.count_path('half-reaction')
+    metrics.count_failure(metrics.FAILURE_PARSE)
+    lines = metrics.prometheus_text().splitlines()
+    assert '# TYPE redoks_stage_seconds histogram' in lines
+    assert 'redoks_stage_seconds_bucket{stage="parse",le="5e-05"} 1' in lines
+    assert 'redoks_stage_seconds_bucket{stage="parse",le="+Inf"} 1' in lines
+    assert 'redoks_stage_seconds_sum{stage="parse"} 0.000020000' in lines
+    assert 'redoks_stage_seconds_count{stage="parse"} 1' in lines
+    assert '# TYPE redoks_solver_path_total counter' in lines
+    assert 'redoks_solver_path_total{path="half-reaction"} 2' in lines
+    assert 'redoks_failures_total{reason="parse"} 1' in lines
+
+def test_snapshot_json(recording):
+    metrics.count_path(metrics.PATH_STORE)
+    data = json.loads(metrics.snapshot_json())
+    assert data['enabled'] is True
+    assert data['solver_paths'] == {metrics.PATH_STORE: 1}
+
+def test_every_request_counts_one_path(recording):
+    for reaction in ('Zn + Cu^2+ -> Zn^2+ + Cu', 'Cu^2+ + Zn -> Cu + Zn^2+', 'CH4 + O2 -> CO2 + H2O'):
+        balance_reaction(reaction)
+    with pytest.raises(ValueError):
+        balance_reaction('Zn + Cu^2+')
+    snapshot = recording.snapshot()
+    assert snapshot['solver_paths'] == {'half-reaction': 1, metrics.PATH_CACHE: 1, 'shortcut': 1}
+    assert snapshot['failures'] == {metrics.FAILURE_PARSE: 1}
+    assert {metrics.STAGE_PARSE, metrics.STAGE_OXIDATION, metrics.STAGE_BALANCING} <= set(snapshot['stages'])
@@ -0,0 +1,96 @@
+import json
+import time
+from fractions import Fraction
+
+from core import MEDIUM_BASIC
+from network import balance_network, main, sparse_nullspace
+
+ZINC_COPPER = ['Zn -> Zn^2+ + e^-', 'Cu^2+ + e^- -> Cu']
+HABER_OSTWALD = ['N2 + H2 -> NH3', 'NH3 + O2 -> NO + H2O', 'NO + O2 -> NO2', 'NO2 + H2O -> HNO3 + NO']
+CONTACT = ['S + O2 -> SO2', 'SO2 + O2 -> SO3', 'SO3 + H2SO4 -> H2S2O7', 'H2S2O7 + H2O -> H2SO4']
+
+def net_is_sum_of_steps(result):
+    # Reaksi bersih = jumlah langkah kali pengalinya, dibagi FPB yang sama
+    totals = {}
+    for step, factor in zip(result.steps, result.multipliers):
+        for sign, terms in ((-1, step.reactants), (1, step.products)):
+            for formula, count in terms:
+                totals[formula] = totals.get(formula, 0) + sign * Fraction(factor) * count
+    net = {f: -c for f, c in result.reactants}
+    net.update(result.products)
+    return {f: c for f, c in totals.items() if c} == net
+
+def test_cell_half_reactions():
+    result = balance_network(ZINC_COPPER)
+    assert result.ok and result.unique
+    assert result.equation == 'Zn + Cu^2+ -> Zn^2+ + Cu'
+    assert result.multipliers == (1, 1)
+    assert result.intermediates == ('e^-',)
+    assert net_is_sum_of_steps(result)
+
+def test_haber_ostwald_fractional_multipliers():
+    result = balance_network(HABER_OSTWALD)
+    assert result.equation == 'N2 + 3H2 + 4O2 -> 2H2O + 2HNO3'
+    assert result.multipliers == (1, Fraction(1, 2), Fraction(3, 2), 1)
+    assert result.intermediates == ('NH3', 'NO', 'NO2')
+    assert net_is_sum_of_steps(result)
+    assert '3/2 × (2NO + O2 -> 2NO2)' in result.format()
+    data = json.loads(json.dumps(result.to_dict()))
+    assert data['multipliers'] == [1, '1/2', '3/2', 1]
+
+def test_contact_process_keeps_sulfuric_acid():
+    result = balance_network(CONTACT)
+    assert result.ok and not result.unique
+    assert result.equation == '2S + 3O2 + 2H2O -> 2H2SO4'
+    assert result.multipliers == (2, 1, 2, 2)
+    assert result.intermediates == ('SO2', 'SO3', 'H2S2O7')
+    assert net_is_sum_of_steps(result)
+    assert '2 × (S + O2 -> SO2)' in result.format()
+
+def test_steps_follow_medium():
+    result = balance_network(ZINC_COPPER + ['MnO4^- + Fe^2+ -> Mn^2+ + Fe^3+'], medium=MEDIUM_BASIC)
+    assert all(step.medium == MEDIUM_BASIC for step in result.steps)
+    assert not any(formula == 'H^+' for step in result.steps for formula, _ in step.reactants + step.products)
+
+def test_sparse_nullspace_matches_dense():
+    # Dua zat antara atas tiga langkah: satu arah pengali
+    rows = [{0: 1, 1: -2}, {1: 3, 2: -1}]
+    assert sparse_nullspace(rows, [0, 1, 2]) in ([{0: 2, 1: 1, 2: 3}], [{0: -2, 1: -1, 2: -3}])
+    assert sparse_nullspace([{0: 1}, {1: 1}], [0, 1]) == []
+
+def test_failed_step_is_reported():
+    result = balance_network(['Zn -> Zn^2+ + e^-', 'Cu^2+ + e^- Cu'])
+    assert not result.ok
+    assert result.error == 'Langkah 2 gagal disetarakan'
+    assert result.steps[0].ok and not result.steps[1].ok
+    assert '2. gagal:' in result.format()
+
+def test_everything_cancels():
+    result = balance_network(['Zn -> Zn^2+ + e^-', 'Zn^2+ + e^- -> Zn'])
+    assert not result.ok
+    assert result.error == 'Semua spesies saling menghabiskan; tidak ada reaksi bersih'
+
+def test_non_unique_network_uses_simplest_multipliers():
+    result = balance_network(['H2 + O2 -> H2O2', 'H2O2 -> H2O + O2', 'Fe + H2O2 -> Fe2O3 + H2O'])
+    assert result.ok and not result.unique
+    assert result.equation == '5H2 + 4O2 + 2Fe -> 5H2O + Fe2O3'
+    assert result.multipliers == (5, 1, 1)
+    assert net_is_sum_of_steps(result)
+
+def test_long_chain_scales():
+    # Rantai ratusan langkah dan spesies: setiap zat antara dipakai langkah berikutnya
+    chain = [f"C{n}H{2 * n + 2} + CH4 -> C{n + 1}H{2 * n + 4} + H2" for n in range(2, 300)]
+    start = time.monotonic()
+    result = balance_network(chain)
+    assert time.monotonic() - start < 1
+    assert result.equation == 'C2H6 + 298CH4 -> 298H2 + C300H602'
+    assert set(result.multipliers) == {1}
+    assert len(result.intermediates) == len(chain) - 1
+
+def test_cli_prints_net_reaction(tmp_path, capsys):
+    path = tmp_path / 'sel.txt'
+    path.write_text('\n'.join(ZINC_COPPER), encoding='utf-8')
+    assert main([str(path)]) == 0
+    assert 'Zn + Cu^2+ -> Zn^2+ + Cu' in capsys.readouterr().out
+    assert main([str(path), '--json']) == 0
+    assert json.loads(capsys.readouterr().out)['intermediates'] == ['e^-']
@@ -0,0 +1,84 @@
+import pytest
+
+from core import get_oxidation_sites, get_oxidation_state, parse_reaction
+from oxidation import ELEMENT_TABLE, POLYATOMIC_IONS, assign_oxidation_states, find_fragments
+from species import Species
+
+from .conftest import corpus
+
+@pytest.mark.parametrize('formula, states', [
+    ('SO2', {'S': 4, 'O': -2}),
+    ('MnO4^-', {'Mn': 7, 'O': -2}),
+    ('ClO^-', {'Cl': 1, 'O': -2}),
+    ('H2O2', {'H': 1, 'O': -1}),
+    ('NaH', {'Na': 1, 'H': -1}),
+    ('CuH', {'Cu': 1, 'H': -1}),
+    ('C2H5OH', {'C': -2, 'H': 1, 'O': -2}),
+    ('N2H4', {'N': -2, 'H': 1}),
+    ('Fe^3+', {'Fe': 3}),
+    ('O2', {'O': 0}),
+])
+def test_oxidation_states_from_table(formula, states):
+    assert get_oxidation_state(formula) == states
+
+def test_unknown_elements_take_the_remaining_charge():
+    assert assign_oxidation_states({'U': 1, 'O': 3}, 0) == {'U': 6, 'O': -2}
+    assert assign_oxidation_states({'Xe': 1, 'F': 4}, 0) == {'Xe': 4, 'F': -1}
+
+@pytest.mark.parametrize('formula, sites', [
+    # Seri prioritas halogen dipecah elektronegativitas
+    ('ICl', {'I': ((1, 1),), 'Cl': ((-1, 1),)}),
+    ('BrCl', {'Br': ((1, 1),), 'Cl': ((-1, 1),)}),
+    # Gugus peroksida O-O, bukan S +8
+    ('H2SO5', {'H': ((1, 2),), 'S': ((6, 1),), 'O': ((-2, 3), (-1, 2))}),
+    ('S2O8^2-', {'S': ((6, 2),), 'O': ((-2, 6), (-1, 2))}),
+    # Valensi campuran
+    ('Fe3O4', {'Fe': ((2, 1), (3, 2)), 'O': ((-2, 4),)}),
+    ('Pb3O4', {'Pb': ((2, 2), (4, 1)), 'O': ((-2, 4),)}),
+    ('U3O8', {'U': ((5, 2), (6, 1)), 'O': ((-2, 8),)}),
+    ('C3H8', {'C': ((-3, 2), (-2, 1)), 'H': ((1, 8),)}),
+    ('I3^-', {'I': ((-1, 1), (0, 2))}),
+])
+def test_regression_sites(formula, sites):
+    assert get_oxidation_sites(formula) == sites
+
+@pytest.mark.parametrize('formula', ['C3H8', 'S4O6^2-', 'Fe3O4', 'Pb3O4', 'U3O8', 'H2SO5', 'I3^-', 'NH4NO3'])
+def test_sites_sum_to_charge(formula):
+    species = Species.get(formula)
+    assert sum(state * atoms for states in species.oxidation_sites.values() for state, atoms in states) == species.charge
+    for element, states in species.oxidation_sites.items():
+        assert sum(atoms for _, atoms in states) == species.composition[element]
+
+@pytest.mark.parametrize('formula', ['Fe^4+', 'KO2'])
+def test_no_state_outside_the_table(formula):
+    # Tidak ada kombinasi dari tabel: spesies tidak diketahui, bukan tebakan
+    assert get_oxidation_sites(formula) == {}
+
+def test_find_fragments():
+    fragments = find_fragments('(NH4)2Ce(NO3)6')
+    assert [(POLYATOMIC_IONS[index][0], count) for index, count in fragments] == [('NH4', 2), ('NO3', 6)]
+
+@pytest.mark.parametrize('formula, states', [
+    ('(NH4)2Ce(NO3)6', {'Ce': 4}),
+    ('FeC2O4', {'Fe': 2, 'C': 3}),
+    ('UO2(NO3)2', {'U': 6}),
+    ('SO3', {'S': 6}),
+    ('NH4NO3', {'N': 1}),
+])
+def test_fragment_states(formula, states):
+    species = Species.get(formula)
+    assert {element: species.oxidation_states[element] for element in states} == states
+
+def test_oxidation_sites_keep_each_fragment():
+    assert Species.get('NH4NO3').oxidation_sites['N'] == ((-3, 1), (5, 1))
+
+def test_corpus_states_stay_in_table():
+    formulas = {species for name in ('readme', 'textbook', 'synthetic') for reaction in corpus(name)
+                for side in parse_reaction(reaction) for species in side}
+    for formula in formulas:
+        sites = get_oxidation_sites(formula)
+        if len(sites) < 2:
+            continue
+        for element, states in sites.items():
+            if element in ELEMENT_TABLE:
+                assert {state for state, _ in states} <= set(ELEMENT_TABLE[element][1]) | {0}, formula
@@ -0,0 +1,63 @@
+import json
+import os
+
+import core
+from core import SOLVER_SHORTCUT, balance_reaction, parse_reaction
+from rules import RuleTable, rule_key
+
+RULE = {"reactants": ["H2S", "O2"], "products": ["SO2", "H2O"], "equation": "2H2S + 3O2 -> 2SO2 + 2H2O"}
+OTHER = {"reactants": ["NH3", "O2"], "products": ["NO", "H2O"], "equation": "4NH3 + 5O2 -> 4NO + 6H2O"}
+
+def write_rules(path, entries, mtime):
+    path.write_text(json.dumps(entries), encoding='utf-8')
+    os.utime(path, (mtime, mtime))
+
+def test_bundled_table_matches_any_order():
+    table = RuleTable()
+    assert len(table) > 0
+    expected = ((('H2O2', 1), ('I^-', 2), ('H^+', 2)), (('I2', 1), ('H2O', 2)))
+    assert table.lookup(*parse_reaction('H2O2 + I- -> I2 + H2O')) == expected
+    assert table.lookup(*parse_reaction('I^- + H2O2 -> H2O + I2')) == expected
+    assert table.lookup(*parse_reaction('H2O2 + I^- -> I2')) is None
+
+def test_rule_key_is_a_multiset():
+    assert rule_key(['A', 'B'], ['C']) == rule_key(['B', 'A'], ['C'])
+    assert rule_key(['A', 'A'], ['C']) != rule_key(['A'], ['C'])
+
+def test_reloads_when_file_changes(tmp_path):
+    path = tmp_path / 'shortcuts.json'
+    write_rules(path, [RULE], 1000)
+    table = RuleTable(str(path), reload_interval=0)
+    assert len(table) == 1
+    assert table.lookup(['NH3', 'O2'], ['NO', 'H2O']) is None
+    write_rules(path, [RULE, OTHER], 2000)
+    assert table.lookup(['NH3', 'O2'], ['NO', 'H2O']) == ((('NH3', 4), ('O2', 5)), (('NO', 4), ('H2O', 6)))
+    assert len(table) == 2
+    # Berkas yang tidak berubah tidak dibaca ulang
+    assert not table.reload()
+
+def test_broken_file_keeps_previous_table(tmp_path):
+    path = tmp_path / 'shortcuts.json'
+    write_rules(path, [RULE], 1000)
+    table = RuleTable(str(path), reload_interval=0)
+    path.write_text('[{"reactants": ["H2S"]', encoding='utf-8')
+    os.utime(path, (2000, 2000))
+    assert not table.reload()
+    write_rules(path, [{"reactants": ["H2S"], "products": ["S"]}], 3000)
+    assert not table.reload()
+    assert table.lookup(['H2S', 'O2'], ['SO2', 'H2O']) == ((('H2S', 2), ('O2', 3)), (('SO2', 2), ('H2O', 2)))
+
+def test_missing_file_gives_empty_table(tmp_path):
+    table = RuleTable(str(tmp_path / 'tidak-ada.json'))
+    assert len(table) == 0
+    assert table.lookup(['H2S', 'O2'], ['SO2', 'H2O']) is None
+
+def test_balance_uses_the_edited_table(monkeypatch, tmp_path):
+    path = tmp_path / 'shortcuts.json'
+    write_rules(path, [], 1000)
+    monkeypatch.setattr(core, 'shortcut_rules', RuleTable(str(path), reload_interval=0))
+    assert balance_reaction('NH3 + O2 -> NO + H2O').solver != SOLVER_SHORTCUT
+    write_rules(path, [OTHER], 2000)
+    result = balance_reaction('NH3 + O2 -> NO + H2O')
+    assert result.solver == SOLVER_SHORTCUT
+    assert result.equation == '4NH3 + 5O2 -> 4NO + 6H2O'
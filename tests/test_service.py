@@ -0,0 +1,148 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+
+import core
+import service
+from batch import balance_to_dict
+from cache import canonical_reaction
+from core import MEDIUM_BASIC, balance_reaction
+from service import BalanceService, HttpError, QueueFull, handle_connection, route
+from store import ResultStore
+
+class GatedWorker:
+    # Pengganti balance_to_dict yang menunggu izin dan mencatat panggilan
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+
+    def __call__(self, reaction):
+        self.calls.append(reaction)
+        self.gate.wait(5)
+        return balance_to_dict(reaction)
+
+@pytest.fixture
+def worker(monkeypatch):
+    worker = GatedWorker()
+    monkeypatch.setattr(service, 'balance_to_dict', worker)
+    yield worker
+    worker.gate.set()
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(2) as executor:
+        yield executor
+
+async def release(worker, calls):
+    # Lepaskan pekerja setelah semua tugas yang diharapkan masuk
+    while len(worker.calls) < calls:
+        await asyncio.sleep(0.001)
+    worker.gate.set()
+
+def test_identical_reactions_are_coalesced(worker, executor):
+    svc = BalanceService(executor)
+
+    async def scenario():
+        first = svc.balance_many(['Zn + Cu^2+ -> Zn^2+ + Cu'], 'acidic')
+        second = svc.balance_many(['Cu^2+ + Zn -> Cu + Zn^2+'], 'acidic')
+        return await asyncio.gather(first, second, release(worker, 1))
+
+    (first,), (second,), _ = asyncio.run(scenario())
+    assert len(worker.calls) == 1
+    assert svc.coalesced == 1
+    # Jawaban gabungan tetap mengikuti urutan input tiap permintaan
+    assert first['equation'] == 'Zn + Cu^2+ -> Zn^2+ + Cu'
+    assert second['equation'] == 'Cu^2+ + Zn -> Cu + Zn^2+'
+
+def test_full_queue_rejects_the_whole_request(worker, executor):
+    svc = BalanceService(executor, queue_size=1)
+
+    async def scenario():
+        running = asyncio.ensure_future(svc.balance_many(['Zn + Cu^2+ -> Zn^2+ + Cu'], 'acidic'))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFull):
+            await svc.balance_many(['Fe + O2 -> Fe2O3', 'Zn + Cu^2+ -> Zn^2+ + Cu'], 'acidic')
+        # Reaksi yang sedang dihitung tetap boleh ikut menunggu
+        joined = svc.balance_many(['Zn + Cu^2+ -> Zn^2+ + Cu'], 'acidic')
+        return await asyncio.gather(running, joined, release(worker, 1))
+
+    asyncio.run(scenario())
+    assert svc.rejected == 1
+    assert svc.stats()['inflight'] == 0
+
+def test_results_match_balance_reaction(executor):
+    svc = BalanceService(executor)
+    reactions = ['H2O2 + MnO4^- -> Mn^2+ + O2', 'Cr2O7^2- + I^- -> Cr^3+ + I2', 'Fe + O2 -> Fe2O3', 'H2 + O2']
+    records = asyncio.run(svc.balance_many(reactions, MEDIUM_BASIC))
+    for reaction, record in zip(reactions[:3], records):
+        expected = balance_reaction(reaction, medium=MEDIUM_BASIC)
+        assert record['result'] == expected.format()
+        assert record['equation'] == expected.equation
+    assert records[3] == {'reaction': 'H2 + O2', 'error': 'Format reaksi salah, harus dengan tanda "->"'}
+
+def test_worker_results_reach_the_store(worker, executor, tmp_path, monkeypatch):
+    store = ResultStore(str(tmp_path / 'hasil.db'))
+    monkeypatch.setattr(core, 'persistent_store', store)
+    worker.gate.set()
+    svc = BalanceService(executor)
+    asyncio.run(svc.balance_many(['Zn + Cu^2+ -> Zn^2+ + Cu'], 'acidic'))
+    assert store.get(canonical_reaction('Zn + Cu^2+ -> Zn^2+ + Cu')) is not None
+    # Hasil tersimpan dijawab tanpa pekerja
+    core.result_cache.clear()
+    svc = BalanceService(executor)
+    (record,) = asyncio.run(svc.balance_many(['Cu^2+ + Zn -> Cu + Zn^2+'], 'acidic'))
+    assert record['equation'] == 'Cu^2+ + Zn -> Cu + Zn^2+'
+    assert len(worker.calls) == 1
+
+@pytest.mark.parametrize('method, path, body, status', [
+    ('GET', '/tidak-ada', b'', HTTPStatus.NOT_FOUND),
+    ('GET', '/balance', b'', HTTPStatus.METHOD_NOT_ALLOWED),
+    ('POST', '/health', b'', HTTPStatus.METHOD_NOT_ALLOWED),
+    ('POST', '/balance', b'{', HTTPStatus.BAD_REQUEST),
+    ('POST', '/balance', b'[]', HTTPStatus.BAD_REQUEST),
+    ('POST', '/balance', b'{"reaction": " "}', HTTPStatus.BAD_REQUEST),
+    ('POST', '/balance', b'{"reaction": "H2 + O2 -> H2O", "medium": "alkaline"}', HTTPStatus.BAD_REQUEST),
+    ('POST', '/balance/batch', b'{"reactions": "H2 + O2 -> H2O"}', HTTPStatus.BAD_REQUEST),
+    ('POST', '/balance/batch', json.dumps({'reactions': ['H2 + O2 -> H2O'] * (service.MAX_BATCH + 1)}).encode(),
+     HTTPStatus.REQUEST_ENTITY_TOO_LARGE),
+])
+def test_route_errors(executor, method, path, body, status):
+    with pytest.raises(HttpError) as error:
+        asyncio.run(route(BalanceService(executor), method, path, body))
+    assert error.value.status == status
+
+def test_route_answers(executor):
+    svc = BalanceService(executor)
+    status, record = asyncio.run(route(svc, 'POST', '/balance', b'{"reaction": "H2 + O2 -> H2O"}'))
+    assert status == HTTPStatus.OK and record['equation'] == '2H2 + O2 -> 2H2O'
+    status, record = asyncio.run(route(svc, 'POST', '/balance', b'{"reaction": "H2 + O2"}'))
+    assert status == HTTPStatus.BAD_REQUEST and 'error' in record
+    status, payload = asyncio.run(route(svc, 'POST', '/balance/batch', b'{"reactions": ["H2 + O2 -> H2O", "x"]}'))
+    assert status == HTTPStatus.OK and len(payload['results']) == 2
+    status, health = asyncio.run(route(svc, 'GET', '/health', b''))
+    assert status == HTTPStatus.OK and health['status'] == 'ok'
+
+def test_http_429_with_retry_after(worker, executor):
+    svc = BalanceService(executor, queue_size=0)
+
+    async def scenario():
+        server = await asyncio.start_server(lambda r, w: handle_connection(svc, r, w), '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            body = b'{"reaction": "Fe + O2 -> Fe2O3"}'
+            writer.write(b'POST /balance HTTP/1.1\r\nConnection: close\r\n'
+                         b'Content-Length: ' + str(len(body)).encode() + b'\r\n\r\n' + body)
+            response = await reader.read()
+            writer.close()
+            return response
+
+    head, _, body = asyncio.run(scenario()).partition(b'\r\n\r\n')
+    assert head.startswith(b'HTTP/1.1 429')
+    assert b'Retry-After: 1' in head
+    assert 'error' in json.loads(body)
+    assert worker.calls == []
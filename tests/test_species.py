@@ -0,0 +1,76 @@
+import pytest
+
+from species import SPECIES_CACHE_SIZE, Formula, Species, count_atoms, get_charge, species_cache_info, split_reaction, tokenize
+
+@pytest.mark.parametrize('raw, formula', [
+    ('Fe^3', 'Fe^3+'),
+    ('Fe^+3', 'Fe^3+'),
+    ('Fe^+', 'Fe^+'),
+    ('Fe^3+(aq)', 'Fe^3+'),
+    ('OH-', 'OH^-'),
+    ('H+', 'H^+'),
+    ('2H2O', 'H2O'),
+])
+def test_tokenize_normalizes_spelling(raw, formula):
+    assert tokenize(raw).formula == formula
+
+def test_tokenize_composition_and_charge():
+    parsed = tokenize('OH-')
+    assert dict(parsed.composition) == {'O': 1, 'H': 1}
+    assert parsed.charge == -1
+    assert tokenize('e-') == Formula('e^-', (), -1)
+
+@pytest.mark.parametrize('formula, atoms', [
+    ('CuSO4·5H2O', {'Cu': 1, 'S': 1, 'O': 9, 'H': 10}),
+    ('K4[Fe(CN)6]', {'K': 4, 'Fe': 1, 'C': 6, 'N': 6}),
+    ('(NH4)2Ce(NO3)6', {'N': 8, 'H': 8, 'Ce': 1, 'O': 18}),
+])
+def test_count_atoms_groups_and_hydrates(formula, atoms):
+    assert count_atoms(formula) == atoms
+    assert get_charge(formula) == 0
+
+@pytest.mark.parametrize('raw', ['Fe+3', 'Fe^', 'Fe^(aq)', '^2+', '3', '2+', '', 'Fe(OH', 'Fe^3+O'])
+def test_tokenize_rejects_malformed_species(raw):
+    with pytest.raises(ValueError):
+        tokenize(raw)
+
+def test_split_reaction():
+    assert split_reaction('Na+ + Cl- -> NaCl') == (['Na^+', 'Cl^-'], ['NaCl'])
+    # "Fe+3" terpisah menjadi Fe dan 3; angka tanpa unsur ditolak saat parsing
+    for reaction in ('Fe+3 -> Fe', 'Fe^ -> Fe', '^2+ -> Fe', 'H2 + O2'):
+        with pytest.raises(ValueError):
+            split_reaction(reaction)
+
+def test_species_interned_across_spellings():
+    assert Species.get('H+') is Species.get('H^+')
+    assert Species.get('2H2O') is Species.get('H2O')
+
+def test_interning_survives_eviction():
+    # Ejaan "H+" terus dipakai sementara H^+ dikeluarkan dari cache objek
+    for n in range(1, SPECIES_CACHE_SIZE + 10):
+        Species.get('H+')
+        Species.get(f"C{n}H{2 * n + 2}")
+    assert Species.get('H+') is Species.get('H^+')
+
+def test_species_parsed_once():
+    Species.get('KMnO4')
+    before = species_cache_info()
+    for _ in range(10):
+        assert Species.get('KMnO4').formula == 'KMnO4'
+    after = species_cache_info()
+    assert after['misses'] == before['misses']
+
+def test_species_holds_composition_charge_and_states():
+    sp = Species.get('MnO4^-')
+    assert dict(sp.composition) == {'Mn': 1, 'O': 4}
+    assert sp.charge == -1
+    assert dict(sp.oxidation_states) == {'Mn': 7, 'O': -2}
+    assert count_atoms('MnO4^-') == {'Mn': 1, 'O': 4}
+    assert get_charge('MnO4^-') == -1
+
+def test_species_is_read_only():
+    sp = Species.get('H2O')
+    with pytest.raises(TypeError):
+        sp.composition['H'] = 3
+    with pytest.raises(AttributeError):
+        sp.extra = 1
@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+
+from startup_profile import by_package, measure_imports
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_core_import_skips_symbolic_packages():
+    code = ("import sys, core, batch, worksheet; "
+            "print(sorted({m.split('.')[0] for m in sys.modules} & {'chempy', 'sympy', 'pulp'}))")
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == '[]'
+
+def test_measure_imports_reports_per_package():
+    rows, wall = measure_imports(['json'])
+    assert wall > 0
+    assert any(name == 'json' and depth == 0 for name, _, _, depth in rows)
+    assert by_package([('json.decoder', 5, 5, 1), ('json', 3, 8, 0)]) == {'json': 8}
@@ -0,0 +1,63 @@
+import pytest
+
+import core
+from cache import canonical_reaction, result_cache
+from core import BalanceResult, balance, balance_reaction, parse_reaction
+from store import ResultStore, main, warm, warm_chunk
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ResultStore(str(tmp_path / 'hasil.db'))
+    monkeypatch.setattr(core, 'persistent_store', store)
+    return store
+
+def test_store_round_trip(tmp_path):
+    store = ResultStore(str(tmp_path / 'hasil.db'))
+    reaction = 'Cu + HNO3 -> Cu(NO3)2 + NO + NO2 + H2O'
+    result = balance(*parse_reaction(reaction))
+    key = canonical_reaction(reaction)
+    store.put(key, result)
+    assert store.count() == 1
+    assert store.get(key) == result
+    assert store.get(canonical_reaction('H2 + O2 -> H2O')) is None
+    store.put(canonical_reaction('X -> Y'), BalanceResult(error='gagal'))
+    assert store.count() == 1
+
+def test_store_drops_other_solver_versions(tmp_path):
+    path = str(tmp_path / 'hasil.db')
+    old = ResultStore(path, version='lama')
+    old.put(canonical_reaction('H2 + O2 -> H2O'), balance(['H2', 'O2'], ['H2O']))
+    current = ResultStore(path)
+    assert current.count() == 0
+    assert current.get(canonical_reaction('H2 + O2 -> H2O')) is None
+
+def test_balance_reaction_reads_and_writes_store(store):
+    reaction = 'Zn + Cu^2+ -> Zn^2+ + Cu'
+    first = balance_reaction(reaction)
+    assert store.get(canonical_reaction(reaction)) == first
+    result_cache.clear()
+    assert balance_reaction(reaction) == first
+    # Hasil tersimpan juga mengikuti urutan input peminta berikutnya
+    result_cache.clear()
+    assert balance_reaction('Cu^2+ + Zn -> Cu + Zn^2+').equation == 'Cu^2+ + Zn -> Cu + Zn^2+'
+
+def test_shortcut_results_are_not_stored(store):
+    assert balance_reaction('CH4 + O2 -> CO2 + H2O').solver == core.SOLVER_SHORTCUT
+    assert store.count() == 0
+
+def test_warm_skips_shortcut_results(tmp_path):
+    tasks = [(0, 'CH4 + O2 -> CO2 + H2O', None, None), (1, 'Zn + Cu^2+ -> Zn^2+ + Cu', None, None),
+             (2, 'H2 + O2', None, None), (3, 'x', None, 'JSON tidak valid')]
+    items = warm_chunk(tasks)
+    assert [key for key, _ in items] == [canonical_reaction('Zn + Cu^2+ -> Zn^2+ + Cu')]
+    store = ResultStore(str(tmp_path / 'hasil.db'))
+    assert warm(store, iter(tasks)) == 1
+    assert store.get(canonical_reaction('CH4 + O2 -> CO2 + H2O')) is None
+
+def test_cli_warm_and_stats(tmp_path, capsys):
+    source, db = tmp_path / 'reaksi.txt', str(tmp_path / 'hasil.db')
+    source.write_text('Zn + Cu^2+ -> Zn^2+ + Cu\nFe + O2 -> Fe2O3\nH2S + O2 -> SO2 + H2O\n', encoding='utf-8')
+    assert main(['--db', db, 'warm', str(source), '-j', '1']) == 0
+    assert capsys.readouterr().out.startswith('2 hasil disimpan, total 2 entri')
+    assert main(['--db', db, 'stats']) == 0
+    assert capsys.readouterr().out.startswith(f"2 entri (solver versi {core.SOLVER_VERSION})")
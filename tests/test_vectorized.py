@@ -0,0 +1,33 @@
+from dataclasses import replace
+
+from core import balance, parse_reaction, verified
+from species import SPECIES_CACHE_SIZE
+from vectorized import balance_many, unbalanced
+
+from .conftest import UNDERDETERMINED, corpus
+
+def test_balance_many_matches_balance():
+    reactions = [parse_reaction(line) for line in corpus('readme') + corpus('textbook') + UNDERDETERMINED]
+    batch = balance_many(reactions)
+    assert len(batch) == len(reactions)
+    for (reactants, products), result in zip(reactions, batch):
+        assert result == balance(reactants, products), f"{reactants} -> {products}"
+        assert verified(result)
+
+def test_batch_larger_than_species_cache():
+    # Lebih banyak rumus daripada cache Species: hasil tetap sama
+    reactions = [([f"C{n}H{2 * n + 2}", 'O2'], ['CO2', 'H2O']) for n in range(1, SPECIES_CACHE_SIZE + 50)]
+    batch = balance_many(reactions)
+    for (reactants, products), result in zip(reactions[::97], batch[::97]):
+        assert result == balance(reactants, products)
+    assert not unbalanced(batch).any()
+
+def test_unbalanced_agrees_with_verified():
+    # Persamaan alternatif ikut diperiksa seperti di core.verified
+    first, second = balance_many([parse_reaction(line) for line in UNDERDETERMINED[:2]])
+    good = (first.reactants, first.products)
+    checked = [replace(first, alternatives=(good,)),
+               replace(first, reactants=(('C', 1), ('O2', 1))),
+               replace(first, alternatives=(good, (first.reactants, first.products[:1]))),
+               replace(second, alternatives=((second.reactants, ()),))]
+    assert list(unbalanced(checked)) == [not verified(result) for result in checked] == [False, True, True, True]
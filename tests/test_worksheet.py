@@ -0,0 +1,89 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+import core
+from cache import result_cache
+from core import MEDIUM_BASIC, balance_reaction
+from store import ResultStore
+from worksheet import balance_rows, parse_worksheet
+
+class CountingExecutor(ThreadPoolExecutor):
+    # Pool thread yang mencatat reaksi yang dikirim ke pekerja
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted.extend(args)
+        return super().submit(fn, *args, **kwargs)
+
+@pytest.fixture
+def executor():
+    executor = CountingExecutor()
+    yield executor
+    executor.shutdown()
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ResultStore(str(tmp_path / 'hasil.db'))
+    monkeypatch.setattr(core, 'persistent_store', store)
+    return store
+
+def test_parse_worksheet_skips_blanks_and_comments():
+    text = '# latihan\nZn + Cu^2+ -> Zn^2+ + Cu\n\n   \n  Fe + O2 -> Fe2O3  \n'
+    assert parse_worksheet(text) == ['Zn + Cu^2+ -> Zn^2+ + Cu', 'Fe + O2 -> Fe2O3']
+
+def test_duplicate_rows_are_balanced_once(store, executor):
+    rows = ['Zn + Cu^2+ -> Zn^2+ + Cu', 'Cu^2+ + Zn -> Cu + Zn^2+', 'H2 + O2 -> H2O',
+            'Zn+Cu^2+->Zn^2++Cu', 'bukan reaksi']
+    results = dict(balance_rows(rows, MEDIUM_BASIC, executor))
+    assert sorted(results) == list(range(len(rows)))
+    assert isinstance(results[4], str)
+    assert results[0] == results[3]
+    assert results[0].medium == MEDIUM_BASIC
+    assert len(executor.submitted) == 2
+    assert store.count() == 2
+    # Setiap baris memakai urutan spesiesnya sendiri
+    assert results[0].equation == 'Zn + Cu^2+ -> Zn^2+ + Cu'
+    assert results[1].equation == 'Cu^2+ + Zn -> Cu + Zn^2+'
+
+    # Semua baris sudah tersimpan: tidak ada tugas baru untuk pekerja
+    result_cache.clear()
+    again = dict(balance_rows(rows, MEDIUM_BASIC, executor))
+    assert again == results
+    assert len(executor.submitted) == 2
+
+def test_rows_match_balance_reaction(executor):
+    rows = ['H2O2 + MnO4^- -> Mn^2+ + O2', 'Fe + O2 -> Fe2O3', 'MnO4^- + H2O2 -> O2 + Mn^2+']
+    results = dict(balance_rows(rows, MEDIUM_BASIC, executor))
+    for index, reaction in enumerate(rows):
+        result_cache.clear()
+        assert results[index] == balance_reaction(reaction, medium=MEDIUM_BASIC)
+
+def test_worker_failure_is_reported_per_row(monkeypatch, executor):
+    def broken(reaction):
+        raise RuntimeError('pekerja mati')
+    monkeypatch.setattr('worksheet.balance_to_dict', broken)
+    results = dict(balance_rows(['Fe + O2 -> Fe2O3', 'O2 + Fe -> Fe2O3'], executor=executor))
+    assert results == {0: 'Terjadi kesalahan: pekerja mati', 1: 'Terjadi kesalahan: pekerja mati'}
+
+def test_closing_the_stream_cancels_pending_rows():
+    class Recorder:
+        # Hanya tugas pertama yang selesai; sisanya menunggu selamanya
+        def __init__(self):
+            self.futures = []
+
+        def submit(self, fn, *args):
+            future = Future()
+            if not self.futures:
+                future.set_result(fn(*args))
+            self.futures.append(future)
+            return future
+
+    recorder = Recorder()
+    rows = balance_rows(['Fe + O2 -> Fe2O3', 'Al + O2 -> Al2O3', 'Na + Cl2 -> NaCl'], executor=recorder)
+    index, result = next(rows)
+    assert index == 0 and result.equation == '4Fe + 3O2 -> 2Fe2O3'
+    rows.close()
+    assert [future.cancelled() for future in recorder.futures] == [False, True, True]
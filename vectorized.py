@@ -0,0 +1,297 @@
+from collections import defaultdict
+from itertools import chain
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import metrics
+from balancer import CHARGE_ROW, assemble, auxiliary_candidates, is_balanced, solve_candidate
+from core import BalancePlan, BalanceResult, Term, balance_exact, balance_fallback, balance_underdetermined, finish_balance, plan_balance
+from species import Species
+
+# Penyetaraan banyak reaksi sekaligus. Sistem koefisien dengan bentuk matriks
+# yang sama ditumpuk dan diselesaikan bersama lewat SVD NumPy; hasil numerik
+# hanya dipakai jika ruang nolnya jelas berdimensi satu dan vektor bulatnya
+# lolos pemeriksaan eksak A @ x == 0. Sisanya (kondisi buruk atau solusi
+# tidak tunggal) diselesaikan dengan jalur bilangan bulat eksak sehingga
+# hasil selalu sama dengan `core.balance`.
+
+# Nilai singular relatif di bawah ini dianggap nol
+ZERO_TOLERANCE = 1e-9
+# Nilai singular relatif terkecil yang masih dianggap jelas bukan nol
+GAP_TOLERANCE = 1e-6
+# Penyebut terbesar yang dicoba saat membulatkan vektor ruang nol
+MAX_DENOMINATOR = 1000
+# Koefisien di atas batas ini diverifikasi dengan bilangan bulat Python
+# agar penjumlahan int64 tidak meluap
+VERIFY_LIMIT = 1 << 24
+
+Reaction = Tuple[List[str], List[str]]
+
+def _integer_nullvectors(stack: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Untuk tumpukan matriks (B, m, n): dimensi ruang nol numerik per baris
+    # (-1 jika kondisinya buruk), vektor ruang nol bulat primitif (B, n) dan
+    # penanda baris berdimensi satu yang lolos verifikasi eksak
+    batch, m, n = stack.shape
+    floats = stack.astype(np.float64)
+    _, sigma, vt = np.linalg.svd(floats)
+    relative = sigma / np.maximum(sigma[:, :1], 1.0)
+    zero = relative < ZERO_TOLERANCE
+    clear = relative > GAP_TOLERANCE
+    rank = clear.sum(axis=1)
+    dimension = np.where((zero | clear).all(axis=1), n - rank, -1)
+    single = dimension == 1
+    vectors = vt[:, n - 1, :]
+
+    magnitude = np.abs(vectors)
+    masked = np.where(magnitude > ZERO_TOLERANCE, magnitude, np.inf)
+    pivot = np.take_along_axis(vectors, np.argmin(masked, axis=1)[:, None], axis=1)
+    ratios = vectors / np.where(pivot == 0, 1.0, pivot)
+
+    integers = np.zeros((batch, n), dtype=np.int64)
+    found = np.zeros(batch, dtype=bool)
+    for denominator in range(1, MAX_DENOMINATOR + 1):
+        todo = single & ~found
+        if not todo.any():
+            break
+        scaled = ratios[todo] * denominator
+        rounded = np.rint(scaled)
+        close = np.all(np.abs(scaled - rounded) < 1e-6, axis=1)
+        rows = np.flatnonzero(todo)[close]
+        integers[rows] = rounded[close].astype(np.int64)
+        found[rows] = True
+
+    # Bentuk primitif dan verifikasi eksak dengan aritmetika bulat
+    divisors = np.gcd.reduce(integers, axis=1)
+    divisors[divisors == 0] = 1
+    integers //= divisors[:, None]
+    exact = np.all(np.einsum('bmn,bn->bm', stack, integers) == 0, axis=1) & np.any(integers != 0, axis=1)
+    return dimension, integers, found & exact
+
+# Entri tak nol matriks komposisi bertanda: (label baris, baris, kolom,
+# nilai, (kolom, muatan)); baris muatan baru diberi nomor saat matriks diisi
+Entries = Tuple[Dict[str, int], List[int], List[int], List[int], List[Tuple[int, int]]]
+
+# Komposisi dan muatan per rumus untuk satu batch. Disimpan sendiri karena
+# batch besar bisa berisi lebih banyak rumus daripada cache Species, dan
+# rumus yang sudah keluar dari cache itu harus ditokenisasi ulang.
+Columns = Dict[str, Tuple[Tuple[Tuple[str, int], ...], int]]
+
+def _column(formula: str, columns: Columns) -> Tuple[Tuple[Tuple[str, int], ...], int]:
+    column = columns.get(formula)
+    if column is None:
+        sp = Species.get(formula)
+        column = columns[formula] = (tuple(sp.composition.items()), sp.charge)
+    return column
+
+def _entries(formulas: Sequence[str], n_reactants: int, columns: Columns, first: int = 0,
+             base: Optional[Entries] = None) -> Entries:
+    # Tambahkan kolom `formulas` (mulai dari kolom `first`) ke entri `base`;
+    # kolom reaktan positif, kolom produk negatif seperti balancer.candidate_matrix
+    labels, rows, indices, values, charges = base or ({}, [], [], [], [])
+    labels, rows, indices, values, charges = dict(labels), list(rows), list(indices), list(values), list(charges)
+    for column, formula in enumerate(formulas, first):
+        composition, charge = _column(formula, columns)
+        sign = 1 if column < n_reactants else -1
+        for element, count in composition:
+            rows.append(labels.setdefault(element, len(labels)))
+            indices.append(column)
+            values.append(count * sign)
+        if charge:
+            charges.append((column, charge * sign))
+    return labels, rows, indices, values, charges
+
+def solve_many(systems: Dict[int, Tuple[BalancePlan, Tuple[str, ...]]],
+               base: Optional[Dict[int, Entries]] = None, columns: Optional[Columns] = None
+               ) -> Dict[int, Optional[List[int]]]:
+    # Selesaikan satu kandidat spesies bantu untuk banyak reaksi. Hasil None
+    # berarti kandidat ini tidak memberi koefisien positif yang tunggal.
+    # Matriks satu kelompok bentuk diisi sekaligus dari entri tak nolnya;
+    # `base` berisi entri spesies pengguna yang sudah dihitung di tahap lain.
+    columns = {} if columns is None else columns
+    groups: Dict[Tuple[int, int], List[Tuple[int, Tuple[List[int], List[int], List[int]], List[str], int]]] = defaultdict(list)
+    for index, (plan, auxiliaries) in systems.items():
+        n_user = len(plan.reactants) + len(plan.products)
+        user = base.get(index) if base is not None else None
+        if user is None:
+            user = _entries(plan.reactants + plan.products, len(plan.reactants), columns)
+        labels, rows, indices, values, charges = _entries(auxiliaries, 0, columns, n_user, user)
+        charge_row = len(labels)
+        entries = (rows + [charge_row] * len(charges), indices + [c for c, _ in charges], values + [v for _, v in charges])
+        formulas = plan.reactants + plan.products + list(auxiliaries)
+        groups[(charge_row + 1, len(formulas))].append((index, entries, formulas, n_user))
+
+    solved: Dict[int, Optional[List[int]]] = {}
+    for (m, n), members in groups.items():
+        sizes = [len(entries[0]) for _, entries, _, _ in members]
+        total = sum(sizes)
+        rows, indices, values = (np.fromiter(chain.from_iterable(entries[k] for _, entries, _, _ in members),
+                                             dtype=np.int64, count=total) for k in range(3))
+        stack = np.zeros((len(members), m, n), dtype=np.int64)
+        stack[np.repeat(np.arange(len(members)), sizes), rows, indices] = values
+        dimensions, vectors, ok = _integer_nullvectors(stack)
+        for (index, _, formulas, n_user), matrix, dimension, vector, numeric in zip(members, stack, dimensions, vectors, ok):
+            electron_row = systems[index][0].electron_row
+            if dimension == 0 or (dimension > 1 and not electron_row):
+                # Jelas tidak ada solusi tunggal; jalur eksak akan menolak juga
+                solved[index] = None
+                continue
+            if not numeric:
+                # Kondisi buruk, pembulatan gagal, atau perlu baris elektron: jalur eksak
+                solved[index] = solve_candidate(matrix.tolist(), formulas, n_user, electron_row)
+                continue
+            coefficients = [int(v) for v in vector]
+            if coefficients[0] < 0:
+                coefficients = [-c for c in coefficients]
+            solved[index] = coefficients if all(c > 0 for c in coefficients[:n_user]) else None
+    return solved
+
+def unbalanced(results: Sequence[BalanceResult], columns: Optional[Columns] = None) -> np.ndarray:
+    # Versi batch dari core.verified: penanda hasil berhasil yang persamaan
+    # utamanya atau salah satu alternatifnya tidak setara. Komposisi tiap
+    # rumus unik disimpan sekali dalam bentuk jarang (label, nilai); suku
+    # semua persamaan diratakan menjadi entri (persamaan, label, nilai),
+    # diurutkan per kunci lalu dijumlahkan dengan np.add.reduceat. Kunci
+    # dengan jumlah bukan nol berarti tidak setara.
+    columns = {} if columns is None else columns
+    flags = np.zeros(len(results), dtype=bool)
+    # Persamaan yang diperiksa: (indeks hasil, kiri, kanan)
+    equations: List[Tuple[int, Sequence[Term], Sequence[Term]]] = []
+    for i, result in enumerate(results):
+        if result.ok:
+            for left, right in ((result.reactants, result.products),) + result.alternatives:
+                if left and right:
+                    equations.append((i, left, right))
+                else:
+                    flags[i] = True
+    if not equations:
+        return flags
+    formulas: List[str] = []
+    counts: List[int] = []
+    signs: List[int] = []
+    rows: List[int] = []
+    for row, (_, left, right) in enumerate(equations):
+        for terms in (left, right):
+            formulas.extend([f for f, _ in terms])
+            counts.extend([c for _, c in terms])
+        signs.extend([1] * len(left) + [-1] * len(right))
+        rows.extend([row] * (len(left) + len(right)))
+    try:
+        magnitude = np.array(counts, dtype=np.int64)
+    except (OverflowError, TypeError, ValueError):
+        # Koefisien bukan bulat atau terlalu besar untuk int64
+        for i, left, right in equations:
+            flags[i] |= not is_balanced(left, right)
+        return flags
+    terms_row = np.array(rows, dtype=np.int64)
+    values = magnitude * np.array(signs, dtype=np.int64)
+
+    # Komposisi jarang tiap rumus unik (gaya CSR)
+    unique = {formula: column for column, formula in enumerate(dict.fromkeys(formulas))}
+    labels: Dict[str, int] = {}
+    pointer, entry_labels, entry_values = [0], [], []
+    for formula in unique:
+        composition, charge = _column(formula, columns)
+        for label, value in composition:
+            entry_labels.append(labels.setdefault(label, len(labels)))
+            entry_values.append(value)
+        if charge:
+            entry_labels.append(labels.setdefault(CHARGE_ROW, len(labels)))
+            entry_values.append(charge)
+        pointer.append(len(entry_labels))
+    pointer_array = np.array(pointer, dtype=np.int64)
+
+    # Koefisien harus bulat positif
+    bad = np.zeros(len(equations), dtype=bool)
+    bad[terms_row[magnitude <= 0]] = True
+    large = np.zeros(len(equations), dtype=bool)
+    large[terms_row[magnitude > VERIFY_LIMIT]] = True
+
+    term_columns = np.fromiter((unique[f] for f in formulas), dtype=np.int64, count=len(formulas))
+    sizes = pointer_array[term_columns + 1] - pointer_array[term_columns]
+    term_of_entry = np.repeat(np.arange(len(term_columns)), sizes)
+    first_entry = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    source = pointer_array[term_columns][term_of_entry] + np.arange(len(term_of_entry)) - first_entry
+    keys = terms_row[term_of_entry] * max(1, len(labels)) + np.array(entry_labels, dtype=np.int64)[source]
+    contributions = values[term_of_entry] * np.array(entry_values, dtype=np.int64)[source]
+    order = np.argsort(keys, kind='stable')
+    keys, contributions = keys[order], contributions[order]
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1)) if len(keys) else np.zeros(0, dtype=np.int64)
+    sums = np.add.reduceat(contributions, starts) if len(keys) else np.zeros(0, dtype=np.int64)
+    unequal = np.zeros(len(equations), dtype=bool)
+    unequal[keys[starts][sums != 0] // max(1, len(labels))] = True
+
+    failed = bad | unequal
+    for row in np.flatnonzero(large & ~bad):
+        _, left, right = equations[row]
+        failed[row] = not is_balanced(left, right)
+    # Satu hasil gagal jika salah satu persamaannya gagal
+    np.logical_or.at(flags, np.array([i for i, _, _ in equations]), failed)
+    return flags
+
+def balance_many(reactions: Sequence[Reaction], debug: bool = False) -> List[BalanceResult]:
+    # Versi batch dari core.balance; urutan hasil mengikuti urutan input.
+    # Reaksi identik hanya diselesaikan sekali (BalanceResult tidak bisa diubah).
+    unique: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], int] = {}
+    positions = [unique.setdefault((tuple(r), tuple(p)), len(unique)) for r, p in reactions]
+    solved = _balance_unique([(list(r), list(p)) for r, p in unique], debug)
+    return [solved[position] for position in positions]
+
+def _balance_unique(reactions: List[Reaction], debug: bool) -> List[BalanceResult]:
+    results: List[Optional[BalanceResult]] = [None] * len(reactions)
+    plans: Dict[int, BalancePlan] = {}
+    # Entri spesies pengguna dihitung sekali untuk semua tahap, tepat setelah
+    # perencanaan selagi objek Species-nya masih di cache
+    columns: Columns = {}
+    base: Dict[int, Entries] = {}
+    for index, (reactants, products) in enumerate(reactions):
+        try:
+            plan = plan_balance(reactants, products, debug)
+        except Exception as e:
+            results[index] = BalanceResult(error=str(e))
+            continue
+        if isinstance(plan, BalanceResult):
+            results[index] = plan
+        else:
+            plans[index] = plan
+            base[index] = _entries(plan.reactants + plan.products, len(plan.reactants), columns)
+
+    # Kandidat spesies bantu dicoba bertahap untuk reaksi yang belum selesai,
+    # sama seperti urutan di balancer.balance_equation
+    candidates = {index: auxiliary_candidates(plan.reactants + plan.products) for index, plan in plans.items()}
+    pending = set(plans)
+    stage = 0
+    while pending:
+        systems = {index: (plans[index], candidates[index][stage])
+                   for index in pending if stage < len(candidates[index])}
+        if not systems:
+            break
+        for index, coefficients in solve_many(systems, base, columns).items():
+            if coefficients is None:
+                continue
+            plan = plans[index]
+            try:
+                left, right = assemble(plan.reactants, plan.products, systems[index][1], coefficients)
+                results[index] = finish_balance(plan, left, right)
+            except Exception as e:
+                results[index] = BalanceResult(error=str(e))
+            pending.discard(index)
+        # Reaksi yang kehabisan kandidat diteruskan ke jalur cadangan di bawah
+        pending = {index for index in pending if stage + 1 < len(candidates[index])}
+        stage += 1
+
+    for index, plan in plans.items():
+        if results[index] is None:
+            try:
+                results[index] = balance_underdetermined(plan) or balance_fallback(plan.reactants, plan.products)
+            except Exception as e:
+                results[index] = BalanceResult(error=str(e))
+
+    # Verifikasi seluruh batch sekaligus; hasil tidak setara diganti jalur eksak
+    for index in np.flatnonzero(unbalanced(results, columns)):
+        metrics.count_failure(metrics.FAILURE_UNBALANCED)
+        try:
+            results[index] = balance_exact(*reactions[index], debug)
+        except Exception as e:
+            results[index] = BalanceResult(error=str(e))
+    return results
@@ -0,0 +1,82 @@
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from batch import balance_to_dict
+from cache import canonical_key
+from core import MEDIUM_ACIDIC, BalanceResult, known_result, parse_reaction, remember_result
+
+# Mode lembar kerja: banyak reaksi sekaligus. Reaksi yang sudah ada di cache
+# langsung dikembalikan; sisanya diselesaikan bersamaan di pool proses yang
+# dibagi semua sesi, dan hasil dialirkan sesuai urutan selesai sehingga baris
+# lambat tidak menahan baris cepat.
+
+# Jumlah pekerja pool bersama (dari REDOKS_WORKERS, default jumlah core)
+WORKERS_ENV = 'REDOKS_WORKERS'
+# Batas jumlah baris per lembar kerja
+MAX_ROWS = 200
+
+# Hasil satu baris: BalanceResult atau pesan galat
+RowResult = Union[BalanceResult, str]
+
+def parse_worksheet(text: str) -> List[str]:
+    # Satu reaksi per baris; baris kosong dan komentar (#) dilewati
+    return [line.strip() for line in text.splitlines() if line.strip() and not line.strip().startswith('#')]
+
+@lru_cache(maxsize=None)
+def shared_executor() -> Executor:
+    # Pool proses tunggal per server Streamlit. Konteks spawn dipakai karena
+    # proses server sudah menjalankan banyak thread.
+    workers = int(os.environ.get(WORKERS_ENV) or os.cpu_count() or 1)
+    return ProcessPoolExecutor(max(1, workers), mp_context=multiprocessing.get_context('spawn'))
+
+def balance_rows(reactions: List[str], medium: str = MEDIUM_ACIDIC,
+                 executor: Optional[Executor] = None) -> Iterator[Tuple[int, RowResult]]:
+    # Hasil (indeks baris, hasil) sesuai urutan selesai. Baris dengan bentuk
+    # kanonik sama dihitung sekali dan hasilnya dibagikan ke semua baris itu,
+    # masing-masing dalam urutan spesies barisnya sendiri.
+    # Hasil yang sudah ada (cache, pustaka, penyimpanan persisten) dicari di
+    # proses ini karena pekerja spawn tidak memasang penyimpanan persisten;
+    # hasil dari pekerja juga disimpan di sini.
+    executor = executor or shared_executor()
+    known: Dict[str, BalanceResult] = {}
+    pending: Dict[str, Tuple[str, List[Tuple[int, List[str], List[str]]]]] = {}
+    for index, reaction in enumerate(reactions):
+        try:
+            reactants, products = parse_reaction(reaction)
+        except ValueError as e:
+            yield index, str(e)
+            continue
+        key = canonical_key(reactants, products)
+        if key in pending:
+            pending[key][1].append((index, reactants, products))
+            continue
+        if key not in known:
+            result = known_result(reactants, products, key)
+            if result is None:
+                pending[key] = (reaction, [(index, reactants, products)])
+                continue
+            known[key] = result
+        yield index, known[key].in_order(reactants, products).in_medium(medium)
+
+    futures = {executor.submit(balance_to_dict, reaction): (key, rows)
+               for key, (reaction, rows) in pending.items()}
+
+    try:
+        for future in as_completed(futures):
+            key, rows = futures[future]
+            try:
+                result = BalanceResult.from_dict(future.result())
+            except Exception as e:
+                for index, _, _ in rows:
+                    yield index, f"Terjadi kesalahan: {e}"
+                continue
+            remember_result(key, result)
+            for index, reactants, products in rows:
+                yield index, result.in_order(reactants, products).in_medium(medium)
+    finally:
+        # Dibatalkan (mis. pengguna mengirim ulang): buang tugas yang belum mulai
+        for future in futures:
+            future.cancel()